@@ -0,0 +1,58 @@
+import sys
+import tempfile
+from cpp_timing import best_time, build, generate
+
+# List sizes to compare, can be overridden from the command line
+SIZES = [int(n) for n in sys.argv[1:]] or [250, 1000, 4000, 16000]
+
+# element reads done by every program, the copy is too slow for as many as the others
+ACCESSES = {"copy": 10 ** 5, "reference": 10 ** 8, "boxed": 10 ** 8, "dynamic": 10 ** 8, "typed": 10 ** 8}
+
+# the code written before for the list, emulated on the typed program:
+# a std::any parameter copied or referenced at every read, or a list of std::any
+ANY = "std::any_cast<std::vector<std::any>{}>(xs)[j]"
+REWRITES = {
+    "copy": {"std::vector<int> xs": "std::any xs", "xs[j]": "std::any_cast<int>(" + ANY.format("") + ")"},
+    "reference": {"std::vector<int> xs": "std::any xs", "xs[j]": "std::any_cast<int>(" + ANY.format("&") + ")"},
+    "boxed": {"xs[j]": "std::any_cast<int>(xs[j])"},
+}
+
+def program(size, accesses, generic):
+    # sums the elements of a list of size elements until accesses of them are read,
+    # a second call with an int keeps the list in a PyValue when generic
+    numbers = ", ".join(str(i % 10) for i in range(size))
+    lines = [
+        "def total(xs, n, repeat):",
+        "    s = 0",
+        "    for r in range(repeat):",
+        "        for j in range(n):",
+        "            s = s + xs[j]",
+        "    return s",
+        "",
+        f"numbers = [{numbers}]",
+        f"print(total(numbers, {size}, {accesses // size}))",
+    ]
+    if generic:
+        lines.append("print(total(0, 0, 0))")
+    return "\n".join(lines) + "\n"
+
+def generate_mode(mode, size):
+    generic = mode == "dynamic"
+    # without specializations the list parameter is a PyValue
+    code = generate(program(size, ACCESSES[mode], generic), max_specializations=0 if generic else 4)
+    if mode in REWRITES:
+        for old, new in REWRITES[mode].items():
+            code = code.replace(old, new)
+        code = "#include<any>\n" + code.replace("std::vector<int>", "std::vector<std::any>")
+    return code
+
+def run(directory, mode, size):
+    binary = build(directory, f"{mode}_{size}", generate_mode(mode, size))
+    return best_time([binary]) * 1e9 / ACCESSES[mode]
+
+print(f"{'size':>6}{'copy ns':>10}{'reference ns':>14}{'boxed ns':>10}{'dynamic ns':>12}{'typed ns':>10}")
+with tempfile.TemporaryDirectory() as directory:
+    for size in SIZES:
+        times = [run(directory, mode, size) for mode in ACCESSES]
+        # ns per element read, flat across sizes when every read is O(1)
+        print(f"{size:>6}" + "".join(f"{t:>{w}.2f}" for t, w in zip(times, (10, 14, 10, 12, 10))))
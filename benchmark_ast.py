@@ -0,0 +1,144 @@
+import sys
+import time
+from src.ast_nodes import NODE_TYPES, AccessId, Body, Conditional, LoopBody, Node, Return
+from src.lexer import Lexer
+from src.parser import Parser
+
+# Functions in the generated program, can be overridden from the command line
+FUNCTIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+RUNS = 10
+
+def program(n):
+    # n functions mixing assignments, operations, calls, conditionals and loops
+    lines = []
+    for i in range(n):
+        lines += [
+            f"def f{i}(a, b):",
+            f"    c = a + b * {i}",
+            "    for j in range(b):",
+            "        if c > j and not a == 1:",
+            "            c = c - j // 2",
+            "        elif c == j:",
+            "            print(c)",
+            "    return c",
+            "",
+        ]
+    lines.append(f"print(f{n - 1}(1, 2))")
+    return "\n".join(lines) + "\n"
+
+# Tags the parser used before ast_nodes, when they differ from the node tag
+OLD_TAGS = {
+    'class_attribute': "class atribute use",
+    'number_to_string': 'num->str',
+    'check_in_collection': 'in',
+    'array_assignment': "array assignment",
+    'dict_assignment': "dictionary assignment",
+    'next': 'NEXT',
+}
+
+def to_tuples(node):
+    # the same tree as string tagged tuples, shaped like the parser output before ast_nodes
+    if isinstance(node, list):
+        return [to_tuples(n) for n in node]
+    if not isinstance(node, Node):
+        return node
+    if isinstance(node, Body):
+        prefix = node.tag.replace('_', ' ')
+        statements, ret = to_tuples(node.statements), to_tuples(node.ret)
+        if statements and ret:
+            return ('complete ' + prefix, statements, ret)
+        return (('simple ' if isinstance(node, LoopBody) else 'incomplete ') + prefix, statements or ret)
+    if isinstance(node, Conditional):
+        result = ('conditional', ('if', to_tuples(node.test), to_tuples(node.body)))
+        if node.elifs:
+            result += (('elif_list', [('elif', to_tuples(e.test), to_tuples(e.body)) for e in node.elifs]),)
+        if node.orelse is not None:
+            result += (('else', to_tuples(node.orelse)),)
+        return result
+    if isinstance(node, Return) and node.value is not None:
+        return ('return expression', to_tuples(node.value))
+    children = tuple(to_tuples(getattr(node, f)) for f in node.fields)
+    if isinstance(node, AccessId) and node.stop is None:
+        children = children[:-1]
+    return (OLD_TAGS.get(node.tag, node.tag),) + children
+
+def tree_bytes(node, positions=None):
+    # memory held by the tree: every node, tuple and list, plus the line and column
+    # ints kept by typed nodes (tokens of one line share their lineno int);
+    # names and literals are the same objects in both trees
+    if positions is None:
+        positions = {}
+        return tree_bytes(node, positions) + sum(sys.getsizeof(p) for p in positions.values())
+    if isinstance(node, Node):
+        for position in (node.line, node.column):
+            if position > 256:  # smaller ints are cached by CPython
+                positions[id(position)] = position
+        return sys.getsizeof(node) + sum(tree_bytes(getattr(node, f), positions) for f in node.fields)
+    if isinstance(node, (tuple, list)):
+        return sys.getsizeof(node) + sum(tree_bytes(n, positions) for n in node)
+    return 0
+
+class TupleWalker:
+    # dispatch of the old Visitor: tag string rebuilt and looked up on every visit
+    def __init__(self):
+        self.count = 0
+
+    def visit(self, node):
+        if isinstance(node, tuple):
+            tag = node[0].replace(" ", "_")
+            func = getattr(self, f"visitor_{tag}", None)
+            return func(node)
+        elif isinstance(node, list):
+            for n in node:
+                self.visit(n)
+
+    def visitor_node(self, node):
+        self.count += 1
+        for child in node[1:]:
+            self.visit(child)
+
+for tag in [t.tag for t in NODE_TYPES] + list(OLD_TAGS.values()) + [
+        'if', 'elif', 'else', 'elif_list', 'return expression', 'complete function body', 'incomplete function body',
+        'complete block body', 'incomplete block body', 'complete loop body', 'simple loop body']:
+    setattr(TupleWalker, f"visitor_{tag.replace(' ', '_')}", TupleWalker.visitor_node)
+
+class NodeWalker:
+    # dispatch of the Visitor: kind indexes a table built once
+    def __init__(self):
+        self.count = 0
+        self.dispatch = [getattr(self, f"visitor_{node_type.tag}", None) for node_type in NODE_TYPES]
+
+    def visit(self, node):
+        if isinstance(node, Node):
+            return self.dispatch[node.kind](node)
+        elif isinstance(node, list):
+            for n in node:
+                self.visit(n)
+
+    def visitor_node(self, node):
+        self.count += 1
+        for f in node.fields:
+            self.visit(getattr(node, f))
+
+for node_type in NODE_TYPES:
+    setattr(NodeWalker, f"visitor_{node_type.tag}", NodeWalker.visitor_node)
+
+def measure(tree, walker_type):
+    times = []
+    for _ in range(RUNS):
+        walker = walker_type()
+        start = time.perf_counter()
+        walker.visit(tree)
+        times.append(time.perf_counter() - start)
+    return walker.count, tree_bytes(tree), min(times)
+
+lexer = Lexer(errors=[])
+lexer.build()
+tree = Parser().parse(program(FUNCTIONS), lexer)
+
+print(f"Parse tree of {FUNCTIONS} functions")
+print(f"{'Representation':<18}{'nodes':>8}{'MB':>8}{'visit ms':>10}")
+for name, tree, walker_type in (("string tuples", to_tuples(tree), TupleWalker),
+                                ("typed nodes", tree, NodeWalker)):
+    count, size, seconds = measure(tree, walker_type)
+    print(f"{name:<18}{count:>8}{size / 2**20:>8.2f}{seconds * 1000:>10.1f}")
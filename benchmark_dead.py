@@ -0,0 +1,39 @@
+import os
+import sys
+import tempfile
+from cpp_timing import best_time, compile_command, generate, write_source
+
+# Functions in every program, can be overridden from the command line
+COUNTS = [int(n) for n in sys.argv[1:]] or [50, 200, 800]
+
+def program(count):
+    # count helpers with a few dead stores each, only one in ten is called
+    lines = []
+    for f in range(count):
+        lines += [
+            f"def helper{f}(n):",
+            "    total = 0",
+            "    unused = n * 3",
+            "    for i in range(n):",
+            "        square = i * i",
+            f"        total = total + i * {f % 7 + 1}",
+            "    last = total",
+            "    return total",
+            "",
+        ]
+    lines += [f"print(helper{f}({f % 20}))" for f in range(0, count, 10)]
+    return "\n".join(lines) + "\n"
+
+def compile_program(directory, count, eliminate):
+    code = generate(program(count), eliminate=eliminate)
+    source, binary = write_source(directory, f"{'eliminated' if eliminate else 'all'}_{count}", code)
+    best = best_time(compile_command(source, binary))
+    return len(code) / 1024, best, os.path.getsize(binary) / 1024
+
+print(f"{'functions':>10}{'C++ KB':>14}{'compile s':>16}{'binary KB':>16}")
+with tempfile.TemporaryDirectory() as directory:
+    for count in COUNTS:
+        before = compile_program(directory, count, False)
+        after = compile_program(directory, count, True)
+        # before -> after for every column
+        print(f"{count:>10}" + "".join(f"{f'{b:.1f} -> {a:.1f}':>{w}}" for b, a, w in zip(before, after, (14, 16, 16))))
@@ -0,0 +1,65 @@
+import re
+import statistics
+import time
+import tracemalloc
+from src.lexer import Lexer
+from src.token_buffer import TOKEN_TYPES, TokenBuffer
+
+RUNS = 200
+
+def time_build(optimize):
+    # Times Lexer construction + build, purging the re cache so every run
+    # compiles its master regex from scratch like a fresh process would
+    times = []
+    for _ in range(RUNS):
+        re.purge()
+        start = time.perf_counter()
+        lexer = Lexer(errors=[])
+        lexer.build(optimize=optimize)
+        times.append(time.perf_counter() - start)
+    return times
+
+# Make sure the lextab exists before timing the optimized path
+Lexer(errors=[]).build()
+
+print(f"Lexer startup over {RUNS} runs (ms)")
+print(f"{'Mode':<22}{'min':>8}{'median':>8}")
+for name, optimize in (("full build (before)", False), ("lextab (after)", True)):
+    times = time_build(optimize)
+    print(f"{name:<22}{min(times) * 1000:>8.3f}{statistics.median(times) * 1000:>8.3f}")
+
+# Memory held by the lexer output: a list of LexToken against a TokenBuffer
+
+source = "\n".join(f"value_{i % 500} = value_{i % 500} + {i % 100} * other_{i % 50}" for i in range(50_000)) + "\n"
+
+def walk_tokens(tokens):
+    for tok in tokens:
+        tok.type, tok.value
+
+def walk_arrays(buffer):
+    # a pass that reads the arrays directly, without building any token object
+    values = buffer.values
+    for code, value_id in zip(buffer.types, buffer.value_ids):
+        TOKEN_TYPES[code], values[value_id]
+
+def measure(collect, walk):
+    lexer = Lexer(errors=[])
+    lexer.build()
+    lexer.input(source)
+    tracemalloc.start()
+    tokens = collect(lexer)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # one full pass over the stream, like a later compiler stage would do
+    start = time.perf_counter()
+    walk(tokens)
+    return len(tokens), size, time.perf_counter() - start
+
+print()
+print(f"Lexer output for {source.count(chr(10))} lines")
+print(f"{'Representation':<22}{'tokens':>8}{'MB':>8}{'pass ms':>9}")
+for name, collect, walk in (("list of LexToken", list, walk_tokens),
+                            ("TokenBuffer views", TokenBuffer.from_lexer, walk_tokens),
+                            ("TokenBuffer arrays", TokenBuffer.from_lexer, walk_arrays)):
+    count, size, seconds = measure(collect, walk)
+    print(f"{name:<22}{count:>8}{size / 2**20:>8.2f}{seconds * 1000:>9.1f}")
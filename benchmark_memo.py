@@ -0,0 +1,41 @@
+import sys
+import tempfile
+from cpp_timing import best_time, build, generate
+
+# Arguments of the recursive functions, can be overridden from the command line
+SIZES = [int(n) for n in sys.argv[1:]] or [25, 30, 35, 40]
+
+# the recursive Fibonacci of src/algoritmos and the lattice paths of a grid with sides of a
+# third of the size, two recursive calls for every call that is not a base case
+PROGRAMS = {
+    "fibonacci": lambda size: "\n".join([
+        "def fibonacci(n):",
+        "    if n == 0:",
+        "        return 0",
+        "    elif n == 1:",
+        "        return 1",
+        "    res = fibonacci(n - 1) + fibonacci(n - 2)",
+        "    return res",
+        "",
+        f"print(fibonacci({size}))",
+    ]) + "\n",
+    "paths": lambda size: "\n".join([
+        "def paths(r, c):",
+        "    if r == 0 or c == 0:",
+        "        return 1",
+        "    return (paths(r - 1, c) + paths(r, c - 1)) % 1000003",
+        "",
+        f"print(paths({size // 3}, {size // 3}))",
+    ]) + "\n",
+}
+
+def run(directory, program, size, memoize):
+    name = f"{program}_{'memo' if memoize else 'plain'}_{size}"
+    binary = build(directory, name, generate(PROGRAMS[program](size), memoize=memoize))
+    return best_time([binary]) * 1000
+
+print(f"{'size':>5}{'fibonacci ms':>14}{'memoized ms':>13}{'paths ms':>10}{'memoized ms':>13}")
+with tempfile.TemporaryDirectory() as directory:
+    for size in SIZES:
+        times = [run(directory, program, size, memoize) for program in PROGRAMS for memoize in (False, True)]
+        print(f"{size:>5}" + "".join(f"{t:>{w}.1f}" for t, w in zip(times, (14, 13, 10, 13))))
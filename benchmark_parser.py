@@ -0,0 +1,43 @@
+import sys
+import time
+from src.lexer import Lexer
+from src.parser import Parser
+
+# Statement counts to compare, can be overridden from the command line
+SIZES = [int(n) for n in sys.argv[1:]] or [10_000, 100_000]
+
+def function_body(n):
+    # def f(): with n assignments, reduced through sentences
+    lines = ["def f():"] + [f"    x{i} = {i}" for i in range(n)] + ["    return x0", ""]
+    return "\n".join(lines)
+
+def loop_body(n):
+    # while loop with n assignments, reduced through loop_statements
+    lines = ["while x < 1:"] + [f"    x = {i}" for i in range(n)] + [""]
+    return "\n".join(lines)
+
+def elif_chain(n):
+    # if followed by n elif clauses, reduced through elif_list
+    lines = ["if x == 0:", "    y = 0"]
+    for i in range(1, n + 1):
+        lines += [f"elif x == {i}:", f"    y = {i}"]
+    return "\n".join(lines + [""])
+
+def time_parse(source):
+    lexer = Lexer(errors=[])
+    lexer.build()
+    lexer.input(source)
+    parser = Parser()
+    start = time.perf_counter()
+    parser.parser.parse(source, lexer=lexer)
+    return time.perf_counter() - start
+
+print(f"{'body':<16}{'statements':>12}{'seconds':>10}{'us/stmt':>10}")
+for name, generate in (("function_body", function_body), ("loop_body", loop_body), ("elif_chain", elif_chain)):
+    per_statement = []
+    for n in SIZES:
+        seconds = time_parse(generate(n))
+        per_statement.append(seconds / n)
+        print(f"{name:<16}{n:>12}{seconds:>10.3f}{seconds / n * 1e6:>10.2f}")
+    # linear growth keeps the cost per statement flat across sizes
+    print(f"{name:<16}{'growth':>12}{per_statement[-1] / per_statement[0]:>10.2f}x per statement")
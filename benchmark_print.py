@@ -0,0 +1,28 @@
+import os
+import sys
+import tempfile
+from cpp_timing import best_time, build, generate
+
+# Printed lines to compare, can be overridden from the command line
+LINES = [int(n) for n in sys.argv[1:]] or [10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+
+def program(lines):
+    # prints an int and a float on every iteration
+    return "\n".join([
+        f"for i in range({lines // 2}):",
+        "    print(i)",
+        "    print(i * 0.5)",
+    ]) + "\n"
+
+def run(directory, lines, buffered):
+    name = f"{'buffered' if buffered else 'cout'}_{lines}"
+    binary = build(directory, name, generate(program(lines), buffered_print=buffered))
+    # written to a file, as the batch jobs do, so the terminal does not set the pace
+    return best_time([binary], output=os.path.join(directory, f"{name}.txt")) * 1000
+
+print(f"{'lines':>9}{'std::endl ms':>14}{'buffered ms':>13}")
+with tempfile.TemporaryDirectory() as directory:
+    for lines in LINES:
+        before = run(directory, lines, False)
+        after = run(directory, lines, True)
+        print(f"{lines:>9}{before:>14.1f}{after:>13.1f}")
@@ -0,0 +1,42 @@
+import re
+import sys
+import tempfile
+from cpp_timing import best_time, build, generate
+
+# Iterations of the inner loop, can be overridden from the command line
+ITERATIONS = [int(n) for n in sys.argv[1:]] or [10 ** 7, 3 * 10 ** 7, 10 ** 8]
+INNER = 1000
+
+# the header written before, with the stop computed again at every iteration
+HOISTED = re.compile(r"\(int (\w+) = ([^,;]+), \1__stop = ([^;]+); \1 < \1__stop;")
+
+def program(iterations, dynamic):
+    # a loop bounded by an expression of a parameter, a second call with a str keeps
+    # the parameter in a PyValue when dynamic
+    lines = [
+        "def work(n, repeat):",
+        "    s = 0",
+        "    for r in range(repeat):",
+        "        for j in range(n * 2):",
+        "            s = s + j % 7",
+        "    return s",
+        "",
+        f"print(work({INNER // 2}, {iterations // INNER}))",
+    ]
+    if dynamic:
+        lines.append("print(work(\"x\", 0))")
+    return "\n".join(lines) + "\n"
+
+def run(directory, iterations, dynamic, hoisted):
+    code = generate(program(iterations, dynamic), max_specializations=0 if dynamic else 4)
+    if not hoisted:
+        code = HOISTED.sub(r"(int \1 = \2; \1 < \3;", code)
+    name = f"{'dynamic' if dynamic else 'typed'}_{'hoisted' if hoisted else 'header'}_{iterations}"
+    return best_time([build(directory, name, code)]) * 1e9 / iterations
+
+print(f"{'iterations':>11}{'int header':>12}{'int hoisted':>13}{'PyValue header':>16}{'PyValue hoisted':>17}")
+with tempfile.TemporaryDirectory() as directory:
+    for iterations in ITERATIONS:
+        times = [run(directory, iterations, dynamic, hoisted) for dynamic in (False, True) for hoisted in (False, True)]
+        # ns per iteration of the inner loop
+        print(f"{iterations:>11}" + "".join(f"{t:>{w}.2f}" for t, w in zip(times, (12, 13, 16, 17))))
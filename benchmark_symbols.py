@@ -0,0 +1,83 @@
+import sys
+import time
+from src.lexer import Lexer
+from src.parser import Parser
+from src.symbol_table import Symbol, SymbolTable
+from src.semantic import SemanticAnalyzer
+from src.visitor import Visitor
+
+# Nesting depths to compare, can be overridden from the command line
+DEPTHS = [int(n) for n in sys.argv[1:]] or [10, 50, 100]
+WIDTH = 50  # statements written at every level
+RUNS = 3
+
+def nested(depth):
+    # depth nested for loops and ifs, every level reads names of the levels around it
+    lines = ["x0 = 1"]
+    for d in range(depth):
+        pad = "    " * d
+        lines += [f"{pad}x{d + 1} = x{d} + x{d // 2} * {w}" for w in range(WIDTH)]
+        if d % 2:
+            lines.append(f"{pad}if x{d + 1} > x0:")
+        else:
+            lines.append(f"{pad}for i{d} in range({d + 1}):")
+    lines.append("    " * depth + "print(x0)")
+    return "\n".join(lines) + "\n"
+
+class FlatSymbolTable(SymbolTable):
+    # the table before the scope tree: one dict keyed by "scope::name" and a list of
+    # scope names, every lookup builds a key for every open scope
+    def __init__(self):
+        super().__init__()
+        self.symbols = {}
+        self.scopes = ['global']
+
+    def enter_scope(self, scope_name=None):
+        if scope_name is None:
+            self.scope_counter += 1
+            scope_name = f"scope_{self.scope_counter}"
+        self.scopes.append(scope_name)
+        self.current_scope = scope_name
+        return scope_name
+
+    def exit_scope(self):
+        if len(self.scopes) > 1:
+            self.scopes.pop()
+            self.current_scope = self.scopes[-1]
+
+    def insert(self, name, datatype, line=None, value=None, category='variable'):
+        key = f"{self.current_scope}::{name}"
+        self.symbols[key] = Symbol(name, datatype, self.current_scope, line, value, category)
+        return self.symbols[key]
+
+    def lookup(self, name):
+        for scope in reversed(self.scopes):
+            key = f"{scope}::{name}"
+            if key in self.symbols:
+                return self.symbols[key]
+        return None
+
+    def lookup_current_scope(self, name):
+        return self.symbols.get(f"{self.current_scope}::{name}")
+
+def kept(table):
+    # symbols still held by the table once generation is done
+    if isinstance(table, FlatSymbolTable):
+        return len(table.symbols)
+    return len(table.scope.symbols)
+
+print(f"{'depth':>6}{'table':>8}{'ms':>9}{'symbols kept':>14}")
+for depth in DEPTHS:
+    lexer = Lexer(errors=[])
+    lexer.build()
+    tree = Parser().parse(nested(depth), lexer)
+    for name, table_type in (("flat", FlatSymbolTable), ("tree", SymbolTable)):
+        best = None
+        for _ in range(RUNS):
+            table = table_type()
+            start = time.perf_counter()
+            semantics = SemanticAnalyzer(symbol_table=table).analyze(tree)
+            Visitor(semantics=semantics, parse_tree=tree).start()
+            seconds = time.perf_counter() - start
+            best = seconds if best is None else min(best, seconds)
+        print(f"{depth:>6}{name:>8}{best * 1000:>9.1f}{kept(table):>14}")
@@ -0,0 +1,39 @@
+import sys
+import tempfile
+from cpp_timing import best_time, build, generate
+
+# Depths of the recursion, can be overridden from the command line
+DEPTHS = [int(n) for n in sys.argv[1:]] or [10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+
+# a tail call and a sum left for after the call, both called once with the depth
+PROGRAMS = {
+    "tail": lambda depth: "\n".join([
+        "def total(n, acc):",
+        "    if n == 0:",
+        "        return acc",
+        "    return total(n - 1, acc + n % 7)",
+        "",
+        f"print(total({depth}, 0))",
+    ]) + "\n",
+    "accumulator": lambda depth: "\n".join([
+        "def total(n):",
+        "    if n == 0:",
+        "        return 0",
+        "    return total(n - 1) + n % 7",
+        "",
+        f"print(total({depth}))",
+    ]) + "\n",
+}
+
+def run(directory, program, depth, tail_calls):
+    name = f"{program}_{'loop' if tail_calls else 'calls'}_{depth}"
+    binary = build(directory, name, generate(PROGRAMS[program](depth), tail_calls=tail_calls))
+    # a recursion deeper than the stack ends the program with a signal
+    best = best_time([binary], check=False)
+    return "overflow" if best is None else f"{best * 1000:.1f}"
+
+print(f"{'depth':>9}{'tail ms':>10}{'loop ms':>10}{'accumulator ms':>16}{'loop ms':>10}")
+with tempfile.TemporaryDirectory() as directory:
+    for depth in DEPTHS:
+        times = [run(directory, program, depth, tail_calls) for program in PROGRAMS for tail_calls in (False, True)]
+        print(f"{depth:>9}" + "".join(f"{t:>{w}}" for t, w in zip(times, (10, 10, 16, 10))))
@@ -0,0 +1,34 @@
+import sys
+import time
+from src.lexer import Lexer
+from src.parser import Parser
+from src.semantic import SemanticAnalyzer
+from src.visitor import Visitor
+
+# Expression depths to compare, can be overridden from the command line
+DEPTHS = [int(n) for n in sys.argv[1:]] or [25, 50, 100, 200]
+RUNS = 5
+
+def nested(depth):
+    # a parameter (std::any) added to a right nested expression, every level is cast
+    # to the type of the expression on its right
+    expression = "1"
+    for _ in range(depth):
+        expression = f"p + ({expression})"
+    return f"def f(p):\n    x = {expression}\n    return x\n\nprint(f(1))\n"
+
+print(f"{'depth':>6}{'analysis ms':>13}{'codegen ms':>12}")
+for depth in DEPTHS:
+    lexer = Lexer(errors=[])
+    lexer.build()
+    tree = Parser().parse(nested(depth), lexer)
+    analysis = codegen = None
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        semantics = SemanticAnalyzer().analyze(tree)
+        middle = time.perf_counter()
+        Visitor(semantics=semantics, parse_tree=tree).start()
+        end = time.perf_counter()
+        analysis = middle - start if analysis is None else min(analysis, middle - start)
+        codegen = end - middle if codegen is None else min(codegen, end - middle)
+    print(f"{depth:>6}{analysis * 1000:>13.2f}{codegen * 1000:>12.2f}")
@@ -0,0 +1,34 @@
+import sys
+import time
+from src.lexer import Lexer
+from src.parser import Parser
+from src.visitor import Visitor
+
+# Nesting depths to compare, can be overridden from the command line
+DEPTHS = [int(n) for n in sys.argv[1:]] or [10, 50, 100]
+WIDTH = 200  # statements written at every level
+RUNS = 3
+
+def nested(depth):
+    # depth nested for loops with WIDTH prints before each one
+    lines = []
+    for d in range(depth):
+        pad = "    " * d
+        lines += [f"{pad}print({d} + {w})" for w in range(WIDTH)]
+        lines.append(f"{pad}for i{d} in range({d + 1}):")
+    lines.append("    " * depth + "print(0)")
+    return "\n".join(lines) + "\n"
+
+print(f"{'depth':>6}{'output KB':>11}{'ms':>9}{'us/KB':>8}")
+for depth in DEPTHS:
+    lexer = Lexer(errors=[])
+    lexer.build()
+    tree = Parser().parse(nested(depth), lexer)
+    best = None
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        code = Visitor(parse_tree=tree).start()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    # linear emission keeps the cost per KB of output flat across depths
+    print(f"{depth:>6}{len(code) / 1024:>11.0f}{best * 1000:>9.1f}{best * 1e6 / (len(code) / 1024):>8.1f}")
@@ -0,0 +1,52 @@
+import os
+import subprocess
+import time
+from src.lexer import Lexer
+from src.optimizer import DeadCodeEliminator
+from src.parser import Parser
+from src.semantic import SemanticAnalyzer
+from src.visitor import Visitor
+
+# Compiles generated C++ with g++ -O2 and times it, shared by the benchmark_*.py scripts
+RUNS = 3
+HEADERS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tests")
+
+def generate(source, max_specializations=SemanticAnalyzer.MAX_SPECIALIZATIONS, eliminate=False, **options):
+    # C++ of a program, without its dead code when eliminate, options are the ones of Visitor
+    lexer = Lexer(errors=[])
+    lexer.build()
+    tree = Parser().parse(source, lexer)
+    if eliminate:
+        tree = DeadCodeEliminator().eliminate(tree)
+    semantics = SemanticAnalyzer(max_specializations=max_specializations).analyze(tree)
+    return Visitor(semantics=semantics, parse_tree=tree, **options).start()
+
+def write_source(directory, name, code):
+    # (source, binary) paths of name in directory, with code written to the source
+    source = os.path.join(directory, f"{name}.cpp")
+    with open(source, "w") as file:
+        file.write(code)
+    return source, os.path.join(directory, name)
+
+def compile_command(source, binary):
+    return ["g++", "-std=c++17", "-O2", f"-I{HEADERS}", source, "-o", binary]
+
+def build(directory, name, code):
+    # compiled binary of code
+    source, binary = write_source(directory, name, code)
+    subprocess.run(compile_command(source, binary), check=True)
+    return binary
+
+def best_time(command, output=None, check=True):
+    # shortest wall time in seconds of RUNS runs of command, its output written to the file
+    # output or discarded, None when a run fails and not check
+    best = None
+    for _ in range(RUNS):
+        with open(output or os.devnull, "w") as file:
+            start = time.perf_counter()
+            returncode = subprocess.run(command, check=check, stdout=file).returncode
+            seconds = time.perf_counter() - start
+        if returncode != 0:
+            return None
+        best = seconds if best is None else min(best, seconds)
+    return best
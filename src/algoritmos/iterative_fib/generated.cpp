@@ -1,21 +1,20 @@
-#include<any>
 #include<cmath>
 #include<iostream>
 #include<vector>
 #include<map>
 #include "utilities.hpp"
 
-auto fib(std::any n) {
+int fib(int n) {
     int a = 0;
     int b = 1;
     int c = 0;
-    if (std::any_cast<int>(n) == 0) {
+    if (n == 0) {
         return 0;
     }
-    else if (std::any_cast<int>(n) == 1) {
+    else if (n == 1) {
         return 1;
     }
-    for (int i = 0; i < std::any_cast<int>(n); i++) {
+    for (int i = 0, i__stop = n; i < i__stop; i++) {
         c = a + b;
         b = a;
         a = c;
@@ -28,7 +27,7 @@ auto fib(std::any n) {
 
 int main() {
     for (int i = 0; i < 50; i++) {
-        std::cout << fib(i) << std::endl;
+        print(fib(i));
 
     }
     return 0;
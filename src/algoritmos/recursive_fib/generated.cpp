@@ -1,18 +1,25 @@
-#include<any>
 #include<cmath>
 #include<iostream>
 #include<vector>
 #include<map>
 #include "utilities.hpp"
 
-auto fibonacci(std::any n) {
-    if (std::any_cast<int>(n) == 0) {
+int fibonacci__uncached(int n);
+int fibonacci(int n) {
+    static Memo<int, int> memo;
+    if (const int* value = memo.find(n)) {
+        return *value;
+    }
+    return memo.store(fibonacci__uncached(n), n);
+}
+int fibonacci__uncached(int n) {
+    if (n == 0) {
         return 0;
     }
-    else if (std::any_cast<int>(n) == 1) {
+    else if (n == 1) {
         return 1;
     }
-    int res = fibonacci(std::any_cast<int>(n) - 1) + fibonacci(std::any_cast<int>(n) - 2);
+    int res = fibonacci(n - 1) + fibonacci(n - 2);
 
     return res;
 }
@@ -20,7 +27,7 @@ auto fibonacci(std::any n) {
 
 int main() {
     for (int i = 0; i < 50; i++) {
-        std::cout << fibonacci(i) << std::endl;
+        print(fibonacci(i));
 
     }
     return 0;
@@ -1,15 +1,435 @@
 #ifndef UTILITIES_HPP
 #define UTILITIES_HPP
 
+#include <algorithm>
+#include <charconv>
+#include <cmath>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <exception>
 #include <iostream>
+#include <map>
+#include <optional>
+#include <stdexcept>
+#include <string>
+#include <tuple>
+#include <type_traits>
+#include <unordered_map>
+#include <utility>
 #include <vector>
-#include <any>
 
-// Sobrecarga para std::vector<int> (arrays normales)
-std::ostream& operator<<(std::ostream& os, const std::vector<int>& vec) {
+// Valor dinámico de Python, el tipo del código generado para todo lo que no tiene un tipo fijo.
+// int, float, bool y None se guardan dentro del propio valor, str, list y dict en un objeto
+// del heap compartido entre copias con un contador de referencias, como en Python.
+class PyValue {
+public:
+    enum Tag : unsigned char { NONE, BOOL, INT, FLOAT, STR, LIST, DICT };
+    using List = std::vector<PyValue>;
+    using Dict = std::map<std::string, PyValue>;
+
+    PyValue() : tag(NONE), i(0) {}
+    PyValue(bool value) : tag(BOOL), b(value) {}
+    PyValue(int value) : tag(INT), i(value) {}
+    PyValue(double value) : tag(FLOAT), f(value) {}
+    PyValue(const char* value) : PyValue(std::string(value)) {}
+    PyValue(std::string value) : tag(STR), object(new Str(std::move(value))) {}
+    PyValue(List value) : tag(LIST), object(new ListObject(std::move(value))) {}
+    PyValue(Dict value) : tag(DICT), object(new DictObject(std::move(value))) {}
+    // las listas tipadas se copian a una lista de valores
+    template <typename T>
+    PyValue(const std::vector<T>& value) : PyValue(List(value.begin(), value.end())) {}
+
+    PyValue(const PyValue& other) : tag(other.tag) {
+        copy(other);
+        if (tag >= STR) {
+            object->refs++;
+        }
+    }
+    PyValue(PyValue&& other) noexcept : tag(other.tag) {
+        copy(other);
+        other.tag = NONE;
+    }
+    PyValue& operator=(PyValue other) noexcept {
+        std::swap(tag, other.tag);
+        std::swap(bits, other.bits);
+        return *this;
+    }
+    ~PyValue() {
+        if (tag >= STR && --object->refs == 0) {
+            delete object;
+        }
+    }
+
+    Tag type() const { return tag; }
+    int integer() const { return i; }  // sin mirar la etiqueta, solo si es INT
+    bool is_number() const { return tag == BOOL || tag == INT || tag == FLOAT; }
+    std::string& str() const { return static_cast<Str*>(expect(STR, "str"))->value; }
+    List& list() const { return static_cast<ListObject*>(expect(LIST, "list"))->value; }
+    Dict& dict() const { return static_cast<DictObject*>(expect(DICT, "dict"))->value; }
+
+    // conversiones explícitas, bool es la veracidad de Python
+    explicit operator int() const {
+        if (tag == INT) {
+            return i;
+        }
+        switch (tag) {
+            case BOOL: return b;
+            case INT: return i;
+            case FLOAT: return static_cast<int>(f);
+            default: throw type_error("int() argument");
+        }
+    }
+    explicit operator double() const {
+        switch (tag) {
+            case BOOL: return b;
+            case INT: return i;
+            case FLOAT: return f;
+            default: throw type_error("float() argument");
+        }
+    }
+    explicit operator bool() const {
+        switch (tag) {
+            case NONE: return false;
+            case BOOL: return b;
+            case INT: return i != 0;
+            case FLOAT: return f != 0;
+            case STR: return !str().empty();
+            case LIST: return !list().empty();
+            default: return !dict().empty();
+        }
+    }
+    explicit operator std::string() const { return str(); }
+
+    // índices negativos desde el final, como en Python
+    PyValue& operator[](int at) const {
+        if (tag == LIST) {
+            List& items = static_cast<ListObject*>(object)->value;
+            if (static_cast<size_t>(at) < items.size()) {
+                return items[at];
+            }
+        }
+        return item(at);
+    }
+    PyValue& operator[](const PyValue& index) const {
+        switch (tag) {
+            case LIST: return (*this)[static_cast<int>(index)];
+            case DICT: return dict()[index.str()];
+            default: throw type_error("object is not subscriptable");
+        }
+    }
+    PyValue& operator[](const char* key) const { return dict()[key]; }
+
+    std::runtime_error type_error(const char* what) const {
+        return std::runtime_error(std::string("TypeError: ") + what + " of type " + name());
+    }
+
+    const char* name() const {
+        switch (tag) {
+            case NONE: return "NoneType";
+            case BOOL: return "bool";
+            case INT: return "int";
+            case FLOAT: return "float";
+            case STR: return "str";
+            case LIST: return "list";
+            default: return "dict";
+        }
+    }
+
+private:
+    struct Object {
+        long refs = 1;
+        virtual ~Object() {}
+    };
+    struct Str : Object {
+        std::string value;
+        explicit Str(std::string value) : value(std::move(value)) {}
+    };
+    struct ListObject : Object {
+        List value;
+        explicit ListObject(List value) : value(std::move(value)) {}
+    };
+    struct DictObject : Object {
+        Dict value;
+        explicit DictObject(Dict value) : value(std::move(value)) {}
+    };
+
+    Object* expect(Tag expected, const char* what) const {
+        if (tag != expected) {
+            throw type_error((std::string("expected ") + what + ", got an object").c_str());
+        }
+        return object;
+    }
+
+    void copy(const PyValue& other) { bits = other.bits; }
+
+    // el resto de los índices, fuera del camino rápido de operator[]
+    PyValue& item(int at) const {
+        if (tag != LIST) {
+            return (*this)[PyValue(at)];
+        }
+        List& items = list();
+        if (at < 0) {
+            at += static_cast<int>(items.size());
+        }
+        if (at < 0 || at >= static_cast<int>(items.size())) {
+            throw std::out_of_range("IndexError: list index out of range");
+        }
+        return items[at];
+    }
+
+    Tag tag;
+    union {
+        bool b;
+        int i;
+        double f;
+        Object* object;
+        long long bits;  // todo el valor, para copiarlo sin mirar la etiqueta
+    };
+};
+
+const PyValue None;
+
+// operaciones aritméticas de Python: / siempre da float, // y % redondean hacia abajo
+inline PyValue arithmetic(char op, const PyValue& a, const PyValue& b) {
+    bool numbers = a.is_number() && b.is_number();
+    bool floats = numbers && (a.type() == PyValue::FLOAT || b.type() == PyValue::FLOAT);
+    switch (numbers ? (floats ? PyValue::FLOAT : PyValue::INT) : PyValue::NONE) {
+        case PyValue::INT: {
+            int x = static_cast<int>(a), y = static_cast<int>(b);
+            switch (op) {
+                case '+': return x + y;
+                case '-': return x - y;
+                case '*': return x * y;
+                case '/':
+                    if (y == 0) throw std::runtime_error("ZeroDivisionError: division by zero");
+                    return static_cast<double>(x) / y;
+                case 'f':
+                case '%': {
+                    if (y == 0) throw std::runtime_error("ZeroDivisionError: integer division or modulo by zero");
+                    int q = x / y, r = x % y;
+                    if (r != 0 && ((r < 0) != (y < 0))) {
+                        q--;
+                        r += y;
+                    }
+                    return op == 'f' ? q : r;
+                }
+                case 'p':
+                    if (y < 0) return std::pow(static_cast<double>(x), y);
+                    return static_cast<int>(std::pow(static_cast<double>(x), y));
+            }
+            break;
+        }
+        case PyValue::FLOAT: {
+            double x = static_cast<double>(a), y = static_cast<double>(b);
+            if (y == 0 && (op == '/' || op == 'f' || op == '%')) {
+                throw std::runtime_error("ZeroDivisionError: float division by zero");
+            }
+            switch (op) {
+                case '+': return x + y;
+                case '-': return x - y;
+                case '*': return x * y;
+                case '/': return x / y;
+                case 'f': return std::floor(x / y);
+                case '%': return x - std::floor(x / y) * y;
+                case 'p': return std::pow(x, y);
+            }
+            break;
+        }
+        default:
+            if (op == '+' && a.type() == PyValue::STR && b.type() == PyValue::STR) {
+                return a.str() + b.str();
+            }
+            if (op == '+' && a.type() == PyValue::LIST && b.type() == PyValue::LIST) {
+                PyValue::List items = a.list();
+                items.insert(items.end(), b.list().begin(), b.list().end());
+                return items;
+            }
+            if (op == '*' && a.type() == PyValue::STR && b.type() == PyValue::INT) {
+                std::string text;
+                for (int n = static_cast<int>(b); n > 0; n--) {
+                    text += a.str();
+                }
+                return text;
+            }
+    }
+    throw std::runtime_error(std::string("TypeError: unsupported operand types for ") + op + ": '" +
+                             a.name() + "' and '" + b.name() + "'");
+}
+
+// dos int, el caso más común, se resuelven sin llamar a arithmetic
+inline PyValue operator+(const PyValue& a, const PyValue& b) {
+    if (a.type() == PyValue::INT && b.type() == PyValue::INT) {
+        return a.integer() + b.integer();
+    }
+    return arithmetic('+', a, b);
+}
+inline PyValue operator-(const PyValue& a, const PyValue& b) {
+    if (a.type() == PyValue::INT && b.type() == PyValue::INT) {
+        return a.integer() - b.integer();
+    }
+    return arithmetic('-', a, b);
+}
+inline PyValue operator*(const PyValue& a, const PyValue& b) {
+    if (a.type() == PyValue::INT && b.type() == PyValue::INT) {
+        return a.integer() * b.integer();
+    }
+    return arithmetic('*', a, b);
+}
+inline PyValue operator/(const PyValue& a, const PyValue& b) { return arithmetic('/', a, b); }
+inline PyValue operator%(const PyValue& a, const PyValue& b) { return arithmetic('%', a, b); }
+inline PyValue floordiv(const PyValue& a, const PyValue& b) { return arithmetic('f', a, b); }
+inline PyValue power(const PyValue& a, const PyValue& b) { return arithmetic('p', a, b); }
+inline PyValue operator-(const PyValue& a) { return arithmetic('-', 0, a); }
+inline PyValue& operator+=(PyValue& a, const PyValue& b) { return a = a + b; }
+inline PyValue& operator-=(PyValue& a, const PyValue& b) { return a = a - b; }
+inline PyValue& operator*=(PyValue& a, const PyValue& b) { return a = a * b; }
+inline PyValue& operator/=(PyValue& a, const PyValue& b) { return a = a / b; }
+inline PyValue mod(const PyValue& a, const PyValue& b) { return a % b; }
+
+// //, % y ** de Python entre números de tipo fijo: // y % redondean hacia abajo,
+// y dos int dan un int, como a los PyValue
+template <typename A, typename B>
+using Numbers = std::enable_if_t<std::is_arithmetic_v<A> && std::is_arithmetic_v<B>>;
+
+template <typename A, typename B, typename = Numbers<A, B>>
+auto floordiv(A a, B b) {
+    if constexpr (std::is_integral_v<A> && std::is_integral_v<B>) {
+        int x = a, y = b;
+        int q = x / y;
+        return (x % y != 0 && ((x % y < 0) != (y < 0))) ? q - 1 : q;
+    } else {
+        return std::floor(static_cast<double>(a) / b);
+    }
+}
+
+template <typename A, typename B, typename = Numbers<A, B>>
+auto mod(A a, B b) {
+    if constexpr (std::is_integral_v<A> && std::is_integral_v<B>) {
+        int x = a, y = b;
+        int r = x % y;
+        return (r != 0 && ((r < 0) != (y < 0))) ? r + y : r;
+    } else {
+        double x = a, y = b;
+        double r = std::fmod(x, y);
+        return (r != 0 && ((r < 0) != (y < 0))) ? r + y : r;
+    }
+}
+
+template <typename A, typename B, typename = Numbers<A, B>>
+auto power(A a, B b) {
+    if constexpr (std::is_integral_v<A> && std::is_integral_v<B>) {
+        // por cuadrados, sin signo para que el desbordamiento dé la vuelta como el de +, - y *
+        unsigned base = static_cast<int>(a), result = 1;
+        for (int e = b; e > 0; e >>= 1) {
+            if (e & 1) {
+                result *= base;
+            }
+            base *= base;
+        }
+        // el código generado solo llega aquí con un exponente literal no negativo, con
+        // cualquier otro el resultado puede ser float y se calcula en PyValue
+        return b < 0 ? static_cast<int>(std::pow(static_cast<double>(a), b)) : static_cast<int>(result);
+    } else {
+        return std::pow(static_cast<double>(a), static_cast<double>(b));
+    }
+}
+
+// el paso de range() se evalúa una vez antes del bucle y, como en Python, no puede ser 0
+inline int range_step(int step) {
+    if (step == 0) {
+        throw std::invalid_argument("ValueError: range() arg 3 must not be zero");
+    }
+    return step;
+}
+
+// un carácter de una cadena es una cadena de largo 1, con índices negativos desde el final
+inline std::string str_item(const std::string& text, int at) {
+    if (at < 0) {
+        at += static_cast<int>(text.size());
+    }
+    if (at < 0 || at >= static_cast<int>(text.size())) {
+        throw std::out_of_range("IndexError: string index out of range");
+    }
+    return std::string(1, text[at]);
+}
+
+// comparaciones de Python: los números entre sí, str y list por orden lexicográfico
+inline int compare(const PyValue& a, const PyValue& b) {
+    if (a.is_number() && b.is_number()) {
+        if (a.type() != PyValue::FLOAT && b.type() != PyValue::FLOAT) {
+            int x = static_cast<int>(a), y = static_cast<int>(b);
+            return (x > y) - (x < y);
+        }
+        double x = static_cast<double>(a), y = static_cast<double>(b);
+        return (x > y) - (x < y);
+    }
+    if (a.type() == b.type()) {
+        switch (a.type()) {
+            case PyValue::STR: return a.str().compare(b.str());
+            case PyValue::LIST: {
+                const PyValue::List& x = a.list();
+                const PyValue::List& y = b.list();
+                for (size_t n = 0; n < x.size() && n < y.size(); n++) {
+                    if (int order = compare(x[n], y[n])) {
+                        return order;
+                    }
+                }
+                return (x.size() > y.size()) - (x.size() < y.size());
+            }
+            default: break;
+        }
+    }
+    throw std::runtime_error(std::string("TypeError: '<' not supported between instances of '") +
+                             a.name() + "' and '" + b.name() + "'");
+}
+
+inline bool operator==(const PyValue& a, const PyValue& b) {
+    if (a.is_number() && b.is_number()) {
+        return compare(a, b) == 0;
+    }
+    if (a.type() != b.type()) {
+        return false;
+    }
+    switch (a.type()) {
+        case PyValue::NONE: return true;
+        case PyValue::STR: return a.str() == b.str();
+        case PyValue::LIST: return a.list() == b.list();
+        case PyValue::DICT: return a.dict() == b.dict();
+        default: return false;
+    }
+}
+
+inline bool operator!=(const PyValue& a, const PyValue& b) { return !(a == b); }
+inline bool operator<(const PyValue& a, const PyValue& b) { return compare(a, b) < 0; }
+inline bool operator<=(const PyValue& a, const PyValue& b) { return compare(a, b) <= 0; }
+inline bool operator>(const PyValue& a, const PyValue& b) { return compare(a, b) > 0; }
+inline bool operator>=(const PyValue& a, const PyValue& b) { return compare(a, b) >= 0; }
+
+std::ostream& operator<<(std::ostream& os, const PyValue& value);
+
+// Los elementos de una lista o un diccionario se escriben como en Python, las cadenas entre comillas
+template <typename T>
+std::ostream& repr(std::ostream& os, const T& value) {
+    return os << value;
+}
+inline std::ostream& repr(std::ostream& os, const std::string& value) {
+    return os << "'" << value << "'";
+}
+inline std::ostream& repr(std::ostream& os, const PyValue& value) {
+    if (value.type() == PyValue::STR) {
+        return repr(os, value.str());
+    }
+    return os << value;
+}
+
+// Sobrecarga para std::vector<int>, std::vector<double>, std::vector<std::string> (listas tipadas)
+// y std::vector<PyValue> (listas de valores)
+template <typename T>
+std::ostream& operator<<(std::ostream& os, const std::vector<T>& vec) {
     os << "[";
     for (size_t i = 0; i < vec.size(); i++) {
-        os << vec[i];
+        repr(os, vec[i]);
         if (i < vec.size() - 1) {
             os << ", ";
         }
@@ -18,55 +438,256 @@ std::ostream& operator<<(std::ostream& os, const std::vector<int>& vec) {
     return os;
 }
 
-// Sobrecarga para std::vector<std::any>
-std::ostream& operator<<(std::ostream& os, const std::vector<std::any>& vec) {
-    os << "[";
-    for (size_t i = 0; i < vec.size(); i++) {
-        try {
-            os << std::any_cast<int>(vec[i]);
-        } catch (const std::bad_any_cast&) {
-            try {
-                os << std::any_cast<double>(vec[i]);
-            } catch (const std::bad_any_cast&) {
-                try {
-                    os << std::any_cast<std::string>(vec[i]);
-                } catch (const std::bad_any_cast&) {
-                    os << "?";
-                }
-            }
-        }
-        if (i < vec.size() - 1) {
+// Sobrecarga para std::map<std::string, PyValue> (diccionarios)
+template <typename T>
+std::ostream& operator<<(std::ostream& os, const std::map<std::string, T>& map) {
+    os << "{";
+    for (auto it = map.begin(); it != map.end(); ++it) {
+        if (it != map.begin()) {
             os << ", ";
         }
+        repr(os, it->first) << ": ";
+        repr(os, it->second);
     }
-    os << "]";
+    os << "}";
     return os;
 }
 
-// Sobrecarga para std::any (intenta extraer y mostrar el contenido)
-std::ostream& operator<<(std::ostream& os, const std::any& a) {
-    try {
-        os << std::any_cast<std::vector<std::any>>(a);
-    } catch (const std::bad_any_cast&) {
-        try {
-            os << std::any_cast<std::vector<int>>(a);
-        } catch (const std::bad_any_cast&) {
-            try {
-                os << std::any_cast<int>(a);
-            } catch (const std::bad_any_cast&) {
-                try {
-                    os << std::any_cast<double>(a);
-                } catch (const std::bad_any_cast&) {
-                    try {
-                        os << std::any_cast<std::string>(a);
-                    } catch (const std::bad_any_cast&) {
-                        os << "[any]";
-                    }
-                }
+// Sobrecarga para PyValue, según su etiqueta
+std::ostream& operator<<(std::ostream& os, const PyValue& value) {
+    switch (value.type()) {
+        case PyValue::NONE: return os << "None";
+        case PyValue::BOOL: return os << (static_cast<bool>(value) ? "True" : "False");
+        case PyValue::INT: return os << static_cast<int>(value);
+        case PyValue::FLOAT: return os << static_cast<double>(value);
+        case PyValue::STR: return os << value.str();
+        case PyValue::LIST: return os << value.list();
+        default: return os << value.dict();
+    }
+}
+
+// Salida con un buffer propio, para los programas que escriben muchas líneas.
+// std::cout con std::endl vacía el buffer en cada línea, esta salida solo cuando se llena,
+// con flush() o al terminar el programa, también si termina por una excepción.
+class Output {
+public:
+    static const size_t CAPACITY = 1 << 16;
+
+    Output() { previous = std::set_terminate(terminate); }
+    ~Output() { flush(); }
+
+    void write(const char* data, size_t size) {
+        if (length + size > CAPACITY) {
+            flush();
+            if (size > CAPACITY) {
+                std::fwrite(data, 1, size, stdout);
+                return;
             }
         }
+        std::memcpy(buffer + length, data, size);
+        length += size;
     }
-    return os;
+    void put(char c) {
+        if (length == CAPACITY) {
+            flush();
+        }
+        buffer[length++] = c;
+    }
+    void flush() {
+        std::fwrite(buffer, 1, length, stdout);
+        std::fflush(stdout);
+        length = 0;
+    }
+
+private:
+    static void terminate();
+    static std::terminate_handler previous;
+
+    char buffer[CAPACITY];
+    size_t length = 0;
+};
+
+inline Output buffered_stdout;
+inline std::terminate_handler Output::previous = nullptr;
+
+inline void Output::terminate() {
+    buffered_stdout.flush();
+    previous();
 }
 
-#endif // UTILITIES_HPP
\ No newline at end of file
+// Escritura de cada tipo como la hace print de Python, elegida al compilar
+inline void format(Output& out, const char* value) { out.write(value, std::strlen(value)); }
+inline void format(Output& out, const std::string& value) { out.write(value.data(), value.size()); }
+inline void format(Output& out, bool value) { format(out, value ? "True" : "False"); }
+inline void format(Output& out, int value) {
+    char text[16];
+    out.write(text, std::to_chars(text, text + sizeof(text), value).ptr - text);
+}
+
+// float con el menor número de dígitos que lo recupera, en notación científica
+// si el exponente es menor que -4 o mayor que 15, como repr de Python
+inline void format(Output& out, double value) {
+    if (std::isnan(value)) {
+        return format(out, "nan");
+    }
+    if (std::isinf(value)) {
+        return format(out, value < 0 ? "-inf" : "inf");
+    }
+    char text[32];
+    char* end = std::to_chars(text, text + sizeof(text) - 1, value, std::chars_format::scientific).ptr;
+    *end = '\0';
+    char* e = std::find(text, end, 'e');
+    int exponent = std::atoi(e + 1);
+    if (exponent < -4 || exponent > 15) {
+        out.write(text, e - text);
+        char tail[8];
+        int size = std::snprintf(tail, sizeof(tail), "e%c%02d", exponent < 0 ? '-' : '+', std::abs(exponent));
+        return out.write(tail, size);
+    }
+    // los dígitos sin el punto, y el punto movido según el exponente
+    std::string digits;
+    for (char* c = text; c != e; c++) {
+        if (*c >= '0' && *c <= '9') {
+            digits += *c;
+        }
+    }
+    if (std::signbit(value)) {
+        out.put('-');
+    }
+    if (exponent < 0) {
+        format(out, "0.");
+        out.write(std::string(-exponent - 1, '0').data(), -exponent - 1);
+        return format(out, digits);
+    }
+    if (digits.size() <= static_cast<size_t>(exponent) + 1) {
+        digits.resize(exponent + 1, '0');
+        format(out, digits);
+        return format(out, ".0");
+    }
+    out.write(digits.data(), exponent + 1);
+    out.put('.');
+    out.write(digits.data() + exponent + 1, digits.size() - exponent - 1);
+}
+
+inline void format(Output& out, const PyValue& value);
+
+// Los elementos de una lista o un diccionario, las cadenas entre comillas
+template <typename T>
+void repr(Output& out, const T& value) {
+    format(out, value);
+}
+inline void repr(Output& out, const std::string& value) {
+    out.put('\'');
+    format(out, value);
+    out.put('\'');
+}
+inline void repr(Output& out, const PyValue& value) {
+    if (value.type() == PyValue::STR) {
+        return repr(out, value.str());
+    }
+    format(out, value);
+}
+
+template <typename T>
+void format(Output& out, const std::vector<T>& vec) {
+    out.put('[');
+    for (size_t i = 0; i < vec.size(); i++) {
+        if (i > 0) {
+            format(out, ", ");
+        }
+        repr(out, vec[i]);
+    }
+    out.put(']');
+}
+
+template <typename T>
+void format(Output& out, const std::map<std::string, T>& map) {
+    out.put('{');
+    for (auto it = map.begin(); it != map.end(); ++it) {
+        if (it != map.begin()) {
+            format(out, ", ");
+        }
+        repr(out, it->first);
+        format(out, ": ");
+        repr(out, it->second);
+    }
+    out.put('}');
+}
+
+inline void format(Output& out, const PyValue& value) {
+    switch (value.type()) {
+        case PyValue::NONE: return format(out, "None");
+        case PyValue::BOOL: return format(out, static_cast<bool>(value));
+        case PyValue::INT: return format(out, static_cast<int>(value));
+        case PyValue::FLOAT: return format(out, static_cast<double>(value));
+        case PyValue::STR: return format(out, value.str());
+        case PyValue::LIST: return format(out, value.list());
+        default: return format(out, value.dict());
+    }
+}
+
+// print de Python sobre la salida con buffer
+template <typename T>
+void print(const T& value) {
+    format(buffered_stdout, value);
+    buffered_stdout.put('\n');
+}
+
+// Resultados de una función pura y recursiva por sus argumentos (int, double, bool o
+// std::string). Con un solo int entre 0 y DIRECT el resultado se guarda en un arreglo
+// indexado por él, los demás en una tabla hash que se vacía al llegar a LIMIT entradas,
+// así la memoria queda acotada.
+template <typename R, typename... A>
+class Memo {
+public:
+    static const int DIRECT = 1 << 16;
+    static const size_t LIMIT = 1 << 20;
+
+    const R* find(const A&... args) const {
+        if constexpr (INDEXED) {
+            int at = (args, ...);
+            if (at >= 0 && at < static_cast<int>(direct.size())) {
+                return direct[at] ? &*direct[at] : nullptr;
+            }
+        }
+        auto it = values.find(Key(args...));
+        return it != values.end() ? &it->second : nullptr;
+    }
+
+    R store(R value, const A&... args) {
+        if constexpr (INDEXED) {
+            int at = (args, ...);
+            if (at >= 0 && at < DIRECT) {
+                if (at >= static_cast<int>(direct.size())) {
+                    direct.resize(at + 1);
+                }
+                direct[at] = value;
+                return value;
+            }
+        }
+        if (values.size() >= LIMIT) {
+            values.clear();
+        }
+        values.emplace(Key(args...), value);
+        return value;
+    }
+
+private:
+    static constexpr bool INDEXED = sizeof...(A) == 1 && (std::is_same_v<A, int> && ...);
+    using Key = std::tuple<A...>;
+
+    struct Hash {
+        size_t operator()(const Key& key) const {
+            size_t seed = 0;
+            std::apply([&seed](const auto&... arg) {
+                ((seed = seed * 1000003 ^ std::hash<std::decay_t<decltype(arg)>>()(arg)), ...);
+            }, key);
+            return seed;
+        }
+    };
+
+    std::vector<std::optional<R>> direct;
+    std::unordered_map<Key, R, Hash> values;
+};
+
+#endif // UTILITIES_HPP
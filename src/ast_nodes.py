@@ -0,0 +1,373 @@
+# Typed AST built by the parser
+# Every node class has __slots__, an integer kind (its index in NODE_TYPES) used by
+# the visitor to dispatch through a table, and the line and column where it starts,
+# counted like SourceMap.line_col (line from 1, column from 0).
+# Nodes that start with a plain name or value (assignments, binary operations)
+# are placed at their operator, an Argument made of a plain value has line 0.
+# Names, literals, lists and dicts are kept as plain Python values.
+
+class Node:
+    __slots__ = ('line', 'column')
+    fields = ()
+    kind = None  # set from NODE_TYPES below
+    tag = None  # name of the visitor method, visitor_<tag>
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(repr(getattr(self, f)) for f in self.fields)})"
+
+
+#################
+#   ACCESSES    #
+#################
+
+class ClassAttribute(Node):
+    # object.attr
+    __slots__ = fields = ('obj', 'attr')
+    tag = 'class_attribute'
+
+    def __init__(self, obj, attr, line=0, column=0):
+        self.obj = obj
+        self.attr = attr
+        self.line = line
+        self.column = column
+
+class AccessId(Node):
+    # name[index] or name[index:stop]
+    __slots__ = fields = ('name', 'index', 'stop')
+    tag = 'access_id'
+
+    def __init__(self, name, index, stop=None, line=0, column=0):
+        self.name = name
+        self.index = index
+        self.stop = stop
+        self.line = line
+        self.column = column
+
+class Next(Node):
+    # next(iterator)
+    __slots__ = fields = ('iterator',)
+    tag = 'next'
+
+    def __init__(self, iterator, line=0, column=0):
+        self.iterator = iterator
+        self.line = line
+        self.column = column
+
+class NumberToString(Node):
+    # str(number)
+    __slots__ = fields = ('value',)
+    tag = 'number_to_string'
+
+    def __init__(self, value, line=0, column=0):
+        self.value = value
+        self.line = line
+        self.column = column
+
+
+##################
+#   OPERATIONS   #
+##################
+
+class BinaryOperation(Node):
+    # left op right
+    __slots__ = fields = ('left', 'op', 'right')
+
+    def __init__(self, left, op, right, line=0, column=0):
+        self.left = left
+        self.op = op
+        self.right = right
+        self.line = line
+        self.column = column
+
+class ArithmeticOperation(BinaryOperation):
+    # + - * / // % **
+    __slots__ = ()
+    tag = 'arithmetic_operation'
+
+class LogicalOperation(BinaryOperation):
+    # and or
+    __slots__ = ()
+    tag = 'logical_operation'
+
+class RelationalOperation(BinaryOperation):
+    # == != < > <= >=
+    __slots__ = ()
+    tag = 'relational_operation'
+
+class UnaryOperation(Node):
+    # not operand, op is 'NOT'
+    __slots__ = fields = ('op', 'operand')
+    tag = 'unary_operation'
+
+    def __init__(self, op, operand, line=0, column=0):
+        self.op = op
+        self.operand = operand
+        self.line = line
+        self.column = column
+
+class CheckInCollection(Node):
+    # item in collection
+    __slots__ = fields = ('item', 'collection')
+    tag = 'check_in_collection'
+
+    def __init__(self, item, collection, line=0, column=0):
+        self.item = item
+        self.collection = collection
+        self.line = line
+        self.column = column
+
+
+###################
+#   ASSIGNMENTS   #
+###################
+
+class Assignment(Node):
+    # target = value
+    __slots__ = fields = ('target', 'op', 'value')
+    tag = 'simple_assignment_operation'
+
+    def __init__(self, target, op, value, line=0, column=0):
+        self.target = target
+        self.op = op
+        self.value = value
+        self.line = line
+        self.column = column
+
+class AugmentedAssignment(Assignment):
+    # target += number, and the other assignment symbols
+    __slots__ = ()
+    tag = 'assignment_operation'
+
+class ArrayAssignment(Assignment):
+    # target = [...] or (...) or a set
+    __slots__ = ()
+    tag = 'array_assignment'
+
+class DictAssignment(Assignment):
+    # target = {...}
+    __slots__ = ()
+    tag = 'dict_assignment'
+
+class IterAssignment(Node):
+    # target = iter(value)
+    __slots__ = fields = ('target', 'value')
+    tag = 'iter_assignment'
+
+    def __init__(self, target, value, line=0, column=0):
+        self.target = target
+        self.value = value
+        self.line = line
+        self.column = column
+
+class Append(Node):
+    # target.append(value)
+    __slots__ = fields = ('target', 'value')
+    tag = 'append'
+
+    def __init__(self, target, value, line=0, column=0):
+        self.target = target
+        self.value = value
+        self.line = line
+        self.column = column
+
+class Print(Node):
+    # print(value)
+    __slots__ = fields = ('value',)
+    tag = 'print_call'
+
+    def __init__(self, value, line=0, column=0):
+        self.value = value
+        self.line = line
+        self.column = column
+
+
+#################
+#   FUNCTIONS   #
+#################
+
+class Argument(Node):
+    # value, or name: default / name=default
+    # parameters keep their name in value, positional call arguments their expression
+    __slots__ = fields = ('value', 'default')
+    tag = 'argument'
+
+    def __init__(self, value, default=None, line=0, column=0):
+        self.value = value
+        self.default = default
+        self.line = line
+        self.column = column
+
+class Arguments(Node):
+    # list of Argument
+    __slots__ = fields = ('items',)
+    tag = 'arguments'
+
+    def __init__(self, items, line=0, column=0):
+        self.items = items
+        self.line = line
+        self.column = column
+
+class FunctionCall(Node):
+    # name(args), name is an ID or a ClassAttribute
+    __slots__ = fields = ('name', 'args')
+    tag = 'function_call'
+
+    def __init__(self, name, args, line=0, column=0):
+        self.name = name
+        self.args = args
+        self.line = line
+        self.column = column
+
+class Return(Node):
+    # return, or return value
+    __slots__ = fields = ('value',)
+    tag = 'return'
+
+    def __init__(self, value=None, line=0, column=0):
+        self.value = value
+        self.line = line
+        self.column = column
+
+class Function(Node):
+    # def name(args): body
+    __slots__ = fields = ('name', 'args', 'body')
+    tag = 'function'
+
+    def __init__(self, name, args, body, line=0, column=0):
+        self.name = name
+        self.args = args
+        self.body = body
+        self.line = line
+        self.column = column
+
+class ClassDef(Node):
+    # class name: body
+    __slots__ = fields = ('name', 'body')
+    tag = 'class'
+
+    def __init__(self, name, body, line=0, column=0):
+        self.name = name
+        self.body = body
+        self.line = line
+        self.column = column
+
+
+##############
+#   BLOCKS   #
+##############
+
+class Body(Node):
+    # statements of a block followed by an optional return
+    # a block with only return keeps it in ret, pass leaves both empty
+    __slots__ = fields = ('statements', 'ret')
+
+    def __init__(self, statements, ret=None, line=0, column=0):
+        self.statements = statements
+        self.ret = ret
+        self.line = line
+        self.column = column
+
+class FunctionBody(Body):
+    __slots__ = ()
+    tag = 'function_body'
+
+class BlockBody(Body):
+    __slots__ = ()
+    tag = 'block_body'
+
+class LoopBody(Body):
+    __slots__ = ()
+    tag = 'loop_body'
+
+class Conditional(Node):
+    # if test: body, then the Elif list and the else body (or None)
+    __slots__ = fields = ('test', 'body', 'elifs', 'orelse')
+    tag = 'conditional'
+
+    def __init__(self, test, body, elifs, orelse=None, line=0, column=0):
+        self.test = test
+        self.body = body
+        self.elifs = elifs
+        self.orelse = orelse
+        self.line = line
+        self.column = column
+
+class Elif(Node):
+    # elif test: body
+    __slots__ = fields = ('test', 'body')
+    tag = 'elif'
+
+    def __init__(self, test, body, line=0, column=0):
+        self.test = test
+        self.body = body
+        self.line = line
+        self.column = column
+
+class InClause(Node):
+    # target in iterable
+    __slots__ = fields = ('target', 'iterable')
+    tag = 'in_clause'
+
+    def __init__(self, target, iterable, line=0, column=0):
+        self.target = target
+        self.iterable = iterable
+        self.line = line
+        self.column = column
+
+class InRangeClause(Node):
+    # target in range(start, stop, step), range(stop) starts at 0 with step 1
+    __slots__ = fields = ('target', 'start', 'stop', 'step')
+    tag = 'in_range_clause'
+
+    def __init__(self, target, start, stop, step, line=0, column=0):
+        self.target = target
+        self.start = start
+        self.stop = stop
+        self.step = step
+        self.line = line
+        self.column = column
+
+class For(Node):
+    # for clause:, clause is an InClause or an InRangeClause
+    __slots__ = fields = ('clause',)
+    tag = 'for'
+
+    def __init__(self, clause, line=0, column=0):
+        self.clause = clause
+        self.line = line
+        self.column = column
+
+class While(Node):
+    # while test:
+    __slots__ = fields = ('test',)
+    tag = 'while'
+
+    def __init__(self, test, line=0, column=0):
+        self.test = test
+        self.line = line
+        self.column = column
+
+class Loop(Node):
+    # header is a For or a While
+    __slots__ = fields = ('header', 'body')
+    tag = 'loop'
+
+    def __init__(self, header, body, line=0, column=0):
+        self.header = header
+        self.body = body
+        self.line = line
+        self.column = column
+
+
+# Concrete node classes, the position of each one is its kind
+NODE_TYPES = (
+    ClassAttribute, AccessId, Next, NumberToString,
+    ArithmeticOperation, LogicalOperation, RelationalOperation, UnaryOperation, CheckInCollection,
+    Assignment, AugmentedAssignment, ArrayAssignment, DictAssignment, IterAssignment, Append, Print,
+    Argument, Arguments, FunctionCall, Return, Function, ClassDef,
+    FunctionBody, BlockBody, LoopBody, Conditional, Elif, InClause, InRangeClause, For, While, Loop,
+)
+
+for _kind, _cls in enumerate(NODE_TYPES):
+    _cls.kind = _kind
+del _kind, _cls
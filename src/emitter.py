@@ -0,0 +1,62 @@
+class Emitter:
+    # Collects generated code line by line. Every line is indented once, with the
+    # level that was current when its first text was written, instead of
+    # re-indenting the finished text of a block for every block around it.
+    # Inside a block (level > 0) lines with only whitespace are written empty,
+    # like Visitor.indent() used to do.
+    def __init__(self, pad="    "):
+        self.parts = []  # finished lines, ready for "".join() or writelines()
+        self.pad = pad
+        self.level = 0
+        self.line = []  # pieces of the unfinished line
+        self.line_level = 0  # level of the unfinished line
+        self.writes = 0  # number of non empty writes, tells if a block wrote anything
+
+    def indent(self):
+        self.level += 1
+
+    def dedent(self):
+        self.level -= 1
+
+    def write(self, text):
+        if text == "":
+            return
+        self.writes += 1
+        if "\n" not in text:
+            self._add(text)
+            return
+        lines = text.split("\n")
+        self._add(lines[0])
+        self._end_line()
+        for piece in lines[1:-1]:
+            self._add(piece)
+            self._end_line()
+        self._add(lines[-1])
+
+    def _add(self, piece):
+        if piece:
+            if not self.line:
+                self.line_level = self.level
+            self.line.append(piece)
+
+    def _end_line(self):
+        self.parts.append(self._finish_line() + "\n")
+
+    def _finish_line(self):
+        line = self.line
+        if not line:
+            return ""
+        text = line[0] if len(line) == 1 else "".join(line)
+        line.clear()
+        if self.line_level:
+            return self.pad * self.line_level + text if text.strip() else ""
+        return text
+
+    def close(self):
+        # writes the unfinished last line, without a newline
+        if self.line:
+            self.parts.append(self._finish_line())
+
+    def getvalue(self):
+        self.close()
+        return "".join(self.parts)
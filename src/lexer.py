@@ -1,17 +1,58 @@
+import hashlib
+import importlib.util
+import mmap
+import os
+import tempfile
+from bisect import bisect_left
+from collections import deque
+from copy import copy
+from itertools import repeat
 import ply.lex as lex
-from src.utils import Error
+from src.utils import Error, MappedSourceMap, SourceMap
+
+# Location of the generated lexer tables, next to this file
+LEXTAB = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lextab.py')
+
+# Bytes decoded and handed to PLY at a time by input_file()
+CHUNK_SIZE = 1 << 20
+
+class DentToken:
+    # Immutable DENT token, a dedent of several levels shares one instance
+    __slots__ = ('lineno', 'lexpos')
+    type = 'DENT'
+    value = ''
+    lexer = None  # PLY only attaches a lexer to tokens that lack one
+
+    def __init__(self, lineno, lexpos):
+        object.__setattr__(self, 'lineno', lineno)
+        object.__setattr__(self, 'lexpos', lexpos)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("DENT tokens are immutable")
+
+    def __repr__(self):
+        return f"LexToken(DENT,'',{self.lineno},{self.lexpos})"
 
 class Lexer:
     def __init__(self, errors: list[Error], debug=False):
         self.lex = None
         self.data = None
+        self.source_map = None  # Line index of data, shared with the parser and errors
+
+        # Chunked input (input_file), PLY positions are relative to the current chunk
+        self.offset = 0  # Position of the current chunk in the whole input
+        self.buffer = None  # Memory-mapped file
+        self.encoding = 'utf-8'
+        self.byte_pos = 0  # Next byte of buffer to decode
+        self.chunk_offset = 0  # Position where the next chunk starts
+        self.chunk_size = CHUNK_SIZE
         self.debug = debug
         self.reserved_map = {}
         self.errors = errors
         
         # Indentation tracking
         self.indent_stack = [0]  # Stack of indentation levels
-        self.pending_tokens = []  # Queue for pending tokens
+        self.pending_tokens = deque()  # Queue for pending tokens
         self.start = True  # Flag to detect start of line
         self.current_line_indent = 0  # Track current line's indentation
         
@@ -86,13 +127,26 @@ class Lexer:
     # For ignoring spaces
     t_ignore = ''
 
+    def __iter__(self):
+        # Lazily yields the tokens of the current input until the end
+        token = self.token
+        while True:
+            tok = token()
+            if tok is None:
+                return
+            yield tok
+
     def token(self):
         # Return pending tokens first
         if self.pending_tokens:
-            return self.pending_tokens.pop(0)
+            return self.pending_tokens.popleft()
         
-        # Get next token from lexer
+        # Get next token from lexer, moving to the next chunk when this one is exhausted
         tok = self.lex.token()
+        while tok is None and self._next_chunk():
+            tok = self.lex.token()
+        if tok and self.offset:
+            tok.lexpos += self.offset
         
         # Check for dedentation when we encounter a non-space token at start of line
         if tok and self.start and tok.type not in ('NEWLINE', 'INDENT', 'DENT'):
@@ -104,18 +158,13 @@ class Lexer:
             if self.pending_tokens:
                 # Put the current token back and return pending token
                 self.pending_tokens.append(tok)
-                return self.pending_tokens.pop(0)
+                return self.pending_tokens.popleft()
         elif not tok:
-            while len(self.indent_stack) > 1:
-                self.indent_stack.pop()
-                dent_token = lex.LexToken()
-                dent_token.type = 'DENT'
-                dent_token.value = ''
-                dent_token.lineno = self.lex.lineno
-                dent_token.lexpos = self.lex.lexpos
-                self.pending_tokens.append(dent_token)
+            # Close every open block at the end of the input
+            self._push_dents(len(self.indent_stack) - 1, self.lex.lineno, self.lex.lexpos)
+            del self.indent_stack[1:]
             self.pending_tokens.append(tok)
-            return self.pending_tokens.pop(0)
+            return self.pending_tokens.popleft()
 
         return tok
 
@@ -125,25 +174,28 @@ class Lexer:
         current_indent = 0  # No spaces means indentation level 0
         
         # Generate DENT tokens for each level we need to pop
+        dent_count = 0
         while len(self.indent_stack) > 1 and self.indent_stack[-1] > current_indent:
             self.indent_stack.pop()
-            dent_token = lex.LexToken()
-            dent_token.type = 'DENT'
-            dent_token.value = ''
-            dent_token.lineno = self.lex.lineno
-            dent_token.lexpos = self.lex.lexpos
-            self.pending_tokens.append(dent_token)
+            dent_count += 1
+        self._push_dents(dent_count, self.lex.lineno, self.lex.lexpos)
         
         # Check if we ended up at a valid indentation level
         if len(self.indent_stack) > 0 and self.indent_stack[-1] != current_indent:
             self.errors.append(Error(
                 f"Invalid indentation level: expected {self.indent_stack[-1]} spaces, got {current_indent}",
-                self.lex.lineno, self.lex.lexpos, 'lexer', self.data
+                self.lex.lineno, self.lex.lexpos + self.offset, 'lexer', self.source_map
             ))
 
+    def _push_dents(self, count, lineno, lexpos):
+        # Queues count DENT tokens, all of them the same immutable instance
+        if count > 0:
+            self.pending_tokens.extend(repeat(DentToken(lineno, lexpos + self.offset), count))
+
     def t_NEWLINE(self, t):
         r"""\n+"""
         t.lexer.lineno += len(t.value)
+        t.indent_depth = len(self.indent_stack) - 1  # Open blocks after this line, used by relex
         self.start = True
         self.current_line_indent = 0  # Reset line indentation tracking
         return t
@@ -169,7 +221,7 @@ class Lexer:
 
     def t_FALSE(self, t):
         r'False'
-        t.value = bool(t.value)
+        t.value = False
         return t
 
     def t_ID(self, t):
@@ -236,7 +288,7 @@ class Lexer:
                 if i + 1 >= len(content):
                     self.errors.append(Error(
                         "Invalid escape sequence: string is unterminated",
-                        lineno, lexpos + i + 1, 'lexer', self.data
+                        lineno, lexpos + i + 1 + self.offset, 'lexer', self.source_map
                     ))
                     return False
                 
@@ -246,7 +298,7 @@ class Lexer:
                 if next_char not in valid_escapes:
                     self.errors.append(Error(
                         f"Invalid escape sequence: '\\{next_char}'",
-                        lineno, lexpos + i + 1, 'lexer', self.data
+                        lineno, lexpos + i + 1 + self.offset, 'lexer', self.source_map
                     ))
                     return False
                 i += 2
@@ -267,7 +319,7 @@ class Lexer:
         if indent_level % 4 != 0:
             self.errors.append(Error(
                 f"Invalid indentation: indentation must be a multiple of 4 spaces, got {indent_level}",
-                t.lineno, t.lexpos, 'lexer', self.data
+                t.lineno, t.lexpos + self.offset, 'lexer', self.source_map
             ))
             return None
         
@@ -276,7 +328,7 @@ class Lexer:
             if indent_level != current_level + 4:
                 self.errors.append(Error(
                     f"Invalid indentation: expected {current_level + 4} spaces (increase by 4), got {indent_level}",
-                    t.lineno, t.lexpos, 'lexer', self.data
+                    t.lineno, t.lexpos + self.offset, 'lexer', self.source_map
                 ))
                 return None
             
@@ -298,18 +350,12 @@ class Lexer:
                 # Invalid indentation level
                 self.errors.append(Error(
                     f"Invalid indentation level: expected one of {self.indent_stack} spaces, got {indent_level}",
-                    t.lineno, t.lexpos, 'lexer', self.data
+                    t.lineno, t.lexpos + self.offset, 'lexer', self.source_map
                 ))
                 return None
             
             # Create DENT tokens
-            for i in range(dent_count):
-                dent_token = lex.LexToken()
-                dent_token.type = 'DENT'
-                dent_token.value = ''
-                dent_token.lineno = t.lineno
-                dent_token.lexpos = t.lexpos
-                self.pending_tokens.append(dent_token)
+            self._push_dents(dent_count, t.lineno, t.lexpos)
             
         else:
             self.start = False
@@ -317,18 +363,235 @@ class Lexer:
         return None
 
     def t_error(self, t):
-        self.errors.append(Error("Illegal character '%s'" % t.value[0], t.lineno, t.lexpos, 'lexer', self.data))
+        self.errors.append(Error("Illegal character '%s'" % t.value[0], t.lineno, t.lexpos + self.offset, 'lexer', self.source_map))
         print(self.errors[-1])
         t.lexer.skip(1)
 
-    def build(self):
+    def build(self, optimize=True, lextab=LEXTAB):
+        # optimize=True reloads the serialized master regexes from lextab
+        # instead of reassembling and validating every rule on each instance
+        if optimize and lextab:
+            self.lex = self._load_tables(lextab)
+            if self.lex is not None:
+                return
         self.lex = lex.lex(module=self)
+        if optimize and lextab:
+            self._save_tables(lextab)
+
+    @classmethod
+    def lexer_hash(cls):
+        # hash of the token list and every t_ rule (string or docstring) in definition order
+        h = hashlib.sha256()
+        h.update(' '.join(cls.tokens).encode())
+        for name, rule in vars(cls).items():
+            if name.startswith('t_'):
+                text = rule if isinstance(rule, str) else rule.__doc__
+                h.update(f"{name}:{text}".encode())
+        return h.hexdigest()
+
+    def _load_tables(self, filename):
+        spec = importlib.util.spec_from_file_location('lextab', filename)
+        lextab = importlib.util.module_from_spec(spec)
+        try:
+            spec.loader.exec_module(lextab)
+        except (OSError, SyntaxError):
+            return None
+        if getattr(lextab, '_lexhash', None) != self.lexer_hash():
+            return None
+        rules = {name: getattr(self, name) for name, rule in vars(type(self)).items()
+                 if name.startswith('t_') and callable(rule)}
+        lexobj = lex.Lexer()
+        try:
+            lexobj.readtab(lextab, rules)
+        except (ImportError, KeyError):
+            return None
+        # rules were already validated when the tables were written
+        lexobj.lexoptimize = True
+        return lexobj
+
+    def _save_tables(self, filename):
+        # PLY's lextab module plus the hash it was generated from
+        try:
+            with tempfile.TemporaryDirectory(dir=os.path.dirname(filename)) as tmpdir:
+                self.lex.writetab('lextab', tmpdir)
+                tmp = os.path.join(tmpdir, 'lextab.py')
+                with open(tmp, 'a') as f:
+                    f.write(f"_lexhash = {self.lexer_hash()!r}\n")
+                # atomic so concurrent lexers never read a half written file
+                os.replace(tmp, filename)
+        except OSError:
+            # a read-only install just keeps building the lexer in memory
+            pass
 
     def input(self, data):
         # Sets input and declares internal variables
         self.data = data
+        self.buffer = None
+        self.source_map = SourceMap(data)
+        self._reset()
+        self.lex.input(data)
+
+    def input_file(self, path, encoding='utf-8'):
+        # Lexes a file through a read-only memory map, decoding one chunk of whole
+        # lines at a time so the full text is never held as a single string
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                self.input('')
+                return
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.data = None
+        self.buffer = buffer
+        self.encoding = encoding
+        self.source_map = MappedSourceMap(buffer, encoding)
+        self._reset()
+        self.lex.input('')
+
+    def _reset(self):
         self.indent_stack = [0]
-        self.pending_tokens = []
+        self.pending_tokens = deque()
         self.start = True
         self.current_line_indent = 0
-        self.lex.input(data)
\ No newline at end of file
+        self.offset = 0
+        self.byte_pos = 0
+        self.chunk_offset = 0
+
+    def _next_chunk(self):
+        # Feeds the next chunk of the mapped file to PLY, returns False at the end
+        buffer = self.buffer
+        if buffer is None or self.byte_pos >= len(buffer):
+            return False
+        start = self.byte_pos
+        size = len(buffer)
+        # Cut after a newline that starts a line at column 0 and is outside a
+        # triple quoted string, so no token or indentation run is split
+        cut = size
+        quotes = 0
+        counted = start
+        search = start + self.chunk_size
+        while search < size:
+            newline = buffer.find(b'\n', search)
+            if newline == -1:
+                break
+            scanned = buffer[counted:newline + 1]
+            quotes += scanned.count(b'"""') + scanned.count(b"'''")
+            counted = newline + 1
+            if quotes % 2 == 0 and buffer[newline + 1:newline + 2] not in (b' ', b'\t', b'\r', b'\n'):
+                cut = newline + 1
+                break
+            search = newline + 1
+        raw = buffer[start:cut]
+        text = raw.decode(self.encoding)
+        self.offset = self.chunk_offset
+        self.source_map.add_chunk(text, raw, self.offset, start)
+        self.chunk_offset += len(text)
+        self.byte_pos = cut
+        self.lex.input(text)
+        return True
+
+    def relex(self, tokens, start, end, text):
+        # Incremental re-lexing for edited sources. tokens is the full stream lexed
+        # from the current string input, and the edit replaces data[start:end] with text.
+        # Lexing restarts at the closest line start before the edit and stops at the
+        # first line after it where the new stream lines up with the old one, the rest
+        # of the old tokens are reused through shifted copies, tokens and its errors are
+        # left unchanged. Returns the new token stream and leaves the lexer at the end of
+        # the new input.
+        if self.data is None:
+            raise ValueError("relex needs a string input, not a memory-mapped file")
+        old_data = self.data
+        new_data = old_data[:start] + text + old_data[end:]
+        delta = len(text) - (end - start)
+        edit_end = start + len(text)  # end of the edit in the new input
+
+        # Restart point: right after the last NEWLINE that ends before the edit,
+        # with the indentation depth given by the INDENT/DENT tokens before it
+        restart = 0
+        lineno = 1
+        prefix = 0
+        depth = 0
+        i = bisect_left(tokens, start, key=lambda tok: tok.lexpos) - 1
+        while i >= 0:
+            tok = tokens[i]
+            # strictly before, an edit starting with a newline would extend that NEWLINE
+            if tok.type == 'NEWLINE' and tok.lexpos + len(tok.value) < start:
+                restart = tok.lexpos + len(tok.value)
+                lineno = tok.lineno + len(tok.value)
+                prefix = i + 1
+                depth = tok.indent_depth
+                break
+            i -= 1
+        # DENTs queued by a blank line are emitted after its NEWLINE but belong before it
+        while prefix < len(tokens) and tokens[prefix].type == 'DENT' and tokens[prefix].lexpos < restart:
+            prefix += 1
+
+        # Errors from the re-lexed region are recomputed, the ones after it are shifted later
+        errors_before = [e for e in self.errors if e.column < restart]
+        errors_after = [e for e in self.errors if e.column >= restart]
+        del self.errors[:]
+        self.errors.extend(errors_before)
+
+        # Lexer state at the restart point
+        self.data = new_data
+        self.buffer = None
+        self.source_map = SourceMap(new_data)
+        self._reset()
+        self.indent_stack = [4 * level for level in range(depth + 1)]
+        self.lex.input(new_data)
+        self.lex.lexpos = restart
+        self.lex.lineno = lineno
+
+        relexed = []
+        old_index = prefix  # walks the old stream alongside the new one
+        suffix = None
+        while True:
+            tok = self.token()
+            if tok is None:
+                break
+            relexed.append(tok)
+            if tok.type != 'NEWLINE' or tok.lexpos + len(tok.value) < edit_end or self.pending_tokens:
+                continue
+            # Look for the same NEWLINE in the old stream
+            old_end = tok.lexpos + len(tok.value) - delta
+            while old_index < len(tokens):
+                old = tokens[old_index]
+                if old.type == 'NEWLINE' and old.lexpos + len(old.value) >= old_end:
+                    break
+                old_index += 1
+            if old_index >= len(tokens):
+                continue
+            old = tokens[old_index]
+            following = tokens[old_index + 1] if old_index + 1 < len(tokens) else None
+            if (old.lexpos + delta == tok.lexpos and old.value == tok.value
+                    and old.indent_depth == len(self.indent_stack) - 1
+                    and not (following is not None and following.type == 'DENT' and following.lexpos < old_end)):
+                suffix = tokens[old_index + 1:]
+                line_delta = tok.lineno - old.lineno
+                break
+
+        if suffix is None:
+            # Relexed up to the end of the input, nothing of the old stream is reused
+            return tokens[:prefix] + relexed
+
+        # Shifted copies of the reused tokens and errors that come after the resync point,
+        # the old stream may still be held by the caller
+        if delta or line_delta:
+            shifted_dents = {}
+            for i, tok in enumerate(suffix):
+                if isinstance(tok, DentToken):
+                    if id(tok) not in shifted_dents:
+                        shifted_dents[id(tok)] = DentToken(tok.lineno + line_delta, tok.lexpos + delta)
+                    suffix[i] = shifted_dents[id(tok)]
+                else:
+                    tok = copy(tok)
+                    tok.lexpos += delta
+                    tok.lineno += line_delta
+                    suffix[i] = tok
+        for error in errors_after:
+            if error.column >= old_end:
+                self.errors.append(Error(error.message, error.line + line_delta, error.column + delta, error.type,
+                                         self.source_map))
+
+        # Leave the lexer at the end of the new input, as if it had lexed all of it
+        self.lex.lexpos = self.lex.lexlen
+        self.indent_stack = [0]
+        return tokens[:prefix] + relexed + suffix
@@ -0,0 +1,472 @@
+import math
+from src.ast_nodes import (
+    NODE_TYPES, ArrayAssignment, Assignment, AugmentedAssignment, Body, ClassDef, Conditional, DictAssignment, Elif,
+    For, Function, FunctionCall, InClause, InRangeClause, IterAssignment, Loop, Next, Node, Return,
+)
+from src.semantic import is_string
+
+# Python operators applied to folded literals, they raise on the operands Python would reject
+ARITHMETIC = {
+    '+': lambda a, b: a + b,
+    '-': lambda a, b: a - b,
+    '*': lambda a, b: a * b,
+    '/': lambda a, b: a / b,
+    '//': lambda a, b: a // b,
+    '%': lambda a, b: a % b,
+    '**': lambda a, b: a ** b,
+}
+RELATIONAL = {
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '<': lambda a, b: a < b,
+    '>': lambda a, b: a > b,
+    '<=': lambda a, b: a <= b,
+    '>=': lambda a, b: a >= b,
+}
+
+# range of the C++ int the generated code computes ints with
+INT_MIN, INT_MAX = -2 ** 31, 2 ** 31 - 1
+
+def is_number(value):
+    return type(value) in (int, float, bool)
+
+def is_literal(value):
+    # a value written in the code: a number, a bool or a string with its quotes
+    return is_number(value) or (type(value) is str and is_string(value))
+
+class ConstantFolder:
+    # Optimization pass over the parse tree, between the parser and the semantic analysis.
+    # Operations whose operands are all literals are replaced by their value, computed with
+    # the operators of Python, so // and % round down, / gives a float and ** of two ints
+    # an int. An operation is left as it is when Python would raise, or when its value does
+    # not fit the C++ type it is written with: an int out of the range of int, an inf or
+    # nan float, or a string longer than MAX_STRING. `and`, `or` and `not` with a literal
+    # on the left give the operand Python gives.
+    #
+    # A variable assigned once, with a literal (after folding), in a function or at the
+    # top level is a constant, and its reads in that scope are replaced by the literal,
+    # which can fold the operations around them. Any other write of the name makes it a
+    # variable: another assignment, an augmented one, a for target or a parameter. The
+    # passes are repeated until no new constant is found.
+    #   eliminated: operation nodes removed from the tree
+    #   propagated: names replaced by the literal of their constant
+    MAX_STRING = 1024
+
+    def __init__(self):
+        self.eliminated = 0
+        self.propagated = 0
+        self.constants = {}  # function name, or None for the top level -> {name: literal}
+        self.local = None  # names written in the function being folded, None at the top level
+        self.scope = None  # name of the function being folded
+        # method of every node kind, the generic fold of its fields when there is none
+        self.dispatch = [getattr(self, f"fold_{node_type.tag}", self.fold_node) for node_type in NODE_TYPES]
+
+    def fold(self, tree):
+        while True:
+            tree = self.fold_value(tree)
+            constants = self.find_constants(tree)
+            if constants == self.constants:
+                return tree
+            self.constants = constants
+
+    def find_constants(self, tree):
+        # names written once in their scope, by an assignment of a literal
+        writes = {None: {}}
+        for node in tree:
+            if type(node) is Function:
+                scope = writes[node.name] = {}
+                for param in node.args.items:
+                    scope.setdefault(param.value, []).append(None)
+                self.find_writes(node.body, scope)
+            else:
+                self.find_writes(node, writes[None])
+        return {scope: {name: values[0] for name, values in names.items() if len(values) == 1 and is_literal(values[0])}
+                for scope, names in writes.items()}
+
+    def find_writes(self, node, writes):
+        # the value of every assignment of a name in node, None for the other writes
+        if isinstance(node, list):
+            for n in node:
+                self.find_writes(n, writes)
+        elif isinstance(node, Node):
+            kind = type(node)
+            if kind is Assignment and isinstance(node.target, str):
+                writes.setdefault(node.target, []).append(node.value)
+            elif kind in (AugmentedAssignment, ArrayAssignment, DictAssignment, IterAssignment, InClause, InRangeClause):
+                if isinstance(node.target, str):
+                    writes.setdefault(node.target, []).append(None)
+            for field in node.fields:
+                self.find_writes(getattr(node, field), writes)
+
+    def written(self, function):
+        writes = {param.value: [None] for param in function.args.items}
+        self.find_writes(function.body, writes)
+        return writes
+
+    def fold_value(self, value):
+        # the folded expression or statement, a name is replaced by its constant
+        if isinstance(value, Node):
+            return self.dispatch[value.kind](value)
+        if isinstance(value, list):
+            return [self.fold_value(v) for v in value]
+        if isinstance(value, dict):
+            return {k: self.fold_value(v) for k, v in value.items()}
+        constant = self.constant(value)
+        if constant is not None:
+            self.propagated += 1
+            return constant
+        return value
+
+    def constant(self, name):
+        # literal of the constant a name reads, None for a variable or a literal
+        if type(name) is not str or is_string(name):
+            return None
+        scope = self.scope if self.local is not None and name in self.local else None
+        return self.constants.get(scope, {}).get(name)
+
+    def fold_node(self, node):
+        for field in node.fields:
+            setattr(node, field, self.fold_value(getattr(node, field)))
+        return node
+
+    def fold_function(self, node):
+        # only the defaults of the parameters are read
+        for param in node.args.items:
+            param.default = self.fold_value(param.default)
+        self.scope, self.local = node.name, self.written(node)
+        node.body = self.fold_value(node.body)
+        self.scope = self.local = None
+        return node
+
+    def fold_function_call(self, node):
+        node.args = self.fold_value(node.args)
+        return node
+
+    def fold_argument(self, node):
+        # name=value keeps the name of the parameter
+        if node.default is not None:
+            node.default = self.fold_value(node.default)
+        else:
+            node.value = self.fold_value(node.value)
+        return node
+
+    def fold_class(self, node):
+        node.body = self.fold_value(node.body)
+        return node
+
+    def fold_unchanged(self, node):
+        return node
+
+    fold_class_attribute = fold_next = fold_in_clause = fold_unchanged
+
+    def fold_target(self, node):
+        # assignments keep the name they write, an index written to is folded
+        if isinstance(node.target, Node):
+            node.target = self.fold_value(node.target)
+        node.value = self.fold_value(node.value)
+        return node
+
+    fold_simple_assignment_operation = fold_assignment_operation = fold_array_assignment = fold_target
+    fold_dict_assignment = fold_iter_assignment = fold_append = fold_target
+
+    def fold_in_range_clause(self, node):
+        node.start = self.fold_value(node.start)
+        node.stop = self.fold_value(node.stop)
+        node.step = self.fold_value(node.step)
+        return node
+
+    def fold_check_in_collection(self, node):
+        node.item = self.fold_value(node.item)
+        return node
+
+    def fold_access_id(self, node):
+        node.index = self.fold_value(node.index)
+        node.stop = self.fold_value(node.stop)
+        text = self.constant(node.name)
+        # an index or a slice of a string constant, without escape sequences to count
+        if type(text) is str and is_string(text) and "\\" not in text:
+            index, stop = node.index, node.stop
+            if type(index) is int and stop is None:
+                if -len(text) + 2 <= index < len(text) - 2:
+                    return self.eliminate(f"\"{text[1:-1][index]}\"")
+            elif type(index) is int and type(stop) is int:
+                return self.eliminate(f"\"{text[1:-1][index:stop]}\"")
+        return node
+
+    def fold_number_to_string(self, node):
+        node.value = self.fold_value(node.value)
+        if is_number(node.value) and type(node.value) is not bool:
+            return self.eliminate(f"\"{node.value}\"")
+        return node
+
+    def fold_arithmetic_operation(self, node):
+        left, right = self.fold_value(node.left), self.fold_value(node.right)
+        node.left, node.right = left, right
+        if is_number(left) and is_number(right):
+            # ** can be too large to compute before it is checked
+            if node.op == '**' and type(right) is int and right > 64 and abs(left) > 1:
+                return node
+            try:
+                value = ARITHMETIC[node.op](left, right)
+            except (ArithmeticError, ValueError):
+                return node
+            if type(value) is int and INT_MIN <= value <= INT_MAX:
+                return self.eliminate(value)
+            if type(value) is float and math.isfinite(value):
+                return self.eliminate(value)
+        elif type(left) is str and type(right) is str and is_string(left) and is_string(right) and node.op == '+':
+            if len(left) + len(right) - 4 <= self.MAX_STRING:
+                return self.eliminate(f"\"{left[1:-1]}{right[1:-1]}\"")
+        elif type(left) is str and is_string(left) and type(right) is int and node.op == '*':
+            if (len(left) - 2) * max(right, 0) <= self.MAX_STRING:
+                return self.eliminate(f"\"{left[1:-1] * right}\"")
+        return node
+
+    def fold_relational_operation(self, node):
+        left, right = self.fold_value(node.left), self.fold_value(node.right)
+        node.left, node.right = left, right
+        if is_number(left) and is_number(right):
+            return self.eliminate(RELATIONAL[node.op](left, right))
+        if is_literal(left) and is_literal(right) and "\\" not in str(left) + str(right):
+            try:
+                return self.eliminate(RELATIONAL[node.op](self.python(left), self.python(right)))
+            except TypeError:
+                pass
+        return node
+
+    def fold_logical_operation(self, node):
+        left, right = self.fold_value(node.left), self.fold_value(node.right)
+        node.left, node.right = left, right
+        # the right operand is only evaluated when the left one does not decide
+        if is_literal(left):
+            decides = bool(self.python(left)) == (node.op.lower() == 'or')
+            return self.eliminate(left if decides else right)
+        return node
+
+    def fold_unary_operation(self, node):
+        node.operand = self.fold_value(node.operand)
+        if node.op == 'NOT' and is_literal(node.operand):
+            return self.eliminate(not self.python(node.operand))
+        return node
+
+    def python(self, literal):
+        # Python value of a literal, a string without its quotes
+        return literal[1:-1] if type(literal) is str else literal
+
+    def eliminate(self, value):
+        # the node of the operation is replaced by value
+        self.eliminated += 1
+        return value
+
+
+# assignments that are dropped when the value they store is never read
+STORES = (Assignment, AugmentedAssignment, ArrayAssignment, DictAssignment)
+
+def statements_of(body):
+    # statements of a body, its return last
+    if body is None:
+        return []
+    if isinstance(body, Body):
+        return body.statements + ([body.ret] if body.ret is not None else [])
+    return body if isinstance(body, list) else [body]
+
+def names_in(value, names):
+    # every plain name written in value, names of functions and targets included
+    if isinstance(value, Node):
+        for field in value.fields:
+            names_in(getattr(value, field), names)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            names_in(v, names)
+    elif isinstance(value, dict):
+        for k, v in value.items():
+            names_in(k, names)
+            names_in(v, names)
+    elif type(value) is str and not is_string(value):
+        names.add(value)
+    return names
+
+def has_call(value):
+    # a value that calls a function can print, so it is kept even if it is never read
+    if isinstance(value, (FunctionCall, Next)):
+        return True
+    if isinstance(value, Node):
+        return any(has_call(getattr(value, field)) for field in value.fields)
+    if isinstance(value, (list, tuple)):
+        return any(has_call(v) for v in value)
+    if isinstance(value, dict):
+        return any(has_call(v) for v in value.values())
+    return False
+
+class DeadCodeEliminator:
+    # Optimization pass over the parse tree, after the ConstantFolder, that removes what
+    # the program never uses before it is written in C++.
+    #
+    # Functions: the ones reachable over the call graph from the top level statements are
+    # kept, every other def is dropped.
+    #
+    # Stores: an assignment is dead when no path after it reads the variable before it is
+    # written again, found by a backward liveness analysis of every function and of the
+    # top level, which iterates loops until the variables live at their head settle.
+    # Variables of the top level read by a function are live everywhere. Dead stores whose
+    # value calls a function are kept. A dead store is removed when the variable is never
+    # read, or when it is not the one that declares the variable in C++ (an earlier store
+    # of the block or of a block around it does), so the declaration stays in its block.
+    # Removing stores can make others dead, so it is repeated until nothing changes.
+    #   functions: names of the dropped functions
+    #   stores: assignments removed
+
+    def __init__(self):
+        self.functions = []
+        self.stores = 0
+        self.declaring = set()  # stores that declare their variable, in the scope being analyzed
+        self.read = set()  # names read in the scope being analyzed
+
+    def eliminate(self, tree):
+        while True:
+            removed = self.stores
+            tree = self.remove_stores(tree)
+            if self.stores == removed:
+                break
+        return self.remove_functions(tree)
+
+    def remove_functions(self, tree):
+        functions = {node.name: node for node in tree if type(node) is Function}
+        reached = set()
+        pending = [names_in([node for node in tree if type(node) is not Function], set())]
+        while pending:
+            for name in pending.pop() & functions.keys() - reached:
+                reached.add(name)
+                pending.append(names_in(functions[name].body, set()))
+        self.functions += [name for name in functions if name not in reached]
+        return [node for node in tree if type(node) is not Function or node.name in reached]
+
+    def remove_stores(self, tree):
+        functions = [node for node in tree if type(node) is Function]
+        top = [node for node in tree if type(node) not in (Function, ClassDef)]
+        dead = set()
+        for function in functions:
+            params = {param.value for param in function.args.items}
+            statements = statements_of(function.body)
+            self.find_dead(statements, set(), params, dead)
+        # names of the top level read inside the functions are always live
+        globals_read = names_in([function.body for function in functions], set())
+        self.find_dead(top, globals_read, set(), dead)
+        self.stores += len(dead)
+        return self.without(tree, dead)
+
+    def find_dead(self, statements, always, params, dead):
+        # dead stores of a scope that can be removed
+        self.declaring = set()
+        self.find_declarations(statements, set(params), self.declaring)
+        self.read = set(always) | self.reads_in(statements)
+        self.live_block(statements, set(always), always, None, dead)
+
+    def removable(self, node):
+        return node not in self.declaring or node.target not in self.read
+
+    def reads_in(self, node):
+        # names read anywhere in node, the names that stores only write are left out
+        if isinstance(node, STORES) and isinstance(node.target, str):
+            names = names_in(node.value, set())
+            if type(node) is AugmentedAssignment:
+                names.add(node.target)
+            return names
+        if isinstance(node, list):
+            names = set()
+            for n in node:
+                names |= self.reads_in(n)
+            return names
+        if isinstance(node, (Conditional, Elif, Loop, Body)):
+            names = set()
+            for field in node.fields:
+                names |= self.reads_in(getattr(node, field))
+            return names
+        return names_in(node, set())
+
+    def find_declarations(self, statements, declared, declaring):
+        # stores of a name not stored before in their block or a block around it
+        declared = set(declared)
+        for node in statements:
+            if isinstance(node, STORES) and isinstance(node.target, str):
+                if node.target not in declared:
+                    declaring.add(node)
+                    declared.add(node.target)
+            elif type(node) is Conditional:
+                self.find_declarations(statements_of(node.body), declared, declaring)
+                for elif_ in node.elifs:
+                    self.find_declarations(statements_of(elif_.body), declared, declaring)
+                self.find_declarations(statements_of(node.orelse), declared, declaring)
+            elif type(node) is Loop:
+                inner = set(declared)
+                if type(node.header) is For:
+                    inner.add(node.header.clause.target)
+                self.find_declarations(statements_of(node.body), inner, declaring)
+
+    def live_block(self, statements, live, always, loop, dead):
+        # variables live before statements, from the ones live after them,
+        # loop is (live at the head, live after) of the loop around them
+        for node in reversed(statements):
+            live = self.live_statement(node, live, always, loop, dead)
+        return live
+
+    def live_statement(self, node, live, always, loop, dead):
+        kind = type(node)
+        if node == "break" and loop is not None:
+            return set(loop[1])
+        if node == "continue" and loop is not None:
+            return set(loop[0])
+        if isinstance(node, STORES) and isinstance(node.target, str):
+            target = node.target
+            # a dead store that stays is still a read of its value
+            if target not in live and target not in always and not has_call(node.value) and self.removable(node):
+                dead.add(node)
+                return live
+            live = live - {target} if kind is not AugmentedAssignment else live | {target}
+            return live | names_in(node.value, set())
+        if kind is Return:
+            return set(always) | names_in(node.value, set())
+        if kind is Conditional:
+            after = live
+            live = self.live_block(statements_of(node.body), set(after), always, loop, dead)
+            live |= names_in(node.test, set())
+            for elif_ in node.elifs:
+                live |= self.live_block(statements_of(elif_.body), set(after), always, loop, dead)
+                live |= names_in(elif_.test, set())
+            if node.orelse is not None:
+                live |= self.live_block(statements_of(node.orelse), set(after), always, loop, dead)
+            else:
+                live |= after
+            return live
+        if kind is Loop:
+            return self.live_loop(node, live, always, dead)
+        return live | names_in(node, set())
+
+    def live_loop(self, node, after, always, dead):
+        # live at the head: after the loop, read by its header, or live at the start of
+        # its body, repeated until it settles
+        header, target = node.header, None
+        if type(header) is For:
+            clause = header.clause
+            target = clause.target
+            reads = names_in((clause.start, clause.stop, clause.step) if type(clause) is InRangeClause else clause.iterable, set())
+        else:
+            reads = names_in(header.test, set())
+        head = after | reads
+        while True:
+            found = set()
+            start = self.live_block(statements_of(node.body), set(head), always, (head, after), found)
+            new = after | reads | (start - {target})
+            if new == head:
+                dead |= found
+                return head
+            head = new
+
+    def without(self, value, dead):
+        # value with the dead stores taken out of every list of statements
+        if isinstance(value, list):
+            return [self.without(v, dead) for v in value if not (isinstance(v, Node) and v in dead)]
+        if isinstance(value, Node):
+            for field in value.fields:
+                setattr(value, field, self.without(getattr(value, field), dead))
+        return value
@@ -1,6 +1,20 @@
+import hashlib
+import os
+import pickle
+import tempfile
 import ply.yacc as yacc
+from src.ast_nodes import (
+    AccessId, Append, Argument, Arguments, ArithmeticOperation, ArrayAssignment, Assignment,
+    AugmentedAssignment, BlockBody, CheckInCollection, ClassAttribute, ClassDef, Conditional,
+    DictAssignment, Elif, For, Function, FunctionBody, FunctionCall, InClause, InRangeClause,
+    IterAssignment, LogicalOperation, Loop, LoopBody, Next, Node, NumberToString, Print,
+    RelationalOperation, Return, UnaryOperation, While,
+)
 from src.lexer import Lexer
-from src.symbol_table import SymbolTable
+from src.utils import Error
+
+# Location of the cached LALR tables, next to this file
+TABLE_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'parsetab.pickle')
 
 class Parser:
     tokens = Lexer.tokens
@@ -9,55 +23,142 @@ class Parser:
         ('left', 'OR'),
         ('left', 'AND'),
         ('right', 'NOT'), 
-        ('nonassoc', 'EQUAL', 'NOT_EQUAL', 'GREATER', 'LESS', 'GREATER_EQUAL', 'LESS_EQUAL'),
+        ('left', 'EQUAL', 'NOT_EQUAL', 'GREATER', 'LESS', 'GREATER_EQUAL', 'LESS_EQUAL'),
         ('left', 'PLUS', 'MINUS'),
         ('left', 'MUL', 'DIV', 'INT_DIV', 'MOD'),
         ('right', 'POW'),
         ('left', 'IN')
     )
 
-    def _infer_type(self, value_node):
-        """Inferir tipo usando symbol table helpers (acepta nodos/tuplas ó literales)."""
-        # si es un nodo tupla (operación, acceso, etc) usar infer_type_from_operation
-        if isinstance(value_node, tuple):
-            return self.symtab.infer_type_from_operation(value_node)
-        # literal strings 'None','True','False' o tipos python
-        return self.symtab.infer_type_from_value(value_node)
-
-    def _insert_symbol_from_assignment(self, target, value_node, line=None, category='variable'):
-        """
-        Insertar o actualizar símbolo al hacer una asignación.
-        target puede ser:
-         - ID (str)
-         - ("class atribute use", class_name, attr_name)
-        """
-        if isinstance(target, tuple) and target[0] == "class atribute use":
-            # tratamiento simple: guarda atributo en scope de la clase (si existe)
-            class_name = target[1]
-            attr_name = target[2]
-            # intenta encontrar símbolo de clase
-            class_symbol = self.symtab.lookup(class_name)
-            scoped_name = f"{class_name}.{attr_name}"
-            typ = self._infer_type(value_node)
-            # guardamos como variable en el scope actual con nombre "class.attr"
-            self.symtab.insert(scoped_name, typ, line=line, value=None, category='variable')
-            return
-
-        # si target es simple ID
-        if isinstance(target, str):
-            typ = self._infer_type(value_node)
-            existing = self.symtab.lookup(target)
-            if existing:
-                # actualizar tipo si compatible o sobrescribir
-                self.symtab.update_type(target, typ)
+    def __init__(self, errors: list[Error] = None, debug=False, table_cache=TABLE_CACHE, tracer=None):
+        # debug=True always rebuilds the tables and writes parser.out
+        # otherwise the cached tables are loaded when the grammar has not changed
+        # tracer (src.tracer.Tracer) is only hooked in when given, productions never print
+        self.errors = errors if errors is not None else []
+        self.source_map = None  # SourceMap of the input being parsed, set by parse()
+        self._line_starts = None  # its line index, turns token positions into node columns
+        self._comparisons = set()  # comparisons out of parentheses, the next one chains with them
+        self.debug = debug
+        self.parser = None
+        if not debug and table_cache:
+            self.parser = self._load_tables(table_cache)
+        if self.parser is None:
+            self.parser = yacc.yacc(module=self, debug=debug, debugfile='parser.out', write_tables=False)
+            if table_cache:
+                self._save_tables(table_cache)
+        if tracer is not None:
+            tracer.instrument(self.parser)
+
+    @classmethod
+    def grammar_hash(cls):
+        # hash of everything that shapes the LALR tables: tokens, precedence
+        # and the docstrings of the productions in definition order
+        h = hashlib.sha256()
+        h.update(' '.join(cls.tokens).encode())
+        h.update(repr(cls.precedence).encode())
+        for name, func in vars(cls).items():
+            if name.startswith('p_') and func.__doc__:
+                h.update(f"{name}:{func.__doc__}".encode())
+        return h.hexdigest()
+
+    def _load_tables(self, filename):
+        # fast path: reads the pickled tables and binds the productions
+        # without running PLY's grammar reflection and validation
+        lr = yacc.LRTable()
+        try:
+            signature = lr.read_pickle(filename)
+        except (ImportError, OSError, EOFError, pickle.UnpicklingError, yacc.VersionError):
+            return None
+        if signature != self.grammar_hash():
+            return None
+        lr.bind_callables({p.func: getattr(self, p.func) for p in lr.lr_productions if p.func})
+        return yacc.LRParser(lr, self.p_error)
+
+    def _save_tables(self, filename):
+        # same layout as PLY's pickle_table, signed with grammar_hash()
+        productions = []
+        for p in self.parser.productions:
+            if p.func:
+                productions.append((p.str, p.name, p.len, p.func, os.path.basename(p.file), p.line))
+            else:
+                productions.append((str(p), p.name, p.len, None, None, None))
+        try:
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(filename), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                for item in (yacc.__tabversion__, 'LALR', self.grammar_hash(),
+                             self.parser.action, self.parser.goto, productions):
+                    pickle.dump(item, f, pickle.HIGHEST_PROTOCOL)
+            # atomic so concurrent compilers never read a half written file
+            os.replace(tmp, filename)
+        except OSError:
+            # a read-only install just keeps building the tables in memory
+            pass
+
+    @classmethod
+    def build_table_cache(cls, table_cache=TABLE_CACHE):
+        # pre-generates the table cache, meant to run at install time
+        if os.path.exists(table_cache):
+            os.remove(table_cache)
+        cls(table_cache=table_cache)
+        return table_cache
+
+    def _position(self, p, n):
+        # (line, column) of symbol n for a node: tokens and nonterminals that
+        # called set_lineno/set_lexpos know it, otherwise it comes from the
+        # node (or first statement) they hold, PLY runs without tracking
+        sym = p.slice[n]
+        lineno = getattr(sym, 'lineno', None)
+        if lineno is not None:
+            if self._line_starts is None:
+                return lineno, sym.lexpos
+            return lineno, sym.lexpos - self._line_starts[lineno - 1]
+        value = sym.value
+        if type(value) is list and value:
+            value = value[0]
+        if isinstance(value, Node):
+            return value.line, value.column
+        return 0, 0
+
+    @staticmethod
+    def _mark(p):
+        # gives the nonterminal the position of its first token
+        p.set_lineno(0, p.lineno(1))
+        p.set_lexpos(0, p.lexpos(1))
+
+    # node built by ret_value_operation for each operator token
+    _operation_node = {
+        **dict.fromkeys(('PLUS', 'MINUS', 'MUL', 'DIV', 'INT_DIV', 'MOD', 'POW'), ArithmeticOperation),
+        **dict.fromkeys(('AND', 'OR'), LogicalOperation),
+        **dict.fromkeys(('EQUAL', 'NOT_EQUAL', 'GREATER', 'LESS', 'GREATER_EQUAL', 'LESS_EQUAL'), RelationalOperation),
+    }
+
+    def _body(self, body_type, p):
+        # function, block and loop bodies: sentences [return], return or pass
+        first = p.slice[1].type
+        if first == 'PASS':
+            return body_type([], None, *self._position(p, 1))
+        if first == 'return':
+            return body_type([], p[1], *self._position(p, 1))
+        return body_type(p[1], p[2] if len(p) > 2 else None, *self._position(p, 1))
+
+    def _conditional(self, p):
+        # if_clause INDENT body DENT [elif_list] [else_clause], for both kinds of conditional
+        elifs = []
+        orelse = None
+        for n in range(5, len(p)):
+            if p.slice[n].type.endswith('elif_list'):
+                elifs = p[n]
             else:
-                self.symtab.insert(target, typ, line=line, value=None, category=category)
+                orelse = p[n]
+        return Conditional(p[1], p[3], elifs, orelse, *self._position(p, 1))
+
+    def _elif_list(self, p):
+        # [elif_list] elif_clause INDENT body DENT, for both kinds of elif list
+        if len(p) == 5:
+            return [Elif(p[1], p[3], *self._position(p, 1))]
+        p[1].append(Elif(p[2], p[4], *self._position(p, 2)))
+        return p[1]
 
-    def __init__(self):
-        self.parser = yacc.yacc(module=self, debug=True, debugfile='parser.out')
-        self.symtab = SymbolTable()
-        self._pending_scope_name = None
-        
     #########################
     #   INITIAL PRODUCTION  #
     #########################
@@ -65,14 +166,12 @@ class Parser:
     def p_program(self, p):
         '''program : optional_newline statement_list
         '''
-        print(">> program")
         p[0] = p[2]
 
     def p_statement_list(self, p):
         '''statement_list : statement_list sentence optional_newline
                           | sentence optional_newline
         '''
-        print(">> statement_list")
         if len(p) == 3:
             p[0] = [p[1]]
         else:
@@ -85,26 +184,21 @@ class Parser:
 
     def p_empty(self, p):
         'empty :'
-        print(">> empty")
         p[0] = None
 
     def p_optional_newline(self, p):
         '''optional_newline : optional_newline NEWLINE
                             | NEWLINE
                             | empty'''
-        if len(p) > 1 and p[1] == '\n':
-            print(">> optional_newline (Real)")
-        else:
-            print(">> optional_newline (Empty)")
         p[0] = None
 
     def p_error(self, p):
         if p:
-            token_type = p.type
-            token_value = p.value
-            lineno = p.lineno
-            lexpos = p.lexpos
-            print(f"\nSyntax error: unexpected token '{token_value}' (type: {token_type}) at line {lineno}, position {lexpos}")
+            self.errors.append(Error(
+                f"Syntax error: unexpected token '{p.value}' (type: {p.type})",
+                p.lineno, p.lexpos, 'parser', self.source_map
+            ))
+            print(self.errors[-1])
 
     ############################################
     #   PRODUCTIONS FOR DATATYPES AND SYMBOLS  #
@@ -116,7 +210,6 @@ class Parser:
                      | TRUE
                      | FALSE
         '''
-        print(f">> data_type: {p[1]}")
         p[0] = p[1]
 
     # referentiable data types
@@ -125,21 +218,18 @@ class Parser:
                          | objects_use
                          | access_id       
         ''' 
-        print(">> ref_data_type")
         p[0] = p[1]
 
     # for the use of objects
     # object.data
     def p_objects_use(self, p):
         'objects_use : ID DOT ID'
-        print(">> objects_use")
-        p[0] = ("class atribute use", p[1], p[3])
+        p[0] = ClassAttribute(p[1], p[3], *self._position(p, 1))
 
     # numbers
     def p_number(self, p):
         '''number : INTEGER 
                   | FLOAT'''
-        print(">> number")
         p[0] = p[1]
 
     # strings
@@ -149,7 +239,6 @@ class Parser:
                   | number_to_string
                   | string_part
         '''
-        print(f">> string {p[1]}")
         p[0] = p[1]
 
     def p_string_part(self, p):
@@ -162,8 +251,6 @@ class Parser:
         else:
             p[0] = p[1][p[3]]
 
-        print(f">> string_part {p[0]}")
-
     def p_list(self, p):
         '''list : ret_value_operation
                 | final_string
@@ -173,27 +260,23 @@ class Parser:
                 | list COMMA dict
                 | list COMMA array
         '''
+        # always a list, also with one element or a list as its first element
         if len(p) == 2:
-            print(f">> list {p[1]}")
+            p[0] = [p[1]]
         else:
-            print(f">> list {p[1]}, {p[3]}")
-            if type(p[1]) != list:
-                p[1] = [p[1]]
             p[1].append(p[3])
-        
-        p[0] = p[1]
+            p[0] = p[1]
     
     def p_array(self, p):
         '''array : LBRACKET list RBRACKET
+                 | LBRACKET RBRACKET
         '''
-        print(f">> array {p[2]}")
-        p[0] = p[2]
+        p[0] = p[2] if len(p) == 4 else []
 
     def p_set(self, p):
         '''set : LBRACE list RBRACE
         '''
-        print(f">> set {p[2]}")
-        p[0] = p[2]
+        p[0] = p[2] if len(p[2]) > 1 else p[2][0]
 
     def p_dict_set(self, p):
         '''dict_set : dict
@@ -204,8 +287,7 @@ class Parser:
     def p_tuple(self, p):
         '''tuple : LPAREN list RPAREN
         '''
-        print(f">> tuple {p[2]}")
-        p[0] = p[2]
+        p[0] = p[2] if len(p[2]) > 1 else p[2][0]
 
     def p_dict_trash(self,p):
         '''dict_trash : NEWLINE
@@ -213,33 +295,28 @@ class Parser:
                       | DENT
                       | dict_trash dict_trash
         '''
-        print(">> dict trash")
         p[0] = None
     
     def p_optional_dict_trash(self, p):
         '''optional_dict_trash : dict_trash
                                | empty
         '''
-        print(">> optional_dict_trash")
         p[0] = None
 
     def p_dict(self, p):
         '''dict : LBRACE optional_dict_trash dict_items_opt optional_dict_trash RBRACE
         '''
-        print(">> dict")
         p[0] = p[3] if p[3] is not None else {}
 
     def p_dict_items_opt(self, p):
         '''dict_items_opt : dict_items
                           | empty'''
-        print(">> dict_items_opt")
         p[0] = p[1]
 
     def p_dict_items(self, p):
         '''dict_items : dict_item
                       | dict_items COMMA optional_dict_trash dict_item
         '''
-        print(">> dict_items")
         if len(p) == 2:
             p[0] = {p[1][0]: p[1][1]}
         else:
@@ -253,21 +330,18 @@ class Parser:
                      | key COLON dict
                      | key COLON tuple
         '''
-        print(f">> dict item {p[3]}")
         p[0] = (p[1], p[3])
 
     def p_key(self, p):
         '''key : final_string
                | ret_value_operation
         '''
-        print(f">> key {p[1]}")
         p[0] = p[1]
 
     def p_next(self, p):
         '''next_clause : NEXT LPAREN ref_data_type RPAREN
         '''
-        print(f">> next_clause {p[3]}")
-        p[0] = ('NEXT', p[3])
+        p[0] = Next(p[3], *self._position(p, 1))
 
     def p_access_id(self, p):
         '''access_id : ID LBRACKET ret_value_operation RBRACKET
@@ -275,22 +349,9 @@ class Parser:
                      | ID LBRACKET final_string RBRACKET
         '''
         if len(p) == 7:
-            print(f">> access id {p[1]} {p[3]} {p[5]}")
-            p[0] = ("access_id", p[1], p[3], p[5])
+            p[0] = AccessId(p[1], p[3], p[5], *self._position(p, 1))
         else:
-            print(f">> access_id {p[1]} {p[3]}")
-            p[0] = ("access_id", p[1], p[3])
-
-    def p_arithmetic_symbol(self, p):
-        '''arithmetic_symbol : PLUS 
-                             | MINUS
-                             | MUL 
-                             | DIV 
-                             | INT_DIV 
-                             | MOD 
-                             | POW'''
-        print(">> arithmetic_symbol")
-        p[0] = p[1]
+            p[0] = AccessId(p[1], p[3], None, *self._position(p, 1))
 
     def p_assignment_symbol(self, p):
         '''assignment_symbol : ADD_ASSIGN 
@@ -300,23 +361,7 @@ class Parser:
                              | MOD_ASSIGN 
                              | INT_DIV_ASSIGN 
                              | POW_ASSIGN'''
-        print(">> assignment_symbol")
-        p[0] = p[1]
-
-    def p_relational_symbol(self, p):
-        '''relational_symbol : EQUAL 
-                             | NOT_EQUAL 
-                             | GREATER 
-                             | LESS 
-                             | GREATER_EQUAL 
-                             | LESS_EQUAL'''
-        print(">> relational_symbol")
-        p[0] = p[1]
-
-    def p_binary_logical_operator(self, p):
-        '''binary_logical_operator : AND 
-                                   | OR'''
-        print(">> binary_logical_operator")
+        self._mark(p)
         p[0] = p[1]
 
     #################################
@@ -334,7 +379,6 @@ class Parser:
                     | loop
                     | append
         '''
-        print(">> sentence")
         p[0] = p[1]
 
     # recursive rule for a group of sentences
@@ -345,13 +389,13 @@ class Parser:
         if len(p) == 3:
             p[0] = [p[1]]
         else:
-            p[0] = p[1] + [p[2]]
+            p[1].append(p[2])
+            p[0] = p[1]
     
     def p_print(self, p):
         '''print : PRINT LPAREN expression RPAREN
         '''
-        print(f">> print {p[3]}")
-        p[0] = ("print_call", p[3])
+        p[0] = Print(p[3], *self._position(p, 1))
 
     #############################################
     #   PRODUCTIONS FOR SINGLE LINE OPERATIONS  #
@@ -366,62 +410,40 @@ class Parser:
                      | iter_assignment
                      | dict_assignment
         '''
-        print(">> operation")
         p[0] = p[1]
 
     def p_assign_iter(self, p):
         '''iter_assignment : ref_data_type ASSIGN ITER LPAREN ref_data_type RPAREN
                            | ref_data_type ASSIGN ITER LPAREN expression RPAREN
         '''
-        print(">> iter_assignment")
-        p[0] = (p[1], p[5])
+        p[0] = IterAssignment(p[1], p[5], *self._position(p, 2))
 
     def p_assign_dict(self, p):
         '''dict_assignment : ref_data_type ASSIGN dict
         '''
-        print(">> dict_assignment")
-        p[0] = (p[1], p[3])
-        self._insert_symbol_from_assignment(p[1], p[3], category='variable')
+        p[0] = DictAssignment(p[1], p[2], p[3], *self._position(p, 2))
 
     def p_assign_array(self, p):
         '''array_assignment : ref_data_type ASSIGN array
                             | ref_data_type ASSIGN tuple
                             | ref_data_type ASSIGN dict_set
         '''
-        print(">> array_assignment")
         if isinstance(p[3], dict):
-            self._insert_symbol_from_assignment(p[1], p[3], category='variable')
-            p[0] = ("dictionary assignment", p[1], p[2], p[3])
+            p[0] = DictAssignment(p[1], p[2], p[3], *self._position(p, 2))
         else:
-            self._insert_symbol_from_assignment(p[1], p[3], category='variable')    
-            p[0] = ("array assignment", p[1], p[2], p[3])
+            p[0] = ArrayAssignment(p[1], p[2], p[3], *self._position(p, 2))
 
 
     def p_simple_assignment_operation(self, p):
         '''simple_assignment_operation : ref_data_type ASSIGN expression
         '''
-        print(">> simple_assignment_operation")
-        self._insert_symbol_from_assignment(p[1],  p[3], category='variable')
-        p[0] = ("simple_assignment_operation", p[1], p[2], p[3])
+        p[0] = Assignment(p[1], p[2], p[3], *self._position(p, 2))
 
     # other types of assignment operations
     # the other assignment symbols only work between a referentiable data and a number
     def p_assignment_operation(self, p):
         'assignment_operation : ID assignment_symbol number'
-        name = p[1]
-        number = p[3]
-        typ = self._infer_type(number)
-        existing = self.symtab.lookup(name)
-        if existing:
-            # intentar compatibilidad, si no compatible, reemplazar
-            comp = self.symtab.check_type_compatibility(existing.datatype, typ)
-            if comp:
-                self.symtab.update_type(name, comp)
-            else:
-                self.symtab.update_type(name, typ)
-        else:
-            self.symtab.insert(name, typ, category='variable')
-        p[0] = ("assignment_operation", name, p[2], number)
+        p[0] = AugmentedAssignment(p[1], p[2], p[3], *self._position(p, 1))
 
     # all types of operations and statements that return a value
     def p_expression(self, p):
@@ -433,34 +455,32 @@ class Parser:
                       | dict_set
                       | append
         '''
-        print(f">> expression: {p[1]}")
         p[0] = p[1]
 
     def p_append(self, p):
         '''append : ID DOT APPEND LPAREN expression RPAREN
         '''
-        print(f">> Append {p[1]}.append({p[5]})")
-        target = p[1]
-        value = p[5]
-        existing = self.symtab.lookup(target)
-        if existing is None:
-            # asumimos lista
-            typ = self._infer_type(value)
-            # guardamos como list (sin detalle de element type)
-            self.symtab.insert(target, 'list', category='variable')
-        else:
-            if existing.datatype != 'list':
-                # posible inconsistencia: forzamos a list
-                self.symtab.update_type(target, 'list')
-        p[0]= ("append", p[1], p[5])
+        p[0] = Append(p[1], p[5], *self._position(p, 1))
 
     # this works for all types of operations that return a value
     # includes arithmethic, logical and relational operations
     # they can all be combined since Python allows it
     def p_ret_value_operation(self, p):
-        '''ret_value_operation : ret_value_operation arithmetic_symbol ret_value_operation
-                               | ret_value_operation binary_logical_operator ret_value_operation
-                               | ret_value_operation relational_symbol ret_value_operation
+        '''ret_value_operation : ret_value_operation PLUS ret_value_operation
+                               | ret_value_operation MINUS ret_value_operation
+                               | ret_value_operation MUL ret_value_operation
+                               | ret_value_operation DIV ret_value_operation
+                               | ret_value_operation INT_DIV ret_value_operation
+                               | ret_value_operation MOD ret_value_operation
+                               | ret_value_operation POW ret_value_operation
+                               | ret_value_operation AND ret_value_operation
+                               | ret_value_operation OR ret_value_operation
+                               | ret_value_operation EQUAL ret_value_operation
+                               | ret_value_operation NOT_EQUAL ret_value_operation
+                               | ret_value_operation GREATER ret_value_operation
+                               | ret_value_operation LESS ret_value_operation
+                               | ret_value_operation GREATER_EQUAL ret_value_operation
+                               | ret_value_operation LESS_EQUAL ret_value_operation
                                | LPAREN ret_value_operation RPAREN
                                | NOT ret_value_operation
                                | number
@@ -469,28 +489,35 @@ class Parser:
                                | function_call
                                | check_in_collection
         '''
-        print(">> ret_value_operation ")
         if len(p) == 2:
             p[0] = p[1]
         elif len(p) == 3:
-            p[0] = ("unary_operation", "NOT", p[2])
+            p[0] = UnaryOperation("NOT", p[2], *self._position(p, 1))
         elif len(p) == 4:
             if p[1] == '(':
                 p[0] = p[2]
+                self._comparisons.discard(p[2])
             else:
-                operator = p[2]
-                if operator in ('+', '-', '*', '/', '//', '%', '**'):
-                    p[0] = ("arithmetic_operation", p[1], operator, p[3])
-                elif operator in ('and', 'or'): 
-                    p[0] = ("logical_operation", p[1], operator, p[3])
-                elif operator in ('==', '!=', '<', '>', '<=', '>='):
-                    p[0] = ("relational_operation", p[1], operator, p[3])
-                else:
-                    p[0] = ("other_operation", p[1], operator, p[3])
+                # the operator token decides the node, see _operation_node,
+                # its precedence and associativity the shape of the tree
+                p[0] = self._operation_node[p.slice[2].type](p[1], p[2], p[3], *self._position(p, 2))
+                if type(p[0]) is RelationalOperation:
+                    p[0] = self._chain(p[0])
+
+    def _chain(self, comparison):
+        # a < b < c is a < b and b < c, b is written (and evaluated) twice
+        left = comparison.left
+        if left in self._comparisons:
+            self._comparisons.discard(left)
+            last = left.right if type(left) is LogicalOperation else left
+            comparison.left = last.right
+            comparison = LogicalOperation(left, 'and', comparison, comparison.line, comparison.column)
+        self._comparisons.add(comparison)
+        return comparison
 
     def p_check_in_collection(self, p):
         'check_in_collection : ret_value_operation IN ref_data_type'
-        p[0] = ('in', p[1], p[3])
+        p[0] = CheckInCollection(p[1], p[3], *self._position(p, 2))
 
     ###################################################
     #   PRODUCTIONS FOR STRING OPERATIONS AND PRINTS  #
@@ -499,8 +526,7 @@ class Parser:
     # for str(number)
     def p_number_to_string(self, p):
         'number_to_string : STR LPAREN number RPAREN'
-        print(">> number_to_string")
-        p[0] = ('num->str', p[1], p[3])
+        p[0] = NumberToString(p[3], *self._position(p, 1))
 
     # string concatenation
     def p_string_concat(self, p):
@@ -514,13 +540,11 @@ class Parser:
             p[0] = p[2] + p[4]
         else:
             p[0] = p[1] + p[3]
-        print(f">> String concat: {p[0]}")
 
     def p_final_string(self, p):
         '''final_string : string_concat
         '''
         p[0] = f"\"{p[1]}\""
-        print(f">> final_string: {p[0]}")
 
     ##############################################################
     #   PRODUCTIONS FOR FUNCTIONS, ARGUMENTS AND FUNCTION CALLS  #
@@ -533,11 +557,10 @@ class Parser:
                     | ID COLON expression
                     | ID ASSIGN expression
         '''
-        print(">> argument")
         if len(p) == 2:
-            p[0] = ("argument", p[1], None)
+            p[0] = Argument(p[1], None, *self._position(p, 1))
         else:
-            p[0] = ("argument", p[1], p[3])
+            p[0] = Argument(p[1], p[3], *self._position(p, 1))
 
     # recursive rule for arguments
     def p_arguments(self, p):
@@ -545,16 +568,14 @@ class Parser:
                     | arguments COMMA argument
                     | empty
         '''
-        print(">> arguments")
         if len(p) == 2:
             if p[1] is None:
-                p[0] = ("arguments", [])
+                p[0] = Arguments([])
             else:
-                p[0] = ("arguments", [p[1]])
+                p[0] = Arguments([p[1]])
         else:
-            prev_args = p[1][1]
-            new_list = prev_args + [p[3]]
-            p[0] = ("arguments", new_list)
+            p[1].items.append(p[3])
+            p[0] = p[1]
 
     # for function calls
     # works for simple, normal function calls and function calls inside classes
@@ -562,8 +583,9 @@ class Parser:
         '''function_call : ID LPAREN arguments RPAREN
                          | objects_use LPAREN arguments RPAREN
         '''
-        print(">> function_call")
-        p[0] = ("function_call", p[1], p[3])
+        # the argument list starts at its parenthesis
+        p[3].line, p[3].column = self._position(p, 2)
+        p[0] = FunctionCall(p[1], p[3], *self._position(p, 1))
 
     # for returns
     # works for both empty returns and return with a value
@@ -571,11 +593,10 @@ class Parser:
         '''return : RETURN expression
                   | RETURN 
         '''
-        print(">> return")
         if len(p) == 2:
-            p[0] = ('return', None)
+            p[0] = Return(None, *self._position(p, 1))
         else:
-            p[0] = ('return expression', p[2])
+            p[0] = Return(p[2], *self._position(p, 1))
     
     # for optional returns
     def p_optional_return(self, p):
@@ -592,68 +613,36 @@ class Parser:
                          | return NEWLINE
                          | PASS NEWLINE
         '''
-        print(">> function_body")
-        if len(p) == 4:
-            p[0] = ('complete function body', p[1], p[2])
-        else:
-            p[0] = ('incomplete function body', p[1])
+        p[0] = self._body(FunctionBody, p)
 
     def p_enter_block(self, p):
         # indents tell us when does a block start
-        # we use this to create a new scope in the symbol table
+        # scopes are opened by the semantic pass (src/semantic.py), not while parsing
         'enter_block : INDENT'
-        # if there is an pending scope name, use it
-        # if not, create a new one
-        if self._pending_scope_name:
-            self.symtab.enter_scope(self._pending_scope_name)
-            print(f">> enter_block: created scope {self._pending_scope_name}")
-            self._pending_scope_name = None
-        else:
-            scope_name = self.symtab.enter_scope()
-            print(f">> enter_block: created scope {scope_name}")
         p[0] = None
 
     def p_exit_block(self, p):
         # dents tell us when does a block end
         'exit_block : DENT'
-        # it allows us to exit the current scope in the symbol table
-        self.symtab.exit_scope()
-        print(f">> exit_block: back to scope {self.symtab.current_scope}")
         p[0] = None
 
     def p_def_header(self, p):
         '''def_header : DEF ID LPAREN arguments RPAREN COLON NEWLINE'''
-        # store function name so that symbol table creates a scope with that name
-        func_name = p[2]
-        self._pending_scope_name = f"function::{func_name}"
-        self.symtab.insert(func_name, 'function', category='function')
-        print(f">> def_header (pending scope for function {func_name})")
-        p[0] = (func_name, p[4])
+        self._mark(p)
+        p[4].line, p[4].column = self._position(p, 3)
+        p[0] = (p[2], p[4])
 
     def p_function(self, p):
         '''function : def_header enter_block function_body exit_block'''
-        print(">> function")
         func_name, args = p[1]
-        args_list = args[1]
-        for arg in args_list:
-            if arg[0] == "argument":
-                name = arg[1] if isinstance(arg[1], str) else None
-                default = arg[2]
-                if name:
-                    typ = self._infer_type(default) if default is not None else 'unknown'
-                    self.symtab.insert(name, typ, category='parameter')
-        p[0] = ("function", func_name, args, p[3])
+        p[0] = Function(func_name, args, p[3], *self._position(p, 1))
 
     def p_block_body(self, p):
         '''block_body : sentences optional_return optional_newline
                       | return optional_newline
                       | PASS optional_newline
         '''
-        print(">> block_body")
-        if len(p) == 3:
-            p[0] = ('complete block body', p[1], p[2])
-        else:
-            p[0] = ('incomplete block body', p[1])
+        p[0] = self._body(BlockBody, p)
 
     ################################
     # PRODUCTIONS FOR IF-ELIF-ELSE #
@@ -665,49 +654,30 @@ class Parser:
                        | if_clause INDENT block_body DENT else_clause
                        | if_clause INDENT block_body DENT
         '''
-        print(f">> conditional")
-        if len(p) == 5:
-            # Just if
-            p[0] = ('conditional', ('if', p[1], p[3]))
-        elif len(p) == 6:
-            # if + elif(s) OR if + else
-            p[0] = ('conditional', ('if', p[1], p[3]), p[5])
-        else:
-            # if + elif(s) + else
-            p[0] = ('conditional', ('if', p[1], p[3]), p[5], p[6])
+        p[0] = self._conditional(p)
 
     def p_elif_list(self, p):
         '''elif_list : elif_list elif_clause INDENT block_body DENT
                      | elif_clause INDENT block_body DENT
         '''
-        print(">> elif_list")
-        if len(p) == 5:
-            # Single elif
-            p[0] = ('elif_list', [('elif', p[1], p[3])])
-        else:
-            # Multiple elifs
-            if p[1][0] == 'elif_list':
-                p[0] = ('elif_list', p[1][1] + [('elif', p[2], p[4])])
-            else:
-                p[0] = ('elif_list', [p[1], ('elif', p[2], p[4])])
+        p[0] = self._elif_list(p)
 
     def p_if_clause(self, p):
         '''if_clause : IF ret_value_operation COLON NEWLINE
         '''
-        print(">> if_clause")
+        self._mark(p)
         p[0] = p[2]
 
     def p_elif_clause(self, p):
         '''elif_clause : ELIF ret_value_operation COLON NEWLINE
         '''
-        print(">> elif_clause")
+        self._mark(p)
         p[0] = p[2]
 
     def p_else_clause(self, p):
         '''else_clause : ELSE COLON NEWLINE INDENT block_body DENT
         '''
-        print(">> else_clause")
-        p[0] = ('else', p[5])
+        p[0] = p[5]
 
     ###############################
     #   PRODUCTIONS FOR LOOPS     #
@@ -717,25 +687,26 @@ class Parser:
         '''in_clause : ID IN ref_data_type
                      | ID IN expression
                      | ID IN RANGE LPAREN ret_value_operation RPAREN
+                     | ID IN RANGE LPAREN ret_value_operation COMMA ret_value_operation RPAREN
+                     | ID IN RANGE LPAREN ret_value_operation COMMA ret_value_operation COMMA ret_value_operation RPAREN
         '''
         if len(p) == 4:
-            print(f">> in_clause {p[1]}, {p[3]}")
-            p[0] = ('in_clause', p[1], p[3])
+            p[0] = InClause(p[1], p[3], *self._position(p, 1))
+        elif len(p) == 7:
+            p[0] = InRangeClause(p[1], 0, p[5], 1, *self._position(p, 1))
         else:
-            print(f">> in_range_clause {p[1]}, {p[5]}")
-            p[0] = ('in_range_clause', p[1], p[5])
+            step = p[9] if len(p) == 11 else 1
+            p[0] = InRangeClause(p[1], p[5], p[7], step, *self._position(p, 1))
 
     def p_for_clause(self, p):
         '''for_clause : FOR in_clause COLON NEWLINE
         '''
-        print(">> for_clause")
-        p[0] = ('for', p[2])
+        p[0] = For(p[2], *self._position(p, 1))
 
     def p_while_clause(self, p):
         '''while_clause : WHILE ret_value_operation COLON NEWLINE
         '''
-        print(">> while_clause")
-        p[0] = ('while', p[2])
+        p[0] = While(p[2], *self._position(p, 1))
 
     # Loop-specific statement that includes break/continue
     def p_loop_statement(self, p):
@@ -746,10 +717,10 @@ class Parser:
                           | conditional
                           | print
                           | loop
+                          | append
                           | BREAK
                           | CONTINUE
         '''
-        print(f">> loop_statement: {p[1]}")
         p[0] = p[1]
 
     # Loop statements can be repeated
@@ -760,7 +731,8 @@ class Parser:
         if len(p) == 3:
             p[0] = [p[1]]
         else:
-            p[0] = p[1] + [p[2]]
+            p[1].append(p[2])
+            p[0] = p[1]
 
     # Loop body is similar to block_body but allows break/continue
     def p_loop_body(self, p):
@@ -768,11 +740,7 @@ class Parser:
                      | return
                      | PASS
         '''
-        print(f">> loop_body")
-        if len(p) == 3:
-            p[0] = ('complete loop body', p[1], p[2])
-        else:
-            p[0] = ('simple loop body', p[1])
+        p[0] = self._body(LoopBody, p)
 
     # Conditionals inside loops
     def p_loop_conditional(self, p):
@@ -781,51 +749,36 @@ class Parser:
                             | loop_if_clause INDENT loop_body DENT loop_else_clause
                             | loop_if_clause INDENT loop_body DENT
         '''
-        print(f">> loop_conditional")
-        if len(p) == 5:
-            p[0] = ('loop_conditional', ('conditional', p[1], p[3]))
-        elif len(p) == 6:
-            p[0] = ('loop_conditional', ('conditional', p[1], p[3]), p[5])
-        elif len(p) == 7:
-            p[0] = ('loop_conditional', ('conditional', p[1], p[3]), p[5], p[6])
+        p[0] = self._conditional(p)
 
     def p_loop_elif_list(self, p):
         '''loop_elif_list : loop_elif_list loop_elif_clause INDENT loop_body DENT
                           | loop_elif_clause INDENT loop_body DENT
         '''
-        print(">> loop_elif_list")
-        if len(p) == 5:
-            p[0] = ('elif_list', [('elif', p[1], p[3])])
-        else:
-            if p[1][0] == 'elif_list':
-                p[0] = ('elif_list', p[1][1] + [('elif', p[2], p[4])])
-            else:
-                p[0] = ('elif_list', [p[1], ('elif', p[2], p[4])])
+        p[0] = self._elif_list(p)
 
     def p_loop_if_clause(self, p):
         '''loop_if_clause : IF ret_value_operation COLON NEWLINE
         '''
-        print(">> loop_if_clause")
+        self._mark(p)
         p[0] = p[2]
 
     def p_loop_elif_clause(self, p):
         '''loop_elif_clause : ELIF ret_value_operation COLON NEWLINE
         '''
-        print(">> loop_elif_clause")
+        self._mark(p)
         p[0] = p[2]
 
     def p_loop_else_clause(self, p):
         '''loop_else_clause : ELSE COLON NEWLINE INDENT loop_body DENT
         '''
-        print(">> loop_else_clause")
-        p[0] = ('else', p[5])
+        p[0] = p[5]
 
     def p_loop(self, p):
         '''loop : for_clause INDENT loop_body DENT
                 | while_clause INDENT loop_body DENT
         '''
-        print(f">> loop {p[1]}, {p[3]}")
-        p[0] = ("loop", p[1], p[3])
+        p[0] = Loop(p[1], p[3], *self._position(p, 1))
 
     ###############################
     #   PRODUCTIONS FOR CLASSES   #
@@ -835,15 +788,42 @@ class Parser:
     def p_class_body(self, p):
         '''class_body : sentences
         '''
-        print(">> class_body")
         p[0] = p[1]
 
     # for complete classes
     def p_class(self, p):
         '''class : CLASS ID COLON NEWLINE INDENT class_body DENT'''
-        print(">> class")
-        p[0] = ('class', p[2], p[6])
+        p[0] = ClassDef(p[2], p[6], *self._position(p, 1))
+
+    def _set_source_map(self, source_map):
+        # without a SourceMap node columns are left as lexpos
+        self.source_map = source_map
+        self._line_starts = source_map.line_starts if source_map is not None else None
 
     def parse(self, source, lexer):
-        result = self.parser.parse(source, lexer=lexer.lex, debug=True)        
+        # lexer is a src.lexer.Lexer, its SourceMap is shared with the syntax errors
+        lexer.input(source)
+        self._comparisons.clear()
+        self._set_source_map(lexer.source_map)
+        result = self.parser.parse(lexer=lexer, debug=self.debug)
         return result
+
+    def parse_tokens(self, tokens):
+        # parses an already lexed src.token_buffer.TokenBuffer
+        self._comparisons.clear()
+        self._set_source_map(tokens.source_map)
+        result = self.parser.parse(lexer=tokens.reader(), debug=self.debug)
+        return result
+
+    def parse_file(self, path, lexer):
+        # same as parse but the lexer reads path through a memory map in chunks
+        lexer.input_file(path)
+        self._comparisons.clear()
+        self._set_source_map(lexer.source_map)
+        result = self.parser.parse(lexer=lexer, debug=self.debug)
+        return result
+
+
+if __name__ == '__main__':
+    # python -m src.parser
+    print(f"LALR table cache written to {Parser.build_table_cache()}")
@@ -0,0 +1,644 @@
+from collections import Counter
+from src.ast_nodes import (
+    NODE_TYPES, AccessId, Append, ArithmeticOperation, Assignment, ClassAttribute, ClassDef, Conditional, Function,
+    FunctionCall, IterAssignment, Next, Node, Print, Return,
+)
+from src.symbol_table import SymbolTable
+
+# datatypes that are written as a concrete C++ type, everything else is a PyValue,
+# the dynamic value of utilities.hpp
+CPP_TYPES = {
+    'int': 'int',
+    'float': 'double',
+    'bool': 'bool',
+    'str': 'std::string',
+    'list': 'std::vector<PyValue>',
+    'list[int]': 'std::vector<int>',
+    'list[float]': 'std::vector<double>',
+    'list[str]': 'std::vector<std::string>',
+    'dict': 'std::map<std::string, PyValue>',
+    'any': 'PyValue',
+}
+
+def cpp_type(datatype):
+    # C++ type of a declared variable
+    return CPP_TYPES.get(datatype, 'PyValue')
+
+def join(datatypes):
+    # one datatype for all the values a parameter receives or a function returns,
+    # ints mixed with floats are widened, any other mix is any
+    kinds = set(datatypes)
+    if kinds == {'int', 'float'}:
+        return 'float'
+    if len(kinds) == 1:
+        datatype = kinds.pop()
+        if datatype in CPP_TYPES:
+            return datatype
+    return 'any'
+
+def list_of(element):
+    # datatype of a list of elements of one datatype, a list of anything else holds PyValues
+    datatype = f"list[{element}]"
+    return datatype if datatype in CPP_TYPES else 'list'
+
+def is_list(datatype):
+    return datatype == 'list' or (isinstance(datatype, str) and datatype.startswith('list['))
+
+def known(datatypes):
+    # join of the known datatypes, None when there is none
+    datatypes = [datatype for datatype in datatypes if datatype is not None]
+    return join(datatypes) if datatypes else None
+
+# nodes that print, change a list or an object, or advance an iterator, a function that
+# writes one of them is not pure
+IMPURE = (Print, Append, IterAssignment, Next, ClassAttribute, ClassDef, Function)
+
+def nodes_in(value):
+    # every node written in value, value included
+    if isinstance(value, Node):
+        yield value
+        for field in value.fields:
+            yield from nodes_in(getattr(value, field))
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            yield from nodes_in(v)
+    elif isinstance(value, dict):
+        for k, v in value.items():
+            yield from nodes_in(k)
+            yield from nodes_in(v)
+
+def specialized_name(name, params):
+    # C++ name of the specialization of a function for the datatypes of its parameters,
+    # a typed list is written as list_int
+    return "__".join((name, "_".join(param.replace('[', '_').rstrip(']') for param in params)))
+
+def is_string(value):
+    # a string literal, kept with its quotes by the parser
+    return value[0] == "\"" and value[-1] == "\""
+
+def dict_key(key, symbol):
+    # C++ key of a dict literal entry, a name is replaced by the value of its symbol
+    if not isinstance(key, str):
+        key = str(key)
+    elif not is_string(key) and symbol is not None and symbol.value is not None:
+        key = str(symbol.value)
+    if not (key[0] == "\"" and key[-1] == "\""):
+        key = f"\"{key}\""
+    return key
+
+class SemanticAnalyzer:
+    # Walks the parse tree once, before code generation, and fills the symbol table
+    # with the same scopes and in the same order the Visitor writes the code.
+    # The results are kept per node, so the Visitor only reads them:
+    #   names: node -> {name: Symbol or None} for the plain names written in that node
+    #   declared: assignment or parameter node -> datatype, for the ones that declare their variable
+    #   types: expression node -> inferred datatype, computed bottom-up once per node from
+    #          the types of its operands, so nested expressions are never inferred again
+    #   routes: function call node -> parameter datatypes of the specialization it calls
+    #   signatures: function name -> (parameter datatypes, returned datatype) of the generic
+    #               function, None while unknown, a parameter datatype is None when no call
+    #               passes it an argument
+    #   specializations: function name -> {parameter datatypes: returned datatype}
+    #   generic: names of the functions whose generic version is written
+    #   variants: (function name, parameter datatypes) -> (names, declared, types, routes)
+    #             of the body of every specialization
+    #   elements: list assignment node -> datatype of the elements added to the list it
+    #             declares after its literal, None when lists are not typed
+    #   pure: names of the recursive functions whose calls only compute the value they
+    #         return from their arguments, see find_pure
+    #   tail: function name -> (operator, {site: (call, operand, left)}) for the calls of a
+    #         function to itself that can go back to its start instead, see find_tail_calls
+    # Symbols of closed scopes stay reachable from these tables only.
+    #
+    # A list whose elements are all int, float (ints mixed with floats are widened) or str
+    # is a typed std::vector, any other list holds PyValues. The elements are the ones of
+    # its literal and every one appended, stored at an index or assigned with a new literal,
+    # and a list passed to a PyValue parameter holds PyValues.
+    #
+    # The signatures and element datatypes are inferred over the whole program: every
+    # pass walks the tree with the signatures found by the previous one, and collects the
+    # datatypes of the arguments at every call and of every returned value. Parameters and
+    # calls of functions without a signature yet are unknown and are left out. When a
+    # function is called with more than one set of argument datatypes, the most common
+    # ones, up to max_specializations, get a specialization of their own, walked and written
+    # once per set, and the other calls go to the generic function. When the signatures do
+    # not change, the ones still unknown become any and the passes go on until they settle
+    # again, the results are the tables of that last pass. If they do not, every function
+    # gets an any signature, every list holds PyValues and the tree is walked once more.
+    INFERENCE_PASSES = 16
+    MAX_SPECIALIZATIONS = 4
+    RESULTS = ('symbol_table', 'names', 'declared', 'types', 'routes', 'variants')
+
+    def __init__(self, symbol_table=None, signatures=None, max_specializations=MAX_SPECIALIZATIONS):
+        self.symbol_table = symbol_table if symbol_table is not None else SymbolTable()
+        self.max_specializations = max_specializations
+        self.names = {}
+        self.declared = {}
+        self.types = {}
+        self.routes = {}
+        self.signatures, self.specializations, self.generic, self.elements = signatures or ({}, {}, set(), {})
+        self.variants = {}
+        self.pure = set()
+        self.tail = {}
+        self.declarations = {}  # symbol of a list -> assignment node that declares it
+        self.appended = {}  # list assignment node -> datatypes of the elements added after its literal
+        self.arguments = {}  # function name -> datatypes of the arguments of every call to it
+        self.returns = {}  # (function name, parameter datatypes) -> datatypes of its returned values
+        self.unknown = set()  # symbols of parameters without an inferred datatype
+        self.function = None  # (function name, parameter datatypes) being walked, None for the generic one
+        # method of every node kind, the generic walk when there is none
+        self.dispatch = [getattr(self, f"analyze_{node_type.tag}", self.analyze_node) for node_type in NODE_TYPES]
+
+    def analyze(self, tree):
+        if not self.infer_signatures(tree):
+            self.symbol_table = type(self.symbol_table)()
+            self.visit(tree)
+        self.pure = self.find_pure(tree)
+        self.tail = self.find_tail_calls(tree)
+        return self
+
+    def find_pure(self, tree):
+        # recursive functions that do not print, change a list, an object or a global, read
+        # a global or call a function that is not pure, so a call with the same arguments
+        # always returns the same value and does nothing else
+        functions = {node.name: node for node in tree if type(node) is Function}
+        calls = {}
+        for name, function in functions.items():
+            # the names resolved in the body are the same in every specialization
+            if name in self.generic:
+                names = self.names
+            else:
+                names = self.variants[name, next(iter(self.specializations[name]))][0]
+            called = set()
+            for node in nodes_in(function.body):
+                if isinstance(node, IMPURE) or (isinstance(node, Assignment) and not isinstance(node.target, str)):
+                    break
+                if type(node) is FunctionCall:
+                    if not isinstance(node.name, str) or node.name not in functions:
+                        break
+                    called.add(node.name)
+                if any(symbol is not None and symbol.scope == 'global' for symbol in names.get(node, {}).values()):
+                    break
+            else:
+                calls[name] = called
+        # a function calling one that is not pure is not pure either
+        impure = True
+        while impure:
+            impure = [name for name, called in calls.items() if not called <= calls.keys()]
+            for name in impure:
+                del calls[name]
+        return {name for name, called in calls.items() if name in called}
+
+    def infer_signatures(self, tree):
+        # True when the passes settle, with the results of the last one kept
+        functions = {node.name: node for node in tree if type(node) is Function}
+        signatures = (dict.fromkeys(functions), {}, set(functions), {})
+        table = self.symbol_table
+        settle = False
+        for _ in range(self.INFERENCE_PASSES):
+            run = SemanticAnalyzer(symbol_table=table, signatures=signatures, max_specializations=self.max_specializations)
+            run.visit(tree)
+            found = run.found_signatures(functions, settle)
+            if found == signatures and not settle:
+                settle = True
+                found = run.found_signatures(functions, settle)
+            if found == signatures:
+                for name in self.RESULTS:
+                    setattr(self, name, getattr(run, name))
+                self.signatures, self.specializations, self.generic, self.elements = signatures
+                return True
+            signatures = found
+            table = type(self.symbol_table)()
+        anys = {name: (('any',) * len(f.args.items), 'any') for name, f in functions.items()}
+        self.signatures, self.specializations, self.generic, self.elements = anys, {}, set(functions), None
+        return False
+
+    def found_signatures(self, functions, settle):
+        # signatures of the datatypes seen by the last walk, once settled what is still
+        # unknown is any
+        signatures, specializations, generic = {}, {}, set()
+        elements = {}
+        for node, datatypes in self.appended.items():
+            element = known(datatypes + [self.elements.get(node)])
+            if element is not None:
+                elements[node] = element
+        unknown = 'any' if settle else None
+        for name, function in functions.items():
+            params = function.args.items
+            calls = [datatypes for datatypes in self.arguments.get(name, ()) if len(datatypes) == len(params)]
+            # the most common complete sets of argument datatypes are specialized
+            counts = Counter(datatypes for datatypes in calls if None not in datatypes)
+            keys = [datatypes for datatypes, _ in counts.most_common(self.max_specializations)] if len(counts) > 1 else []
+            specializations[name] = {key: self.returned((name, key), unknown) for key in keys}
+            calls = [datatypes for datatypes in calls if datatypes not in specializations[name]]
+            if calls or not keys:
+                generic.add(name)
+            observed = [[] for _ in params]
+            for arg, param in zip(observed, params):
+                if param.default is not None:
+                    arg.append(self.value_type(param.default))
+            for datatypes in calls:
+                for arg, datatype in zip(observed, datatypes):
+                    if datatype is not None:
+                        arg.append(datatype)
+            # a parameter that never receives an argument stays unknown
+            found = tuple(join(arg) if arg else unknown for arg in observed)
+            signatures[name] = (found, self.returned((name, None), unknown))
+        return signatures, specializations, generic, elements
+
+    def returned(self, variant, unknown):
+        # returned datatype of a function, unknown when its body was not walked or none
+        # of the values it returns is known yet, and None when it returns no value
+        if variant not in self.returns:
+            return unknown
+        returns = self.returns[variant]
+        if not returns:
+            return 'None'
+        datatypes = [datatype for datatype in returns if datatype is not None]
+        if not datatypes:
+            return unknown
+        if all(datatype == 'None' for datatype in datatypes):
+            return 'None'
+        return join(datatypes)
+
+    def find_tail_calls(self, tree):
+        # the sites of every function that end it with a call to itself with all its
+        # arguments: return f(args), or f(args) as the last statement of a function that
+        # returns nothing, and return x + f(args) or x * f(args) (the call on either side)
+        # when x only calls functions in pure other than f, where x can be added or multiplied
+        # into an accumulator before the call instead of after it. The operator is the one of these last
+        # sites, None when there are none or they use both. Sites inside a loop are left out.
+        tail = {}
+        for function in tree:
+            if type(function) is not Function:
+                continue
+            sites = {}
+            # after a last statement calling itself the function returns None, which only
+            # a function that never returns a value returns at the end of its loop too
+            void = all(node.value is None for node in nodes_in(function.body) if type(node) is Return)
+            self.tail_sites(function, function.body, void, sites)
+            operators = {operator for operator, _ in sites.values() if operator is not None}
+            operator = operators.pop() if len(operators) == 1 else None
+            sites = {site: found for site, (site_operator, found) in sites.items() if site_operator == operator or site_operator is None}
+            if sites:
+                tail[function.name] = (operator, sites)
+        return tail
+
+    def tail_sites(self, function, body, last, sites):
+        # sites of the block body, last when the function ends with it and returns nothing
+        name, count = function.name, len(function.args.items)
+
+        def calls_itself(value):
+            return (type(value) is FunctionCall and value.name == name and len(value.args.items) == count
+                    and all(arg.default is None for arg in value.args.items))
+
+        def calls(value):
+            # the function itself or one that is not pure, the loop would run it before the
+            # calls it is made after
+            return any(type(node) is FunctionCall and (node.name == name or node.name not in self.pure)
+                       for node in nodes_in(value))
+
+        statements, ret = body.statements, body.ret
+        if ret is not None and ret.value is not None:
+            value = ret.value
+            if calls_itself(value):
+                sites[ret] = (None, (value, None, False))
+            elif type(value) is ArithmeticOperation and value.op in ('+', '*'):
+                left, right = value.left, value.right
+                if calls_itself(left) and not calls(right):
+                    sites[ret] = (value.op, (left, right, True))
+                elif calls_itself(right) and not calls(left):
+                    sites[ret] = (value.op, (right, left, False))
+        for i, statement in enumerate(statements):
+            end = last and ret is None and i == len(statements) - 1
+            if type(statement) is Conditional:
+                for block in [statement.body] + [elif_.body for elif_ in statement.elifs] + [statement.orelse]:
+                    if block is not None:
+                        self.tail_sites(function, block, end, sites)
+            elif end and calls_itself(statement):
+                sites[statement] = (None, (statement, None, False))
+
+    def visit(self, node):
+        if isinstance(node, Node):
+            self.dispatch[node.kind](node)
+        elif isinstance(node, list):
+            for n in node:
+                self.visit(n)
+
+    def walk(self, node, value):
+        # resolves the names written in node and visits its child nodes
+        if isinstance(value, Node):
+            self.dispatch[value.kind](value)
+        elif isinstance(value, str):
+            if not is_string(value):
+                self.resolve(node, value)
+        elif isinstance(value, list):
+            for v in value:
+                self.walk(node, v)
+        elif isinstance(value, dict):
+            for k, v in value.items():
+                self.walk(node, k)
+                self.walk(node, v)
+
+    def resolve(self, node, name):
+        symbol = self.symbol_table.lookup(name)
+        names = self.names.get(node)
+        if names is None:
+            names = self.names[node] = {}
+        names[name] = symbol
+        return symbol
+
+    def value_type(self, value):
+        # datatype of a value: read from types for an expression node, inferred for a literal
+        if isinstance(value, Node):
+            return self.types.get(value, 'any')
+        return self.symbol_table.infer_type_from_value(value)
+
+    def operand_type(self, node, value):
+        # datatype of a value written in node, a name has the datatype of its symbol
+        # None while it depends on a function without a signature
+        if isinstance(value, str) and not is_string(value):
+            symbol = self.names[node][value]
+            if symbol is None:
+                return 'any'
+            if symbol in self.unknown:
+                return None
+            return symbol.datatype
+        return self.value_type(value)
+
+    def analyze_node(self, node):
+        for field in node.fields:
+            self.walk(node, getattr(node, field))
+
+    def analyze_body(self, node):
+        self.visit(node.statements)
+        self.visit(node.ret)
+
+    analyze_function_body = analyze_block_body = analyze_loop_body = analyze_body
+
+    def analyze_function_call(self, node):
+        # the name is a function, checked by the Visitor against the functions it wrote
+        # function calls return the function's return type
+        args = node.args.items
+        for arg in args:
+            self.walk(arg, arg.value)
+        name = node.name
+        if not isinstance(name, str):
+            self.types[node] = 'any'
+            return
+        # the datatypes of the arguments, anything without a C++ type is any
+        datatypes = tuple(self.operand_type(arg, arg.value) for arg in args)
+        datatypes = tuple(datatype if datatype is None else join((datatype,)) for datatype in datatypes)
+        # a specialization calling itself does not keep itself alive, only the calls from
+        # outside its body do
+        if self.function != (name, datatypes):
+            self.arguments.setdefault(name, []).append(datatypes)
+        specializations = self.specializations.get(name, {})
+        if datatypes in specializations:
+            self.types[node] = specializations[datatypes]
+            self.routes[node] = datatypes
+        elif name in self.signatures:
+            signature = self.signatures[name]
+            self.types[node] = signature[1] if signature else None
+            if signature:
+                # a list passed to a PyValue parameter holds PyValues
+                for arg, datatype in zip(args, signature[0]):
+                    if datatype == 'any':
+                        self.add_elements(arg, arg.value, ['any'])
+        else:
+            symbol = self.symbol_table.lookup(name)
+            self.types[node] = symbol.datatype if symbol else 'any'
+
+    def analyze_access_id(self, node):
+        symbol = self.resolve(node, node.name)
+        self.walk(node, node.index)
+        self.walk(node, node.stop)
+        datatype = 'any'
+        if symbol:
+            # the elements of a typed list have its datatype, the ones of any other
+            # list or dict are PyValues and a character of a str is a str
+            if symbol.datatype in CPP_TYPES and symbol.datatype.startswith('list['):
+                datatype = symbol.datatype[5:-1]
+            elif symbol.datatype == 'str':
+                datatype = 'str'
+        self.types[node] = datatype
+
+    def analyze_arithmetic_operation(self, node):
+        self.walk(node, node.left)
+        self.walk(node, node.right)
+        left, right = self.operand_type(node, node.left), self.operand_type(node, node.right)
+        # a PyValue operand makes the result a PyValue
+        if left == 'any' or right == 'any':
+            datatype = 'any'
+        # unknown while an operand depends on a function without a signature
+        elif left is None or right is None:
+            datatype = None
+        # true division always returns float
+        elif node.op == '/':
+            datatype = 'float'
+        # strings and lists are concatenated
+        elif node.op == '+' and left == right and (left == 'str' or is_list(left)):
+            datatype = left
+        # if one operand is float, result is float, int otherwise
+        elif left == 'float' or right == 'float':
+            datatype = 'float'
+        # an int to a negative power is a float, so it is only int when the exponent is a
+        # literal that is not negative, and a PyValue otherwise
+        elif node.op == '**' and not (type(node.right) is int and node.right >= 0):
+            datatype = 'any'
+        else:
+            datatype = 'int'
+        self.types[node] = datatype
+
+    def analyze_binary_operation(self, node):
+        self.walk(node, node.left)
+        self.walk(node, node.right)
+        self.types[node] = 'bool'
+
+    analyze_relational_operation = analyze_logical_operation = analyze_binary_operation
+
+    def analyze_unary_operation(self, node):
+        self.walk(node, node.operand)
+        self.types[node] = 'bool'
+
+    def analyze_assignment_operation(self, node):
+        self.walk(node, node.target)
+        self.walk(node, node.value)
+
+    def analyze_simple_assignment_operation(self, node):
+        target, value = node.target, node.value
+        self.walk(node, value)
+        if isinstance(target, Node):
+            self.visit(target)
+            # a value stored at an index of a list is one of its elements
+            if type(target) is AccessId:
+                self.add_elements(target, target.name, [self.operand_type(node, value)])
+        else:
+            if self.symbol_table.lookup(target) is None:
+                datatype = self.operand_type(node, value)
+                self.symbol_table.insert(target, datatype, value=value)
+                self.declared[node] = datatype
+            self.resolve(node, target)
+
+    def analyze_array_assignment(self, node):
+        table = self.symbol_table
+        types = self.list_types(node, node.value)
+        symbol = table.lookup(node.target)
+        if symbol is None:
+            element = None
+            if self.elements is not None:
+                element = known(types + [self.elements.get(node)])
+            datatype = list_of(element)
+            symbol = table.insert(node.target, datatype, value={"types": types})
+            self.declared[node] = datatype
+            self.declarations[symbol] = node
+            self.appended[node] = []
+        elif symbol in self.declarations:
+            # a new literal for a declared list, its elements join the ones of the list
+            self.appended[self.declarations[symbol]] += types
+        elif not is_list(symbol.datatype):
+            table.update_type(node.target, "list")
+        self.resolve(node, node.target)
+
+    def analyze_append(self, node):
+        self.walk(node, node.value)
+        self.add_elements(node, node.target, [self.operand_type(node, node.value)])
+
+    def add_elements(self, node, name, datatypes):
+        # datatypes added to the elements of the list declared by the symbol of name
+        if isinstance(name, str) and not is_string(name):
+            symbol = self.resolve(node, name)
+            if symbol in self.declarations:
+                self.appended[self.declarations[symbol]] += datatypes
+
+    def analyze_dict_assignment(self, node):
+        self.declare_collection(node, "dict", self.dict_types(node, node.value))
+
+    def declare_collection(self, node, datatype, internal_types):
+        table = self.symbol_table
+        if table.lookup(node.target):
+            table.update_type(node.target, datatype)
+        else:
+            table.insert(node.target, datatype, value={"types": internal_types})
+            self.declared[node] = datatype
+
+    def list_types(self, node, array):
+        # types of the elements of a list literal, resolving the names in it
+        types = []
+        for i in array:
+            if isinstance(i, list):
+                self.list_types(node, i)
+                types.append("list")
+            elif isinstance(i, dict):
+                self.dict_types(node, i)
+                types.append("dict")
+            elif isinstance(i, str):
+                if is_string(i):
+                    types.append("str")
+                else:
+                    symbol = self.resolve(node, i)
+                    if symbol:
+                        types.append(symbol.datatype)
+            else:
+                types.append(str(type(i).__name__))
+        return types
+
+    def dict_types(self, node, map_dict):
+        # types of the entries of a dict literal, keyed by their C++ key
+        types = {}
+        current_type = ""
+        array_subtype = ""
+        for i in map_dict:
+            value = map_dict[i]
+            if isinstance(value, list):
+                array_subtype = self.list_types(node, value)
+                current_type = "list"
+            elif isinstance(value, dict):
+                array_subtype = self.dict_types(node, value)
+                current_type = "dict"
+            elif isinstance(value, str):
+                if is_string(value):
+                    current_type = "str"
+                else:
+                    symbol = self.resolve(node, value)
+                    if symbol:
+                        current_type = symbol.datatype
+            else:
+                current_type = self.symbol_table.infer_type_from_value(value)
+            symbol = None
+            if isinstance(i, str) and not is_string(i):
+                symbol = self.resolve(node, i)
+            key = dict_key(i, symbol)
+            types[key] = {}
+            types[key]["type"] = current_type
+            if current_type == "dict" or current_type == "list":
+                types[key]["types"] = array_subtype
+        return types
+
+    def analyze_argument(self, node):
+        # parameters of the function being walked, calls are walked by analyze_function_call
+        self.walk(node, node.default)
+
+    def analyze_function(self, node):
+        name = node.name
+        # every specialization is walked into tables of its own
+        for params, returns in self.specializations.get(name, {}).items():
+            tables = self.names, self.declared, self.types, self.routes
+            self.names, self.declared, self.types, self.routes = {}, {}, {}, {}
+            self.analyze_variant(node, params, (params, returns))
+            self.variants[name, params] = self.names, self.declared, self.types, self.routes
+            self.names, self.declared, self.types, self.routes = tables
+        if name in self.generic or name not in self.signatures:
+            self.analyze_variant(node, None, self.signatures.get(name))
+
+    def analyze_variant(self, node, params, signature):
+        table = self.symbol_table
+        table.enter_scope(node.name)
+        for i, param in enumerate(node.args.items):
+            self.analyze_argument(param)
+            datatype = signature[0][i] if signature else None
+            symbol = table.insert(param.value, datatype or 'any', value=None)
+            self.declared[param] = datatype or 'any'
+            if datatype is None:
+                self.unknown.add(symbol)
+                if param.default is not None and not signature:
+                    table.update_type(param.value, self.value_type(param.default))
+        outer, self.function = self.function, (node.name, params)
+        self.returns.setdefault(self.function, [])
+        self.visit(node.body)
+        self.function = outer
+        table.exit_scope()
+
+    def analyze_return(self, node):
+        self.walk(node, node.value)
+        if self.function is not None:
+            datatype = 'None' if node.value is None else self.operand_type(node, node.value)
+            self.returns[self.function].append(datatype)
+
+    def analyze_conditional(self, node):
+        table = self.symbol_table
+        self.walk(node, node.test)
+        table.enter_scope("if")
+        self.visit(node.body)
+        table.exit_scope()
+        for i in node.elifs:
+            self.walk(i, i.test)
+            table.enter_scope("elif")
+            self.visit(i.body)
+            table.exit_scope()
+        if node.orelse is not None:
+            table.enter_scope("else")
+            self.visit(node.orelse)
+            table.exit_scope()
+
+    def analyze_in_range_clause(self, node):
+        # the loop variable belongs to the scope around the loop
+        self.symbol_table.insert(node.target, "int", value=None)
+        for bound in (node.start, node.stop, node.step):
+            self.walk(node, bound)
+
+    def analyze_loop(self, node):
+        self.visit(node.header)
+        self.symbol_table.enter_scope("loop")
+        self.visit(node.body)
+        self.symbol_table.exit_scope()
@@ -8,11 +8,23 @@ class Symbol:
         self.value = value
         self.category = category
 
+class Scope:
+    # one block of the program: its own symbols and a link to the block around it
+    __slots__ = ('name', 'parent', 'symbols', 'resolved')
+
+    def __init__(self, name, parent=None):
+        self.name = name
+        self.parent = parent
+        self.symbols = {}
+        # names looked up from this scope and the symbol they resolved to (None if
+        # undefined); symbols are only inserted in the innermost open scope, so the
+        # scopes around this one cannot change while it is open and entries never go stale
+        self.resolved = {}
+
 class SymbolTable:
     def __init__(self):
         # initialize the symbol table
-        self.symbols = {}
-        self.scopes = ['global']
+        self.scope = Scope('global')
         self.current_scope = 'global'
         self.scope_counter = 0
 
@@ -21,44 +33,61 @@ class SymbolTable:
             return type(name).__name__
         elif name[0] == "\"" and name[-1] == "\"":
             return "std::string"
-        for scope in reversed(self.scopes):
-            key = f"{scope}::{name}"
-            if key in self.symbols:
-                return self.symbols[key].datatype
-        return None
+        symbol = self.lookup(name)
+        return symbol.datatype if symbol else None
     
     def enter_scope(self, scope_name=None):
         # enters and creates a new scope
         if scope_name is None:
             self.scope_counter += 1
             scope_name = f"scope_{self.scope_counter}"
-        self.scopes.append(scope_name)
+        self.scope = Scope(scope_name, self.scope)
         self.current_scope = scope_name
         return scope_name
     
     def exit_scope(self):
         # exits current scope and returns to previous
-        if len(self.scopes) > 1:
-            self.scopes.pop()
-            self.current_scope = self.scopes[-1]
+        # the closed scope is dropped with its symbols, a later block with the same name starts empty
+        if self.scope.parent is not None:
+            self.scope = self.scope.parent
+            self.current_scope = self.scope.name
     
     def insert(self, name, datatype, line=None, value=None, category='variable'):
         # inserts a new symbol into the table
-        key = f"{self.current_scope}::{name}"
-        self.symbols[key] = Symbol(name, datatype, self.current_scope, line, value, category)
-        return self.symbols[key]
+        symbol = Symbol(name, datatype, self.current_scope, line, value, category)
+        self.scope.symbols[name] = symbol
+        return symbol
     
     def lookup(self, name):
         # searches for a symbol in all scopes from current to global
-        for scope in reversed(self.scopes):
-            key = f"{scope}::{name}"
-            if key in self.symbols:
-                return self.symbols[key]
-        return None
+        # walks out only until a scope that already resolved the name and caches the
+        # result in every scope it passed, so repeated lookups are O(1)
+        scope = self.scope
+        symbols = scope.symbols
+        if name in symbols:
+            return symbols[name]
+        resolved = scope.resolved
+        if name in resolved:
+            return resolved[name]
+        passed = [resolved]
+        symbol = None
+        scope = scope.parent
+        while scope is not None:
+            if name in scope.symbols:
+                symbol = scope.symbols[name]
+                break
+            if name in scope.resolved:
+                symbol = scope.resolved[name]
+                break
+            passed.append(scope.resolved)
+            scope = scope.parent
+        for resolved in passed:
+            resolved[name] = symbol
+        return symbol
     
     def lookup_current_scope(self, name):
         # searches for a symbol only in the current scope
-        return self.symbols.get(f"{self.current_scope}::{name}")
+        return self.scope.symbols.get(name)
     
     def update_type(self, name, new_type):
         # updates the datatype of an existing symbol
@@ -89,53 +118,6 @@ class SymbolTable:
             return search.datatype
         return 'any'
     
-    def infer_type_from_operation(self, op):
-        # infers the datatype resulting from an operation
-        if not isinstance(op, tuple):
-            return self.infer_type_from_value(op)
-        op_type = op[0]
-        if op_type == 'arithmetic_operation':
-            left = self.infer_type_from_operation(op[1])
-            operator = op[2]
-            right = self.infer_type_from_operation(op[3])
-            # this operator always returns int
-            if operator == '//':
-                    return 'int'
-            # if only one operand is float, result is float
-            if left == 'float' or right == 'float':
-                return 'float'
-            # if both operands are int, result is int
-            if left == 'int' and right == 'int':
-                return 'int'
-            # default to int for mixed or unknown numeric types
-            return 'int'
-        # all these operations result in boolean type
-        if op_type in ('relational_operation', 'logical_operation', 'unary_operation'):
-            return 'bool'
-        # function calls return the function's return type
-        if op_type == 'function_call':
-            func = op[1]
-            symbol = self.lookup(func)
-            return symbol.datatype if symbol else 'any'
-        # data structures
-        if op_type == 'array assignment':
-            return 'list'
-        if op_type == 'dictionary assignment':
-            return 'dict'
-        if op_type == 'access_id':
-            var_name = op[1]
-            symbol = self.lookup(var_name)
-            if symbol:
-                if symbol.datatype in ('list', 'str'):
-                    return 'element'
-                if symbol.datatype == 'dict':
-                    return 'value'
-            return 'any'
-        if isinstance(op, str):
-            symbol = self.lookup(op)
-            return symbol.datatype if symbol else 'any'
-        return 'any'
-
     def check_type_compatibility(self, type1, type2, operator=None):
         # checks if two types are compatible for an operation
         if type1 in ('int', 'float', 'number') and type2 in ('int', 'float', 'number'):
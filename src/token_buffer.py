@@ -0,0 +1,91 @@
+import sys
+from array import array
+from src.lexer import Lexer
+
+# Token type names and their small integer codes
+TOKEN_TYPES = Lexer.tokens
+TOKEN_CODES = {name: code for code, name in enumerate(TOKEN_TYPES)}
+
+class TokenView:
+    # Lightweight token read from a TokenBuffer, has the attributes PLY reads from a LexToken
+    __slots__ = ('type', 'value', 'lineno', 'lexpos')
+    lexer = None  # PLY only attaches a lexer to tokens that lack one
+
+    def __init__(self, type, value, lineno, lexpos):
+        self.type = type
+        self.value = value
+        self.lineno = lineno
+        self.lexpos = lexpos
+
+    def __repr__(self):
+        return f"LexToken({self.type},{self.value!r},{self.lineno},{self.lexpos})"
+
+
+class TokenReader:
+    # Feeds a TokenBuffer to the parser through the same token() method as Lexer. PLY keeps
+    # the tokens it shifts on its stack, so each one is a TokenView of its own read by index
+    def __init__(self, buffer):
+        self.tokens = map(TokenView, map(TOKEN_TYPES.__getitem__, buffer.types),
+                          map(buffer.values.__getitem__, buffer.value_ids), buffer.linenos, buffer.lexposs)
+
+    def token(self):
+        return next(self.tokens, None)
+
+
+class TokenBuffer:
+    # Struct-of-arrays token stream: one compact array per attribute and every
+    # distinct value stored once in an interned side table
+    def __init__(self, source_map=None):
+        self.source_map = source_map
+        self.types = array('H')
+        self.linenos = array('I')
+        self.lexposs = array('I')
+        self.value_ids = array('I')
+        self.values = []
+        self._value_index = {}
+
+    @classmethod
+    def from_lexer(cls, lexer):
+        # drains the lexer's current input
+        buffer = cls(lexer.source_map)
+        for tok in lexer:
+            buffer.append(tok)
+        return buffer
+
+    def append(self, tok):
+        self.types.append(TOKEN_CODES[tok.type])
+        self.linenos.append(tok.lineno)
+        self.lexposs.append(tok.lexpos)
+        self.value_ids.append(self._intern(tok.value))
+
+    def _intern(self, value):
+        # keyed by type too, True, 1 and 1.0 are equal dict keys but different values
+        key = (type(value), value)
+        value_id = self._value_index.get(key)
+        if value_id is None:
+            value_id = len(self.values)
+            self.values.append(sys.intern(value) if isinstance(value, str) else value)
+            self._value_index[key] = value_id
+        return value_id
+
+    def reader(self):
+        return TokenReader(self)
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index):
+        return TokenView(TOKEN_TYPES[self.types[index]], self.values[self.value_ids[index]],
+                         self.linenos[index], self.lexposs[index])
+
+    def __iter__(self):
+        # passes walk the four arrays in step through a single TokenView that is
+        # overwritten at every token, a pass that keeps tokens takes them with buffer[i]
+        values = self.values
+        view = TokenView(None, None, 0, 0)
+        for code, value_id, lineno, lexpos in zip(self.types, self.value_ids, self.linenos, self.lexposs):
+            view.type = TOKEN_TYPES[code]
+            view.value = values[value_id]
+            view.lineno = lineno
+            view.lexpos = lexpos
+            yield view
@@ -0,0 +1,69 @@
+import sys
+import time
+from collections import Counter, defaultdict
+
+# Trace levels, each level includes the ones before it
+OFF = 0
+COUNT = 1   # how many times each production is reduced
+REDUCE = 2  # one line per reduction with the rule and its result
+TIME = 3    # time spent inside each production
+
+class Tracer:
+    def __init__(self, level=COUNT, sink=None):
+        # sink can be any object with write() or a file path
+        self.level = level
+        self._owns_sink = isinstance(sink, str)
+        self.sink = open(sink, 'w', encoding='utf-8') if self._owns_sink else (sink or sys.stderr)
+        self.counts = Counter()
+        self.timings = defaultdict(float)
+
+    def instrument(self, lr_parser):
+        # wraps the callables PLY already bound to each production
+        # nothing is wrapped at OFF, so an untraced parser runs the plain methods
+        if self.level == OFF:
+            return
+        wrapped = {}
+        for prod in lr_parser.productions:
+            if prod.func:
+                if prod.func not in wrapped:
+                    wrapped[prod.func] = self._wrap(prod.func, prod.callable)
+                prod.callable = wrapped[prod.func]
+
+    def _wrap(self, name, func):
+        counts = self.counts
+        if self.level == COUNT:
+            def traced(p):
+                counts[name] += 1
+                func(p)
+            return traced
+
+        timings = self.timings
+        level = self.level
+        write = self.sink.write
+
+        def traced(p):
+            counts[name] += 1
+            start = time.perf_counter()
+            func(p)
+            if level >= TIME:
+                timings[name] += time.perf_counter() - start
+            rhs = " ".join(s.type for s in p.slice[1:])
+            write(f">> {p.slice[0].type} : {rhs} => {p[0]!r}\n")
+        return traced
+
+    def report(self):
+        # writes the collected counters (and timings) to the sink
+        write = self.sink.write
+        if self.level >= TIME:
+            write(f"{'production':<32}{'count':>10}{'total ms':>12}\n")
+            for name, count in self.counts.most_common():
+                write(f"{name:<32}{count:>10}{self.timings[name] * 1000:>12.3f}\n")
+        elif self.level >= COUNT:
+            write(f"{'production':<32}{'count':>10}\n")
+            for name, count in self.counts.most_common():
+                write(f"{name:<32}{count:>10}\n")
+        self.sink.flush()
+
+    def close(self):
+        if self._owns_sink:
+            self.sink.close()
@@ -1,7 +1,78 @@
+from array import array
+from bisect import bisect_right
 from typing import Literal
 
+class SourceMap:
+    # Line index of one input, built once and shared by the lexer, the parser and every Error
+    def __init__(self, data):
+        self.data = data
+        self._line_starts = None
+
+    @property
+    def line_starts(self):
+        # offset where each line starts, line n starts at line_starts[n-1]
+        # built lazily on first use, by the parser for node columns or by an error
+        if self._line_starts is None:
+            self._line_starts = array('q', [0])
+            self._index_lines(self.data, 0)
+        return self._line_starts
+
+    def _index_lines(self, text, offset):
+        # records the start of every line that begins inside text
+        line_starts = self.line_starts
+        pos = text.find('\n')
+        while pos != -1:
+            line_starts.append(offset + pos + 1)
+            pos = text.find('\n', pos + 1)
+
+    def line_col(self, lexpos):
+        # (line, column) of a lexpos, both counted like the lexer: line from 1, column from 0
+        line = bisect_right(self.line_starts, lexpos)
+        return line, lexpos - self.line_starts[line - 1]
+
+    def line_text(self, lineno):
+        # text of a single line without its newline
+        start = self.line_starts[lineno - 1]
+        end = self.line_starts[lineno] - 1 if lineno < len(self.line_starts) else len(self.data)
+        return self.data[start:end]
+
+    def context(self, lexpos):
+        # offending line (without indentation) with a caret under lexpos
+        line, column = self.line_col(lexpos)
+        error_line = self.line_text(line)
+        code = error_line.lstrip()
+        return code + '\n' + " " * (column - (len(error_line) - len(code))) + "^"
+
+
+class MappedSourceMap(SourceMap):
+    # SourceMap over a memory-mapped file, lines are indexed as the lexer decodes
+    # each chunk and error context is sliced and decoded from the mapping on demand
+    def __init__(self, buffer, encoding='utf-8'):
+        self.data = None
+        self.buffer = buffer
+        self.encoding = encoding
+        self._line_starts = array('q', [0])
+        # byte offset of every line start, line_starts holds the character offsets
+        self.byte_starts = array('q', [0])
+
+    def add_chunk(self, text, raw, offset, byte_offset):
+        # text is raw decoded, both start at a line start
+        self._index_lines(text, offset)
+        byte_starts = self.byte_starts
+        pos = raw.find(b'\n')
+        while pos != -1:
+            byte_starts.append(byte_offset + pos + 1)
+            pos = raw.find(b'\n', pos + 1)
+
+    def line_text(self, lineno):
+        start = self.byte_starts[lineno - 1]
+        end = self.byte_starts[lineno] - 1 if lineno < len(self.byte_starts) else len(self.buffer)
+        return self.buffer[start:end].decode(self.encoding)
+
+
 class Error:
     def __init__(self, message, line, column, _type: Literal['lexer', 'parser', 'semantic'], data=None):
+        # data is the SourceMap of the input (a plain string is also accepted)
         self.message = message
         self.line = line
         self.column = column
@@ -21,7 +92,6 @@ class Error:
 
 
 def get_context(data, lineno, lexpos):
-    error_line = data.split('\n')[lineno-1]
-    where = error_line.lstrip() + '\n' + " " * ((lexpos - len('\n'.join(data.split('\n')[:lineno-1])))
-                                                - ((len(error_line) - len(error_line.lstrip()))+1)) + "^"
-    return where
\ No newline at end of file
+    # the line is found from lexpos, lineno is kept for older callers
+    source_map = data if isinstance(data, SourceMap) else SourceMap(data)
+    return source_map.context(lexpos)
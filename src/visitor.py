@@ -1,56 +1,123 @@
-from src.symbol_table import SymbolTable
+from src.ast_nodes import (
+    NODE_TYPES, AccessId, ArithmeticOperation, Assignment, BinaryOperation, Function, FunctionCall, LogicalOperation,
+    Node, RelationalOperation, UnaryOperation,
+)
+from src.emitter import Emitter
+from src.semantic import CPP_TYPES, SemanticAnalyzer, cpp_type, dict_key, is_list, specialized_name
 
 class Visitor:
-    def __init__(self, symbol_table=None, parse_tree=None):
-        self.symbol_table = symbol_table
+    # operations written through their visitor and stripped inside expressions
+    EXPRESSION_KINDS = {
+        ArithmeticOperation.kind,
+        LogicalOperation.kind,
+        RelationalOperation.kind,
+        UnaryOperation.kind,
+    }
+    # binding of the binary operators in Python, ** is the only one associating to the right
+    PRECEDENCE = {"or": 1, "and": 2, "==": 3, "+": 4, "-": 4, "*": 5, "/": 5}
+    # operators written as calls to the functions of utilities.hpp
+    ARITHMETIC_CALLS = {"//": "floordiv", "%": "mod", "**": "power"}
+    # datatypes a Memo can keep as arguments and results
+    MEMO_TYPES = {"int", "float", "bool", "str"}
+    # starting value of the accumulator of a function written as a loop
+    IDENTITY = {"+": 0, "*": 1}
+
+    def __init__(self, semantics=None, parse_tree=None, buffered_print=True, memoize=True, tail_calls=True):
+        # semantics is the SemanticAnalyzer that already went over parse_tree, the Visitor
+        # only reads the names, declarations and types it resolved
+        # buffered_print writes print to the buffered output of utilities.hpp, else to std::cout
+        # memoize keeps the results of the pure recursive functions, see write_memoized
+        # tail_calls writes the calls of a function to itself at its end as a loop, see write_loop
         self.parse_tree = parse_tree
+        self.buffered_print = buffered_print
+        self.memoize = memoize
+        self.memoized = []  # C++ names of the functions written with a Memo
+        self.tail_calls = tail_calls
+        self.loops = []  # C++ names of the functions written as a loop
+        self.loop = None  # (operator, sites, accumulator, parameters) of the function written as a loop
+        self.semantics = semantics if semantics is not None else SemanticAnalyzer().analyze(parse_tree)
+        self.names = self.semantics.names
+        self.declared = self.semantics.declared
+        self.types = self.semantics.types
+        self.routes = self.semantics.routes
+        self.signatures = self.semantics.signatures
         self.current_level = 0
         self.function_table = {}
         self.VALID_OPERATION_NODES = {
-            "arithmetic_operation",
-            "logical_operation",
-            "relational_operation",
-            "unary_operation",
-            "function_call",
-            "simple_assignment_operation",
-            "access_id"
+            ArithmeticOperation.kind,
+            LogicalOperation.kind,
+            RelationalOperation.kind,
+            UnaryOperation.kind,
+            FunctionCall.kind,
+            Assignment.kind,
+            AccessId.kind,
         }
+        # visitor method of every node kind, looked up once instead of on every visit
+        self.dispatch = [getattr(self, f"visitor_{node_type.tag}", None) for node_type in NODE_TYPES]
         self.keywords = ["break", "continue"]
         self.functions_started = False
+        self.returns = None  # C++ return type of the function being written
         self.isleft = False
         self.DoesFunctionCallNeedsSemiColon = True
+        self.out = Emitter()  # where statements are written, see emit()
         pass
 
     def start(self):
-        includes = '''#include<any>\n#include<cmath>\n#include<iostream>\n#include<vector>\n#include<map>\n#include "utilities.hpp"\n\n'''
-        code = ""
-        global_vars= ""
-        main = ""
+        return "".join(self.generate())
+
+    def generate(self):
+        # visits the whole tree and yields the program in pieces, ready for file.writelines()
+        includes = '''#include<cmath>\n#include<iostream>\n#include<vector>\n#include<map>\n#include "utilities.hpp"\n\n'''
+        code = Emitter()
+        global_vars = Emitter()
+        main = Emitter()
+        main.write("\n\nint main() {\n")
+        main.indent()
         for i in self.parse_tree:
-            if i[0] == "function" :
-                code += self.visit(i)
+            if type(i) is Function:
+                self.out = code
                 self.functions_started = True
-            elif (not self.functions_started) and i[0] == "simple_assignment_operation":
-                global_vars += self.visit(i)
+            elif (not self.functions_started) and type(i) is Assignment:
+                self.out = global_vars
             else:
-                main += self.visit(i)
-        
-        main += "return 0;\n"
-        main = self.indent(main, 1)  
-        fmain = "\n\nint main() {\n"
-        fmain += f"{main}" + "}"
-        return includes + global_vars + code + fmain
+                self.out = main
+            self.emit(i)
+
+        main.write("return 0;\n")
+        main.dedent()
+        main.write("}")
+        yield includes
+        for section in (global_vars, code, main):
+            section.close()
+            yield from section.parts
+
+    def emit(self, node):
+        # writes a statement, or a list of them, to the current Emitter
+        # blocks write themselves and return an empty string
+        if isinstance(node, list):
+            for n in node:
+                self.emit(n)
+        else:
+            self.out.write(self.visit(node))
+
+    def write_block(self, header, body):
+        # header {, the body one level deeper, then }
+        out = self.out
+        out.write(f"{header} {{\n")
+        out.indent()
+        self.emit(body)
+        out.dedent()
+        out.write("\n}\n")
 
     def visit(self, node):
         if node is None:
             return ""
         
-        if isinstance(node, tuple):
-            tag = node[0].replace(" ", "_")
-            func = getattr(self, f"visitor_{tag}", None)
+        if isinstance(node, Node):
+            func = self.dispatch[node.kind]
             if func is None:
-                print(f"No visitor for node type: {node[0]}")
-                raise TypeError(f"No visitor for {node[0]}")
+                print(f"No visitor for node type: {node.tag}")
+                raise TypeError(f"No visitor for {node.tag}")
             return func(node)
 
         elif isinstance(node, list):
@@ -62,42 +129,74 @@ class Visitor:
             if func:
                 return func(node)
 
-        # Literales simples
-        return str(node)
+        return self.literal(node)
+
+    def literal(self, value):
+        # Literales simples, True y False son los bool de C++ y None el PyValue vacío
+        if value is True or value is False:
+            return "true" if value else "false"
+        return str(value)
+
+    def value_type(self, node, value):
+        # inferred datatype of an expression, or of the symbol a name resolves to
+        if isinstance(value, Node):
+            return self.types.get(value)
+        return self.symbol_type(node, value)
 
     def check_if_str(self, data):
         return data[0] == "\"" and data[-1] == "\""
 
-    def check_if_var_exists(self, var):
-        return self.symbol_table.lookup(var) is not None
+    def lookup(self, node, name):
+        # symbol that name resolved to where node is written, None if it does not exist
+        names = self.names.get(node)
+        return names.get(name) if names else None
+
+    def symbol_type(self, node, name):
+        if not isinstance(name, str):
+            return type(name).__name__
+        elif self.check_if_str(name):
+            return "std::string"
+        sym = self.lookup(node, name)
+        return sym.datatype if sym else None
 
-    def get_symbol_value(self, symbol):
-        sym = self.symbol_table.lookup(symbol)
+    def check_if_var_exists(self, node, var):
+        return self.lookup(node, var) is not None
+
+    def get_symbol_value(self, node, symbol):
+        sym = self.lookup(node, symbol)
         if sym is None:
             raise ValueError(f"Symbol {symbol} does not exist")
         return sym.value
 
-    def get_symbol_type(self, symbol):
-        sym = self.symbol_table.lookup(symbol)
+    def get_symbol_type(self, node, symbol):
+        sym = self.lookup(node, symbol)
         if sym is None:
             raise ValueError(f"Symbol {symbol} does not exist")
         return symbol
 
+    def is_operation(self, node):
+        return isinstance(node, Node) and node.kind in self.VALID_OPERATION_NODES
+
     def visitor_function_call(self, call):
-        _, name, args_node = call
-        args = args_node[1]
+        if self.loop is not None and call in self.loop[1]:
+            return self.tail_step(call)
+        name = call.name
+        args = call.args.items
         if name in self.function_table:
             expected = self.function_table[name]
             given = len(args)
             if given == expected:
                 arg_parts = []
                 for i in args:
-                    first = i[1]
-                    if isinstance(first, tuple) and first[0] in self.VALID_OPERATION_NODES:
+                    first = i.value
+                    if self.is_operation(first):
                         arg_parts.append(self.visitor_operations(first))
                     else:
                         arg_parts.append(self.visit(first))
                 cpp_args = ", ".join(arg_parts)
+                # calls with the datatypes of a specialization go to it
+                if call in self.routes:
+                    name = specialized_name(name, self.routes[call])
                 if self.DoesFunctionCallNeedsSemiColon:
                     self.DoesFunctionCallNeedsSemiColon = True
                     return f"{name}({cpp_args});\n"
@@ -105,13 +204,14 @@ class Visitor:
                     self.DoesFunctionCallNeedsSemiColon = True
                     return f"{name}({cpp_args})"
             else:
-                print(f"Error Not enough parameters to call {call[1]}")
+                print(f"Error Not enough parameters to call {name}")
         else:
-            print(f"Error: {call[1]} does not exist")
+            print(f"Error: {name} does not exist")
 
-    def array_internal(self, array):
+    def array_internal(self, node, array, datatype="list"):
+        # element types are stored in the symbol table by the semantic pass
+        # ints are cast for a list of floats, braces do not widen a variable
         first = True
-        types = []
         arrayResult = "{"
         for i in array:
             if not first:
@@ -119,34 +219,28 @@ class Visitor:
             else:
                 first = False
             if isinstance(i, list):
-                arrayResult += f"std::vector<std::any>({self.array_internal(i)[0]})" 
-                types.append("list")
+                arrayResult += f"std::vector<PyValue>({self.array_internal(node, i)})" 
             elif isinstance(i, dict):
-                arrayResult += f"std::map<std::string, std::any>({self.map_internal(i)[0]})"
-                types.append("dict")
+                arrayResult += f"std::map<std::string, PyValue>({self.map_internal(node, i)})"
             elif isinstance(i, str):
                 if self.check_if_str(i):
                     arrayResult += f'{i}'
-                    types.append("str")
                 else:
-                    symbol = self.symbol_table.lookup(i)
-                    if symbol:
-                        arrayResult += f"{i}"
-                        types.append(symbol.datatype)
+                    if self.check_if_var_exists(node, i):
+                        if datatype == "list[float]" and self.symbol_type(node, i) != "float":
+                            arrayResult += f"static_cast<double>({i})"
+                        else:
+                            arrayResult += f"{i}"
                     else:
                         raise Exception(f"Variable {i} does not exist: {array}")
             else:
-                arrayResult += f"{i}"
-                types.append(str(type(i).__name__))
+                arrayResult += self.literal(i)
         arrayResult += "}"
-        return arrayResult, types
+        return arrayResult
 
-    def map_internal(self, map_dict):
+    def map_internal(self, node, map_dict):
         first = True
-        types = {}
         mapResult = "{"
-        current_type = ""
-        array_subtype = ""
         for i in map_dict:
             if not first:
                 mapResult += ", "
@@ -155,419 +249,462 @@ class Visitor:
             
             value = map_dict[i]
             if isinstance(value, list):
-                result_tuple = self.array_internal(value)
-                valueResult = f"std::vector<std::any>({result_tuple[0]})"
-                array_subtype = result_tuple[1]
-                current_type = "list"
+                valueResult = f"std::vector<PyValue>({self.array_internal(node, value)})"
             elif isinstance(value, dict):
-                result_tuple = self.map_internal(value)
-                valueResult = f"std::map<std::string, std::any>({result_tuple[0]})"
-                array_subtype = result_tuple[1]
-                current_type = "dict"
+                valueResult = f"std::map<std::string, PyValue>({self.map_internal(node, value)})"
             elif isinstance(value, str):
                 if self.check_if_str(value):
                     valueResult = f'{value}'
-                    current_type = "str"
                 else:
-                    symbol = self.symbol_table.lookup(value)
-                    if symbol:
+                    if self.check_if_var_exists(node, value):
                         valueResult = value
-                        current_type = symbol.datatype
                     else:
                         raise ValueError(f"Variable {value} does not exist: {map_dict}")
             else:
-                valueResult = str(value)
-                current_type = self.symbol_table.infer_type_from_value(value)
+                valueResult = self.literal(value)
             
-            resultI = ""
-            if not isinstance(i, str):
-                resultI = str(i)
-            elif not self.check_if_str(i):
-                symbol = self.symbol_table.lookup(i)
-                if symbol:
-                    resultI = str(symbol.value) if symbol.value is not None else str(i)
-                else:
+            symbol = None
+            if isinstance(i, str) and not self.check_if_str(i):
+                symbol = self.lookup(node, i)
+                if symbol is None:
                     raise ValueError(f"Variable does not exist: {i}: {map_dict}")
-            else:
-                resultI = i
-            
-            if not (resultI[0] == "\"" and resultI[-1] == "\""):
-                resultI = f"\"{resultI}\""
+            resultI = dict_key(i, symbol)
             
             mapResult += "{" + f'{resultI}, {valueResult}' + "}"
-            types[resultI] = {}
-            types[resultI]["type"] = current_type
-            if current_type == "dict" or current_type == "list":
-                types[resultI]["types"] = array_subtype
         mapResult += "}"
-        return mapResult, types
+        return mapResult
 
     def visitor_access_id(self, node):
-        _, name, val = node
-        if isinstance(val, tuple):
+        name, val = node.name, node.index
+        if isinstance(val, Node):
             val = self.visit(val)
-        if not self.isleft:
-            if self.symbol_table.getSymbolType(name) == "any":
-                self.isleft = False
-                return f"std::any_cast<int>(std::any_cast<std::vector<std::any>>({name})[{val}])"
-        else: 
-            if self.symbol_table.getSymbolType(name) == "any":
-                self.isleft = False
-                return f"std::any_cast<std::vector<std::any>&>({name})[{val}]"
+        datatype = self.symbol_type(node, name)
+        # lists and dicts are indexed directly, a PyValue holding a list or a dict indexes it by its tag
+        if datatype == "any" or datatype == "dict" or is_list(datatype):
+            self.isleft = False
+            return f"{name}[{val}]"
+        # a character of a str is a str of its own
+        if datatype == "str":
+            self.isleft = False
+            return f"str_item({name}, {val})"
+        raise TypeError(f"Var {name} of type {datatype} cannot be indexed")
 
     def visitor_array_assignment(self, call):
         result = ""
-        symbol = self.symbol_table.lookup(call[1])
-        if not symbol:
-            result = "std::vector<std::any> "
+        if call in self.declared:
+            result = f"{cpp_type(self.declared[call])} "
         
-        internal_array, internal_types = self.array_internal(call[3])
-        result += f"{call[1]} = {internal_array};\n"
-        # Insert or update in symbol table
-        if symbol:
-            self.symbol_table.update_type(call[1], "list")
-        else:
-            self.symbol_table.insert(call[1], "list", value={"types": internal_types})
+        internal_array = self.array_internal(call, call.value, self.symbol_type(call, call.target))
+        result += f"{call.target} = {internal_array};\n"
         return result
 
     def visitor_dict_assignment(self, call):
         result = ""
-        symbol = self.symbol_table.lookup(call[1])
-        if not symbol:
-            result += "std::map<std::string, std::any> "
-        
-        internal_map, internal_types = self.map_internal(call[3])
-        result += f"{call[1]} = {internal_map[0]};\n"
-        
-        # Insert or update in symbol table
-        if symbol:
-            self.symbol_table.update_type(call[1], "dict")
-        else:
-            self.symbol_table.insert(call[1], "dict", value={"types": internal_types})
+        if call in self.declared:
+            result += f"{cpp_type('dict')} "
         
+        internal_map = self.map_internal(call, call.value)
+        result += f"{call.target} = {internal_map};\n"
         return result
 
     def visitor_append(self, node):
-        __,var, val = node
-        result = ""
-        if self.check_if_var_exists(var):
-            val_result = ""
-            if self.get_symbol_type(var) == "list":
+        var, val = node.target, node.value
+        if self.check_if_var_exists(node, var):
+            datatype = self.symbol_type(node, var)
+            if is_list(datatype):
                 var_result = f"{var}.push_back("
             else:
                 raise TypeError(f"Var {var} is not a list, so it cannot be appended")
-            
-            if isinstance(val, str):
-                if not self.check_if_str(val):
-                    val = self.get_symbol_value(val)
-                else:
-                    val = f"\"{val}\""
 
-            var_result += f"{val});"
+            if isinstance(val, list):
+                val = f"std::vector<PyValue>({self.array_internal(node, val)})"
+            elif isinstance(val, dict):
+                val = f"std::map<std::string, PyValue>({self.map_internal(node, val)})"
+            elif self.is_operation(val):
+                val = self.visitor_operations(val)
+            else:
+                val = self.visit(val)
+
+            var_result += f"{val});\n"
             return var_result
         else:
             raise ValueError(f"Var {var} does not exist, cannot append")        
 
     def visitor_operations(self, node):
-        if not isinstance(node, tuple):
-            return str(node)
-        kind = node[0]
-        if kind == "arithmetic_operation":
-            return self.visitor_arithmetic_operation(node).strip()
-        if kind == "logical_operation":
-            return self.visitor_logical_operation(node).strip()
-        if kind == "relational_operation":
-            return self.visitor_relational_operation(node).strip()
-        if kind == "unary_operation":
-            return self.visitor_unary_operation(node).strip()
-        if kind == "function_call":
+        if not isinstance(node, Node):
+            return self.literal(node)
+        kind = node.kind
+        if kind in self.EXPRESSION_KINDS:
+            return self.dispatch[kind](node).strip()
+        if kind == FunctionCall.kind:
             self.DoesFunctionCallNeedsSemiColon = False
             return self.visitor_function_call(node)
-        if kind == "access_id":
+        if kind == AccessId.kind:
             return self.visitor_access_id(node)
-        raise ValueError(f"Unknown node type: {kind}")
+        raise ValueError(f"Unknown node type: {node.tag}")
 
     def visitor_arithmetic_operation(self, call):
-        _, left, op, right = call
-        if self.symbol_table.getSymbolType(left) == "any":
-            n_type = ""
-            if isinstance(right, tuple):
-                n_type = self.symbol_table.infer_type_from_operation(right)
-            else:
-                n_type = self.symbol_table.getSymbolType(right)
-            left = f"std::any_cast<{n_type}>({left})"
-            right = self.visitor_operations(right)
-        elif self.symbol_table.getSymbolType(right) == "any":
-            n_type = ""
-            if isinstance(right, tuple):
-                n_type = self.symbol_table.infer_type_from_operation(left)
-            else:
-                n_type = self.symbol_table.getSymbolType(left)
-            right = f"std::any_cast<{n_type}>({right})"
-            left = self.visitor_operations(left)
-        else:
-            right = self.visitor_operations(right)
-            left = self.visitor_operations(left)
-        if op == "//":
-            return f"std::floor({left} / {right})"
-        return f"{left} {op} {right}"
+        left, op, right = call.left, call.op, call.right
+        # //, % and ** round and type their results as in Python, see utilities.hpp
+        if op in self.ARITHMETIC_CALLS:
+            # ** of ints typed PyValue, its exponent may be negative, is computed on a PyValue
+            boxed = op == "**" and self.types.get(call) == "any" and self.value_type(call, left) != "any"
+            left, right = self.visitor_operations(left), self.visitor_operations(right)
+            if boxed:
+                left = f"PyValue({left})"
+            return f"{self.ARITHMETIC_CALLS[op]}({left}, {right})"
+        numbers = ("int", "bool")
+        if op == "/" and self.value_type(call, left) in numbers and self.value_type(call, right) in numbers:
+            left = f"static_cast<double>({self.visitor_operations(left)})"
+            return f"{left} / {self.operand(call, right, True)}"
+        return f"{self.operand(call, left, False)} {op} {self.operand(call, right, True)}"
+
+    def operand(self, parent, node, right):
+        # C++ of an operand of parent, in parentheses when it binds less tightly than
+        # parent in Python, or as tightly on the side parent does not associate to
+        code = self.visitor_operations(node)
+        if not isinstance(node, BinaryOperation) or node.op in self.ARITHMETIC_CALLS:
+            return code
+        inner, outer = self.precedence(node), self.precedence(parent)
+        if inner < outer or (inner == outer and (right or type(node) is RelationalOperation)):
+            return f"({code})"
+        return code
+
+    def precedence(self, node):
+        if type(node) is ArithmeticOperation:
+            return self.PRECEDENCE[node.op]
+        if type(node) is LogicalOperation:
+            return self.PRECEDENCE[node.op.lower()]
+        return self.PRECEDENCE["=="]
 
     def visitor_unary_operation(self, call):
-        _, op, value = call
+        op, value = call.op, call.operand
         if value is True:
             value = "true"
         elif value is False:
             value = "false"
-        value = self.visitor_operations(value)
+        code = self.visitor_operations(value)
+        # not binds less tightly than any other operator in Python, ! more than all in C++
+        if isinstance(value, BinaryOperation) and value.op not in self.ARITHMETIC_CALLS:
+            code = f"({code})"
         op = "!" if op == "NOT" else op
-        return f"{op}{value}"
+        return f"{op}{code}"
 
     def visitor_logical_operation(self, call):
-        _, left, op, right = call
+        left, op, right = call.left, call.op, call.right
         op = op.lower()
         if op == "and":
             op = "&&"
         elif op == "or":
             op = "||"
-        left = self.visitor_operations(left)
-        right = self.visitor_operations(right)
+        left = self.operand(call, left, False)
+        right = self.operand(call, right, True)
         return f"{left} {op} {right}"
 
     def visitor_relational_operation(self, call):
-        _, left, op, right = call
-        if self.symbol_table.getSymbolType(left) == "any" or self.symbol_table.getSymbolType(right) == "any":
-            if self.symbol_table.getSymbolType(left) == "any":
-                n_type = self.symbol_table.getSymbolType(right)
-                left = f"std::any_cast<{n_type}>({left})"
-                right = self.visitor_operations(right)
-            else:
-                n_type = self.symbol_table.getSymbolType(left)
-                right = f"std::any_cast<{n_type}>({right})"
-                left = self.visitor_operations(left)
-        else:
-            left = self.visitor_operations(left)
-            right = self.visitor_operations(right)
-        
+        left, op, right = call.left, call.op, call.right
+        left = self.operand(call, left, False)
+        right = self.operand(call, right, True)
         return f"{left} {op} {right}"
 
     def visitor_simple_assignment_operation(self, call):
-        _, var_name, symbol, value = call
+        var_name, symbol, value = call.target, call.op, call.value
         
-        if isinstance(value, tuple) and value[0] in self.VALID_OPERATION_NODES:
+        if self.is_operation(value):
             value_code = self.visitor_operations(value)
-            datatype = self.symbol_table.infer_type_from_operation(value)
         else:
-            value_code = str(value)
-            datatype = self.symbol_table.infer_type_from_value(value)
+            value_code = self.literal(value)
         
-        if not isinstance(var_name, tuple) and self.symbol_table.lookup(var_name) == None:
-            self.symbol_table.insert(var_name, datatype, value=value)
-            return f"{datatype} {var_name} {symbol} {value_code};\n"
+        if call in self.declared:
+            return f"{cpp_type(self.declared[call])} {var_name} {symbol} {value_code};\n"
         else:
-            if isinstance(var_name, tuple) and var_name[0] in self.VALID_OPERATION_NODES:
+            # a PyValue stored in a variable of a static type is converted to it
+            datatype = self.symbol_type(call, var_name)
+            if datatype in CPP_TYPES and datatype != "any" and self.value_type(call, value) == "any":
+                value_code = f"static_cast<{cpp_type(datatype)}>({value_code})"
+            if self.is_operation(var_name):
                 self.isleft = True
                 var_name = self.visitor_operations(var_name)
             return f"{var_name} {symbol} {value_code};\n"
 
     def visitor_print_call(self, call):
-        _, exprs = call
-        result = ""
-        if isinstance(exprs, tuple) and exprs[0] in self.VALID_OPERATION_NODES:
-            value_code = self.visitor_operations(exprs)
-            result += f'std::cout << {value_code} << std::endl;\n'
-            return result
+        exprs = call.value
+        if self.is_operation(exprs):
+            return self.print_line(self.visitor_operations(exprs))
         elif isinstance(exprs, str):
             if self.check_if_str(exprs):
                 exprs = exprs[1:-1]
                 expr_code = self.visitor_operations(exprs)
-                result += f'std::cout << "{expr_code}" << std::endl;\n'
-                return result
+                return self.print_line(f'"{expr_code}"')
             else:
-                if self.check_if_var_exists(exprs):
-                    result += f'std::cout << {exprs} << std::endl;\n'
-                    return result
+                if self.check_if_var_exists(call, exprs):
+                    return self.print_line(exprs)
                 else:
                     raise ValueError(f"Variable {exprs} does not exist")
         else: 
-            expr_code = self.visitor_operations(exprs)
-            result += f'std::cout << {expr_code} << std::endl;\n'
-            return result
+            return self.print_line(self.visitor_operations(exprs))
+
+    def print_line(self, value_code):
+        # print() of utilities.hpp picks the formatting of the C++ type of the value when compiled
+        if self.buffered_print:
+            return f'print({value_code});\n'
+        return f'std::cout << {value_code} << std::endl;\n'
 
     def visitor_argument(self, node):
-        _, name, expr = node
-        self.symbol_table.insert(name, "any", value=None)
+        name, expr = node.value, node.default
+        datatype = cpp_type(self.declared[node])
         if expr is not None:
             value_cpp = self.visit(expr)
-            inferred_type = self.symbol_table.infer_type_from_operation(expr)
-            self.symbol_table.update_type(name, inferred_type)
-            return f"std::any {name} = {value_cpp}"
-        return f"std::any {name}"
+            return f"{datatype} {name} = {value_cpp}"
+        return f"{datatype} {name}"
 
     def visitor_arguments(self, node):
-        _, args = node
+        args = node.items
         if not args:
             return ""
         return ", ".join(self.visit(a) for a in args)
 
     def visitor_return(self, node):
-        return "return;"
-
-    def visitor_return_expression(self, node):
-        _, expr = node
-        return f"return {self.visit(expr)};"
-
-    def visitor_complete_function_body(self, node):
-        _, sentences, ret = node
-        cpp_code = ""
+        loop = self.loop
+        if loop is not None:
+            if node in loop[1]:
+                return self.tail_step(node)
+            if loop[0] is not None:
+                # what is left to do with the value is on the accumulator
+                value = node.value
+                code = self.visitor_operations(value) if self.is_operation(value) else self.visit(value)
+                if isinstance(value, BinaryOperation) and value.op not in self.ARITHMETIC_CALLS:
+                    code = f"({code})"
+                return f"return {loop[2]} {loop[0]} {code};"
+        if node.value is None:
+            # a function returning a PyValue returns None
+            return "return None;" if self.returns == "PyValue" else "return;"
+        return f"return {self.visit(node.value)};"
+
+    def visitor_body(self, node):
+        sentences, ret = node.statements, node.ret
+        out = self.out
+        writes = out.writes
         if sentences:
-            cpp_code += self.visit(sentences)
+            self.emit(sentences)
         if ret:
-            if cpp_code:
-                cpp_code += "\n"
-            cpp_code += self.visit(ret)
-        return cpp_code
+            if out.writes != writes:
+                out.write("\n")
+            out.write(self.visit(ret))
+        return ""
 
-    def visitor_incomplete_function_body(self, node):
-        _, body = node
-        return self.visit(body)
+    # function, block and loop bodies are all generated the same way
+    visitor_function_body = visitor_block_body = visitor_loop_body = visitor_body
 
     def visitor_function(self, node):
-        _, name, args, body = node
-        args_list = args[1]
-        self.function_table[name] = len(args_list)
-
-        # Nuevo scope función
-        self.symbol_table.enter_scope(name)
-
+        name, args, body = node.name, node.args, node.body
+        self.function_table[name] = len(args.items)
+        semantics = self.semantics
+
+        # every specialization is written with the tables of its own body
+        tables = self.names, self.declared, self.types, self.routes
+        for params, returns in semantics.specializations.get(name, {}).items():
+            self.names, self.declared, self.types, self.routes = semantics.variants[name, params]
+            self.write_variant(node, specialized_name(name, params), params, returns)
+        self.names, self.declared, self.types, self.routes = tables
+        if name in semantics.generic or name not in self.signatures:
+            params, returns = self.signatures.get(name, ((), 'any'))
+            self.write_variant(node, name, params, returns)
+        return ""
+
+    def write_variant(self, node, name, params, returns):
+        # a pure recursive function is memoized when its arguments and result fit in a Memo
+        memo_types = self.MEMO_TYPES
+        self.loop = self.tail_loop(node, name, params, returns)
+        if (self.memoize and node.name in self.semantics.pure and returns in memo_types
+                and params and all(p in memo_types for p in params)):
+            self.write_memoized(name, params, returns, node.args, node.body)
+        else:
+            self.write_function(name, returns, node.args, node.body)
+        if self.loop is not None:
+            self.loops.append(name)
+            self.loop = None
+
+    def tail_loop(self, node, name, params, returns):
+        # the tail calls of the function that call the variant being written, the ones with
+        # an accumulator only when it returns an int, None when there are none
+        if not self.tail_calls or node.name not in self.semantics.tail:
+            return None
+        operator, sites = self.semantics.tail[node.name]
+        routes = self.routes
+        if name == node.name:
+            sites = {site: found for site, found in sites.items() if found[0] not in routes}
+        else:
+            sites = {site: found for site, found in sites.items() if routes.get(found[0]) == params}
+        if operator is not None and returns != "int":
+            operator = None
+            sites = {site: found for site, found in sites.items() if found[1] is None}
+        if not sites:
+            return None
+        if not any(found[1] is not None for found in sites.values()):
+            operator = None
+        return operator, sites, f"{node.name}__acc", node.args.items
+
+    def write_memoized(self, name, params, returns, args, body):
+        # the body is written as name__uncached, and name answers the calls already computed
+        # from a Memo of utilities.hpp, the recursive calls of the body go through name too
+        uncached = f"{name}__uncached"
+        cpp_returns = CPP_TYPES[returns]
+        types = ", ".join(CPP_TYPES[p] for p in params)
+        names = ", ".join(a.value for a in args.items)
+        plain = ", ".join(f"{CPP_TYPES[p]} {a.value}" for p, a in zip(params, args.items))
+        out = self.out
+        out.write(f"{cpp_returns} {uncached}({plain});\n")
+        out.write(f"{cpp_returns} {name}({self.visit(args)}) {{\n")
+        out.indent()
+        out.write(f"static Memo<{cpp_returns}, {types}> memo;\n")
+        out.write(f"if (const {cpp_returns}* value = memo.find({names})) {{\n")
+        out.indent()
+        out.write("return *value;\n")
+        out.dedent()
+        out.write("}\n")
+        out.write(f"return memo.store({uncached}({names}), {names});\n")
+        out.dedent()
+        out.write("}\n")
+        self.write_function(uncached, returns, args, body)
+        self.memoized.append(name)
+
+    def write_function(self, name, returns, args, body):
+        # the inferred return type, void when no value is returned
+        if returns == "None":
+            returns = "void"
+        else:
+            returns = CPP_TYPES[returns] if returns in CPP_TYPES else "auto"
         cpp_args = self.visit(args)
-        cpp_body = self.visit(body)
-        cpp_body = self.indent(cpp_body, 1)
-
-        # Cerrar scope
-        self.symbol_table.exit_scope()
-
-        return f"auto {name}({cpp_args}) {{\n{cpp_body}\n}}\n"
+        self.returns = returns
+        if self.loop is None:
+            self.write_block(f"{returns} {name}({cpp_args})", body)
+        else:
+            self.write_loop(f"{returns} {name}({cpp_args})", body)
+
+    def write_loop(self, header, body):
+        # the body inside while (true), every tail call assigns its arguments to the
+        # parameters and continues, the operations left for after a call with an
+        # accumulator are done on it before, and the other returns return it with their value
+        operator, accumulator = self.loop[0], self.loop[2]
+        out = self.out
+        out.write(f"{header} {{\n")
+        out.indent()
+        if operator is not None:
+            out.write(f"int {accumulator} = {self.IDENTITY[operator]};\n")
+        # the end of a body without a return leaves the loop, and the function
+        self.write_block("while (true)", body if body.ret is not None else [body, "break"])
+        out.dedent()
+        out.write("}\n")
+
+    def tail_step(self, site):
+        # the loop step that replaces a tail call
+        operator, sites, accumulator, params = self.loop
+        call, operand, left = sites[site]
+        changed = [(param, arg.value) for param, arg in zip(params, call.args.items) if arg.value != param.value]
+        values = [self.visitor_operations(v) if self.is_operation(v) else self.visit(v) for _, v in changed]
+        code = []
+        if operand is not None:
+            code.append(f"{accumulator} = {accumulator} {operator} {self.operand(site.value, operand, True)};")
+        if len(changed) > 1 or (left and operand is not None and changed):
+            # the arguments are computed from the parameters before any of them changes,
+            # and before the operand when the call comes first
+            nexts = [f"{cpp_type(self.declared[param])} {param.value}__next = {value};" for (param, _), value in zip(changed, values)]
+            assigns = [f"{param.value} = {param.value}__next;" for param, _ in changed]
+            code = nexts + code + assigns if left else code + nexts + assigns
+        else:
+            code += [f"{param.value} = {value};" for (param, _), value in zip(changed, values)]
+        code.append("continue;")
+        return "\n".join(code) + "\n"
 
 
     def write_if(self, node):
-        cond = self.visit(node[1])
-
-        self.symbol_table.enter_scope("if")
-        body = self.visit(node[2])
-        body = self.indent(body, 1)
-        self.symbol_table.exit_scope()
+        cond = self.visit(node.test)
 
-        return f"if ({cond}) {{\n{body}\n}}\n"
+        self.write_block(f"if ({cond})", node.body)
 
 
     def write_elif(self, node):
-        print(node)
-        cond = self.visit(node[1])
-        self.symbol_table.enter_scope("elif")
-        body = self.visit(node[2])
-        body = self.indent(body, 1)
-        self.symbol_table.exit_scope()
-        return f"else if ({cond}) {{\n{body}\n}}\n"
+        cond = self.visit(node.test)
+        self.write_block(f"else if ({cond})", node.body)
 
 
     def write_else(self, node):
-        self.symbol_table.enter_scope("else")
-        body = self.visit(node[1])
-        body = self.indent(body, 1)
-        self.symbol_table.exit_scope()
-        
-        return f"else {{\n{body}\n}}\n"
+        self.write_block("else", node)
 
     def visitor_conditional(self, node):
-        result = ""
-        if len(node) > 1:
-            result += self.write_if(node[1])
-        if len(node) > 2:
-            elif_else = node[2:]
-            for i in elif_else:
-                if i[0] == "elif_list":
-                    for j in i[1]:
-                        result += self.write_elif(j)  
-                if i[0] == "else":
-                    result +=self. write_else(node[3])
-                    break
-        return result
-
-    def visitor_incomplete_block_body(self, node):
-        _, body = node
-        return self.visit(body)
-
-    def visitor_complete_block_body(self, node):
-        _, sentences, ret = node
-        cpp_code = ""
-        if sentences:
-            cpp_code += self.visit(sentences)
-        if ret:
-            if cpp_code:
-                cpp_code += "\n"
-            cpp_code += self.visit(ret)
-        return cpp_code
-
-    def visitor_in_range_clause(self, node):
-        _, var, range_val = node
-        self.symbol_table.insert(var, "int", value=None)
-        range_cpp = self.visit(range_val)
-        inferred_type = self.symbol_table.infer_type_from_operation(range_val)
-        if self.symbol_table.lookup(range_val) != None:
-            if self.symbol_table.getSymbolType(range_val) == "any":
-                range_cpp = f"std::any_cast<int>({range_val})"
+        self.write_if(node)
+        for i in node.elifs:
+            self.write_elif(i)
+        if node.orelse is not None:
+            self.write_else(node.orelse)
+        return ""
+
+    def range_bound(self, node, value):
+        # an argument of range() as an int
+        range_cpp = self.visit(value)
+        if isinstance(value, Node):
+            inferred_type = self.types.get(value, "any")
+        else:
+            inferred_type = type(value).__name__
+        if self.lookup(node, value) != None:
+            inferred_type = self.symbol_type(node, value)
+        if inferred_type == "any":
+            range_cpp = f"static_cast<int>({range_cpp})"
         elif inferred_type == "float":
             range_cpp = f"(int){range_cpp}"
-        return f"(int {var} = 0; {var} < {range_cpp}; {var}++)"
+        return range_cpp
+
+    def visitor_in_range_clause(self, node):
+        # a counted loop, range() evaluates its arguments once so the stop and the step that
+        # are not literals are computed before the first iteration, into locals of the header
+        var, step = node.target, node.step
+        start = self.range_bound(node, node.start)
+        stop = self.range_bound(node, node.stop)
+        init = [f"int {var} = {start}"]
+        if type(node.stop) is not int:
+            init.append(f"{var}__stop = {stop}")
+            stop = f"{var}__stop"
+        if type(step) is int:
+            if step == 0:
+                raise ValueError("range() arg 3 must not be zero")
+            test = f"{var} < {stop}" if step > 0 else f"{var} > {stop}"
+            update = {1: f"{var}++", -1: f"{var}--"}.get(step, f"{var} += {step}" if step > 0 else f"{var} -= {-step}")
+        else:
+            # the direction is only known when the loop starts
+            init.append(f"{var}__step = range_step({self.range_bound(node, step)})")
+            test = f"({var}__step > 0 ? {var} < {stop} : {var} > {stop})"
+            update = f"{var} += {var}__step"
+        return f"({', '.join(init)}; {test}; {update})"
 
     def visitor_for(self, node):
-        __, clause = node
-        clause_cpp = self.visit(clause)
+        clause_cpp = self.visit(node.clause)
         result = f"for {clause_cpp}"
         return result
 
     def visitor_while(self, node):
-        __, clause = node
-        while_clause = self.visit(clause)
+        while_clause = self.visit(node.test)
         result = f"while ({while_clause})" + " {\n"
         return result
 
     def visitor_loop(self, node):
-        _, loop, body = node
+        loop, body = node.header, node.body
         loop_clause = self.visit(loop)
 
-        self.symbol_table.enter_scope("loop")
-        body_cpp = self.visit(body)
-        body_cpp = self.indent(body_cpp, 1)
-        self.symbol_table.exit_scope()
+        self.write_block(loop_clause, body)
+        return ""
 
-        return f"{loop_clause} {{\n{body_cpp}\n}}\n"
-    
-    def visitor_loop_conditional(self, node):
-        _, body = node
-        return self.visit(body)
-
-    def visitor_complete_loop_body(self, node):
-        _, sentences, ret = node
-        cpp_code = ""
-        if sentences:
-            cpp_code += self.visit(sentences)
-        if ret:
-            if cpp_code:
-                cpp_code += "\n"
-            cpp_code += self.visit(ret)
-        return cpp_code
 
     def visitor_assignment_operation(self, node):
-        __, op1, operation, op2 = node
+        op1, operation, op2 = node.target, node.op, node.value
         if isinstance(op1, str):
             if not self.check_if_str(op1):
-                if not self.check_if_var_exists(op1):
+                if not self.check_if_var_exists(node, op1):
                     raise ValueError("Varibale {op1} does not exist")
         
         if isinstance(self, op2, str):
             if not self.check_if_str(op2):
-                if not self.check_if_var_exists(op2):
+                if not self.check_if_var_exists(node, op2):
                     raise ValueError("Varibale {op2} does not exist")
         
         result = f"{op1} {operation} {op2};"
@@ -578,12 +715,3 @@ class Visitor:
 
     def visitor_continue(self, node):
         return "continue;"
-    
-    def indent(self, text, level=1):
-        if not text:
-            return ""
-        pad = "    " * level
-        return "\n".join(
-            pad + line if line.strip() != "" else ""
-            for line in text.split("\n")
-        )
@@ -2,15 +2,11 @@ from src.lexer import Lexer
 from src.parser import Parser
 from src.utils import Error
 
-# Read file
-with open("tests/test1.py", "r", encoding='utf-8') as f:
-    source_code = f.read()
-
 # Create Lexer
 errors = [] # An empty error queue is created and sent to the lexer
 lexer = Lexer(errors=errors)
 lexer.build()
-lexer.input(source_code)
+lexer.input_file("tests/test1.py") # The file is memory-mapped and lexed in chunks
 
 
 # Check tokens
@@ -1,21 +1,22 @@
 from re import DEBUG
 from src.lexer import Lexer
 from src.parser import Parser
+from src.tracer import Tracer, REDUCE
 from src.utils import Error
 from src.symbol_table import SymbolTable
 from src.visitor import Visitor
 
-# Read file
-with open("tests/a.py", "r", encoding='utf-8') as f:
-    source_code = f.read()
+# File to parse, it is memory-mapped and lexed in chunks
+input_path = "tests/a.py"
 
 # Create Lexer
-errors = [] # An empty error queue is created and sent to the lexer
+errors = [] # An empty error queue is created and shared by the lexer and parser
 lexer = Lexer(errors=errors)
 lexer.build()
-lexer.input(source_code)
 
 # Create Parser
-parser = Parser()
-parseTree = parser.parser.parse(source_code, lexer=lexer)
+# The tracer prints every reduction, parsing without one prints nothing
+tracer = Tracer(REDUCE)
+parser = Parser(errors=errors, tracer=tracer)
+parseTree = parser.parse_file(input_path, lexer)
 print(parseTree)
@@ -2,35 +2,42 @@ from re import DEBUG
 from src.lexer import Lexer
 from src.parser import Parser
 from src.utils import Error
-from src.symbol_table import SymbolTable
+from src.optimizer import ConstantFolder, DeadCodeEliminator
+from src.semantic import SemanticAnalyzer
 from src.visitor import Visitor
 import tkinter as tk
 from tkinter import filedialog
 
-# Read file
+# File to compile, it is memory-mapped and lexed in chunks
 input_path = "tests/a.py"
-with open(input_path, "r", encoding='utf-8') as f:
-    source_code = f.read()
 
 # Create Lexer
-errors = [] # An empty error queue is created and sent to the lexer
+errors = [] # An empty error queue is created and shared by the lexer and parser
 lexer = Lexer(errors=errors)
 lexer.build()
-lexer.input(source_code)
 
 # Create Parser
-parser = Parser()
-parseTree = parser.parser.parse(source_code, lexer=lexer)
+parser = Parser(errors=errors)
+parseTree = parser.parse_file(input_path, lexer)
 for i in parseTree:
     print(i)
 
-#Create Visitor for code generation
+# Fold constant expressions and propagate constants before the analysis
+folder = ConstantFolder()
+parseTree = folder.fold(parseTree)
+print(f"Constant folding eliminated {folder.eliminated} nodes, propagated {folder.propagated} constants")
+eliminator = DeadCodeEliminator()
+parseTree = eliminator.eliminate(parseTree)
+print(f"Dead code elimination removed functions {eliminator.functions} and {eliminator.stores} stores")
+
+# Resolve names and types once, then create Visitor for code generation
 #try:
-symtab = SymbolTable()
-visitor = Visitor(symbol_table=symtab, parse_tree=parseTree)
-newCode = visitor.start()
+semantics = SemanticAnalyzer().analyze(parseTree)
+visitor = Visitor(semantics=semantics, parse_tree=parseTree)
 output_path = input_path.replace("py", "cpp")
-file = open(output_path, "w")
-file.write(newCode)
+with open(output_path, "w") as file:
+    file.writelines(visitor.generate())
+print(f"Memoized pure recursive functions {visitor.memoized}")
+print(f"Tail calls written as loops in {visitor.loops}")
 #except Exception as e:
  #   print(e)
@@ -1,18 +1,17 @@
-#include<any>
 #include<cmath>
 #include<iostream>
 #include<vector>
 #include<map>
 #include "utilities.hpp"
 
-auto bubble_sort(std::any numbers, std::any n) {
+std::vector<int> bubble_sort(std::vector<int> numbers, int n) {
     int aux = 0;
-    for (int i = 0; i < std::any_cast<int>(n); i++) {
-        for (int j = 0; j < std::any_cast<int>(n) - 1 - i; j++) {
-            if (std::any_cast<int>(std::any_cast<std::vector<std::any>>(numbers)[j]) > std::any_cast<int>(std::any_cast<std::vector<std::any>>(numbers)[j + 1])) {
-                aux = std::any_cast<int>(std::any_cast<std::vector<std::any>>(numbers)[j + 1]);
-                std::any_cast<std::vector<std::any>&>(numbers)[j + 1] = std::any_cast<int>(std::any_cast<std::vector<std::any>>(numbers)[j]);
-                std::any_cast<std::vector<std::any>&>(numbers)[j] = aux;
+    for (int i = 0, i__stop = n; i < i__stop; i++) {
+        for (int j = 0, j__stop = n - 1 - i; j < j__stop; j++) {
+            if (numbers[j] > numbers[j + 1]) {
+                aux = numbers[j + 1];
+                numbers[j + 1] = numbers[j];
+                numbers[j] = aux;
 
             }
 
@@ -25,7 +24,7 @@ auto bubble_sort(std::any numbers, std::any n) {
 
 
 int main() {
-    std::vector<std::any> nums = {5, 1, 4, 2, 8};
-    std::cout << bubble_sort(nums, 5) << std::endl;
+    std::vector<int> nums = {5, 1, 4, 2, 8};
+    print(bubble_sort(nums, 5));
     return 0;
 }
\ No newline at end of file
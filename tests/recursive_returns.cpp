@@ -0,0 +1,57 @@
+#include<cmath>
+#include<iostream>
+#include<vector>
+#include<map>
+#include "utilities.hpp"
+
+int sumto__uncached(int n, int acc);
+int sumto(int n, int acc) {
+    static Memo<int, int, int> memo;
+    if (const int* value = memo.find(n, acc)) {
+        return *value;
+    }
+    return memo.store(sumto__uncached(n, acc), n, acc);
+}
+int sumto__uncached(int n, int acc) {
+    while (true) {
+        if (n == 0) {
+            return acc;
+        }
+
+        int n__next = n - 1;
+        int acc__next = acc + n;
+        n = n__next;
+        acc = acc__next;
+        continue;
+
+    }
+}
+int gcd__uncached(int a, int b);
+int gcd(int a, int b) {
+    static Memo<int, int, int> memo;
+    if (const int* value = memo.find(a, b)) {
+        return *value;
+    }
+    return memo.store(gcd__uncached(a, b), a, b);
+}
+int gcd__uncached(int a, int b) {
+    while (true) {
+        if (b == 0) {
+            return a;
+        }
+
+        int a__next = b;
+        int b__next = mod(a, b);
+        a = a__next;
+        b = b__next;
+        continue;
+
+    }
+}
+
+
+int main() {
+    print(sumto(100, 0));
+    print(gcd(1071, 462));
+    return 0;
+}
\ No newline at end of file
@@ -0,0 +1,13 @@
+### Funciones recursivas que devuelven un parámetro en su caso base, se escriben con int
+def sumto(n, acc):
+    if n == 0:
+        return acc
+    return sumto(n - 1, acc + n)
+
+def gcd(a, b):
+    if b == 0:
+        return a
+    return gcd(b, a % b)
+
+print(sumto(100, 0))
+print(gcd(1071, 462))